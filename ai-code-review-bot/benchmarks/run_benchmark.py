@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark
+Built by Jackson Studio
+
+Runs scripts/review.py and reviewers/claude_reviewer.py as real
+subprocesses against local GitHub and Anthropic stand-ins, then reports
+per-stage latency, request counts and estimated cost for small, medium
+and huge PRs. No tokens or real PRs needed.
+
+Usage:
+    python benchmarks/run_benchmark.py
+    python benchmarks/run_benchmark.py --sizes huge --model-latency 2.0 --json
+    python benchmarks/run_benchmark.py --recording fixtures/pr-1234.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from fake_anthropic import FakeMessagesAPI, serve as serve_anthropic
+from fake_github import PR_SIZES, FakeGitHubAPI, load_recording, make_pr_fixture, serve_github
+from utils.cost_tracker import calculate_cost
+
+SCRIPTS = {
+    "review.py": os.path.join(ROOT, "scripts", "review.py"),
+    "claude_reviewer.py": os.path.join(ROOT, "reviewers", "claude_reviewer.py"),
+}
+MODEL = "claude-sonnet-4"
+
+
+def fake_review_text(script: str, fixture: Dict, issues: int = 3) -> str:
+    """Model output in the format each script expects"""
+    paths = [f["filename"] for f in fixture["files"]][:issues]
+    if script == "claude_reviewer.py":
+        lines = ["### 🔴 Critical Issues"] + [f"- **{p} line 3:** Unvalidated input" for p in paths]
+        return "\n".join(lines + ["", "### ✅ Good Practices", "- Small functions"])
+
+    return json.dumps({
+        "summary": "Synthetic benchmark review",
+        "severity": "medium",
+        "issues": [{"file": p, "line": 3, "severity": "medium", "category": "bug",
+                    "message": "Unvalidated input", "suggestion": "Validate it"} for p in paths],
+        "positives": ["Small functions"],
+    })
+
+
+def span(entries: List[Dict]) -> float:
+    if not entries:
+        return 0.0
+    return max(e["finished"] for e in entries) - min(e["started"] for e in entries)
+
+
+def run_once(script: str, size: str, fixture: Dict, args) -> Dict:
+    """One subprocess run against fresh fake servers"""
+    github = FakeGitHubAPI(latency=args.github_latency)
+    github.add_pull(fixture)
+    anthropic_api = FakeMessagesAPI(text=fake_review_text(script, fixture),
+                                    chunk_delay=args.chunk_delay, latency=args.model_latency)
+
+    with serve_github(github) as github_url, serve_anthropic(anthropic_api) as anthropic_url:
+        number = fixture["details"]["number"]
+        env = dict(
+            os.environ,
+            ANTHROPIC_API_KEY="bench", GITHUB_TOKEN="bench",
+            ANTHROPIC_BASE_URL=anthropic_url, GITHUB_API_URL=github_url,
+            PR_NUMBER=str(number), REPO_OWNER=github.owner,
+            REPO_NAME=f"{github.owner}/{github.repo}" if script == "claude_reviewer.py" else github.repo,
+            MODEL=MODEL, MAX_FILES=str(args.max_files), PYTHONUNBUFFERED="1",
+        )
+        started = time.time()
+        proc = subprocess.run([sys.executable, SCRIPTS[script]], env=env, cwd=ROOT,
+                              capture_output=True, text=True)
+        wall = time.time() - started
+
+    gets = [r for r in github.requests if r["method"] == "GET"]
+    posts = [r for r in github.requests if r["method"] == "POST"]
+    model_calls = [r for r in anthropic_api.requests if r.get("finished")]
+    first_request = min([r["started"] for r in github.requests + model_calls] or [started])
+
+    usage = [anthropic_api.usage_for(r["body"]) for r in model_calls]
+    return {
+        "script": script,
+        "size": size,
+        "files": len(fixture["files"]),
+        "diff_kb": len(fixture["diff"].encode()) / 1024,
+        "exit_code": proc.returncode,
+        "wall_s": wall,
+        "startup_s": first_request - started,
+        "fetch_s": span(gets),
+        "model_s": sum(r["finished"] - r["started"] for r in model_calls),
+        "post_s": span(posts),
+        "github_requests": len(github.requests),
+        "github_posts": len(posts),
+        "model_requests": len(model_calls),
+        "input_tokens": sum(u["input_tokens"] for u in usage),
+        "output_tokens": sum(u["output_tokens"] for u in usage),
+        "cost": sum(calculate_cost(u, MODEL) for u in usage),
+        "stderr": proc.stderr[-500:] if proc.returncode not in (0, 1) else "",
+    }
+
+
+def print_table(results: List[Dict]):
+    header = (f"{'script':<19} {'size':<7} {'files':>5} {'diff KB':>8} {'wall s':>7} {'start s':>7} "
+              f"{'fetch s':>7} {'model s':>7} {'post s':>7} {'GH req':>6} {'LLM req':>7} "
+              f"{'tok in':>8} {'tok out':>7} {'cost $':>8}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['script']:<19} {r['size']:<7} {r['files']:>5} {r['diff_kb']:>8.0f} {r['wall_s']:>7.2f} "
+              f"{r['startup_s']:>7.2f} {r['fetch_s']:>7.2f} {r['model_s']:>7.2f} {r['post_s']:>7.2f} "
+              f"{r['github_requests']:>6} {r['model_requests']:>7} {r['input_tokens']:>8} "
+              f"{r['output_tokens']:>7} {r['cost']:>8.4f}")
+        if r["stderr"]:
+            print(f"  ⚠️ exit {r['exit_code']}: {r['stderr'].strip().splitlines()[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the review pipeline against local stand-ins")
+    parser.add_argument("--sizes", default="small,medium,huge", help=f"Comma-separated: {', '.join(PR_SIZES)}")
+    parser.add_argument("--scripts", default=",".join(SCRIPTS), help="Comma-separated script names")
+    parser.add_argument("--recording", action="append", default=[], help="Recorded PR JSON to replay")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--max-files", type=int, default=1000, help="MAX_FILES passed to the scripts")
+    parser.add_argument("--github-latency", type=float, default=0.02, help="Seconds per GitHub request")
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Seconds to first model byte")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Seconds between streamed chunks")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    fixtures = [(size, make_pr_fixture(100 + i, *PR_SIZES[size]))
+                for i, size in enumerate(s for s in args.sizes.split(",") if s)]
+    fixtures += [(os.path.basename(path), load_recording(path)) for path in args.recording]
+
+    results = []
+    for script in args.scripts.split(","):
+        for size, fixture in fixtures:
+            for _ in range(args.repeat):
+                results.append(run_once(script, size, fixture, args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
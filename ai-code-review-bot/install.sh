@@ -29,6 +29,14 @@ curl -fsSL https://raw.githubusercontent.com/jackson-studio/ai-code-review-bot/m
 # Make script executable
 chmod +x scripts/review.py
 
+# Download shared modules
+echo "📥 Downloading shared modules..."
+mkdir -p reviewers utils
+for module in reviewers/__init__.py reviewers/prompt_builder.py reviewers/diff_filter.py reviewers/comment_index.py reviewers/cost_planner.py reviewers/incremental.py reviewers/model_router.py reviewers/symbol_index.py utils/__init__.py utils/diff_parser.py utils/cost_tracker.py utils/stream_parser.py utils/rate_limiter.py utils/github_client.py utils/metrics.py utils/analytics.py; do
+    curl -fsSL "https://raw.githubusercontent.com/jackson-studio/ai-code-review-bot/main/$module" \
+        -o "$module"
+done
+
 # Download config
 echo "📥 Downloading config..."
 curl -fsSL https://raw.githubusercontent.com/jackson-studio/ai-code-review-bot/main/config.json \
@@ -48,7 +56,7 @@ echo "   Name: ANTHROPIC_API_KEY"
 echo "   Value: your-api-key"
 echo ""
 echo "3. Commit and push:"
-echo "   git add .github/workflows/ai-review.yml scripts/ config.json requirements.txt"
+echo "   git add .github/workflows/ai-review.yml scripts/ reviewers/ utils/ config.json requirements.txt"
 echo "   git commit -m 'Add AI code review bot'"
 echo "   git push"
 echo ""
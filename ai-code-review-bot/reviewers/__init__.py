@@ -0,0 +1,4 @@
+"""
+Reviewer backends and prompt assembly
+Built by Jackson Studio
+"""
@@ -8,10 +8,28 @@ import os
 import sys
 import json
 import time
-from typing import List, Dict, Optional
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional
+import anthropic
 from anthropic import Anthropic
 import requests
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from reviewers.comment_index import index_comments
+from reviewers.cost_planner import plan_review, worst_case_cost
+from reviewers.diff_filter import filter_files
+from reviewers.incremental import COMPARE_FILE_LIMIT, is_fast_forward, last_reviewed_sha, review_marker
+from reviewers.model_router import ROUTING_MODES, choose_route, download_budget, escalate_for_content
+from reviewers.prompt_builder import (
+    PackedDiff, cached_system_blocks, collect_pr_diff, format_omitted_section, load_review_guidelines
+)
+from reviewers.symbol_index import repository_context
+from utils import metrics
+from utils.cost_tracker import calculate_cost, format_usage
+from utils.github_client import GITHUB_API_URL, github_paginate, github_request, github_stream_lines
+from utils.rate_limiter import ANTHROPIC_RETRY_STATUSES, get_limiter
+
 # Configuration
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
@@ -22,73 +40,118 @@ HEAD_SHA = os.getenv("HEAD_SHA")
 REVIEW_FOCUS = os.getenv("REVIEW_FOCUS", "security,performance,readability").split(",")
 MAX_FILES = int(os.getenv("MAX_FILES", "20"))
 COST_LIMIT = float(os.getenv("COST_LIMIT", "0.10"))
+MODEL = os.getenv("MODEL", "claude-sonnet-4-20250514")
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "off")  # off | auto | progressive
+FAST_MODEL = os.getenv("FAST_MODEL", "claude-haiku-4-5")
+INCREMENTAL_REVIEW = os.getenv("INCREMENTAL_REVIEW", "true").lower() == "true"
+# Account the bot comments as; only its comments' markers are trusted ("" = any GitHub App bot)
+BOT_LOGIN = os.getenv("BOT_LOGIN", "")
+REPO_PATH = os.getenv("REPO_PATH") or os.getenv("GITHUB_WORKSPACE", "")
+SYMBOL_CACHE = os.getenv("SYMBOL_CACHE")
 
-# API clients
-anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
+# Output token cap per review depth (quick is used to fit under COST_LIMIT)
+DEPTH_MAX_TOKENS = {"full": 2000, "quick": 800}
 
-# Pricing (as of Feb 2026, adjust if needed)
-INPUT_PRICE_PER_MTK = 0.003  # $3 per million tokens
-OUTPUT_PRICE_PER_MTK = 0.015  # $15 per million tokens
+# API clients
+# Retries are handled by the shared limiter, not the SDK
+anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY, max_retries=0)
+anthropic_limiter = get_limiter("anthropic")
 
 
-def get_pr_diff() -> Optional[str]:
-    """Fetch PR diff from GitHub API"""
-    url = f"https://api.github.com/repos/{REPO_NAME}/pulls/{PR_NUMBER}"
+def get_pr_diff(since: Optional[str] = None) -> Iterator[str]:
+    """Stream the PR diff (or only the commits after since) line by line"""
+    if since:
+        url = f"{GITHUB_API_URL}/repos/{REPO_NAME}/compare/{since}...{HEAD_SHA}"
+    else:
+        url = f"{GITHUB_API_URL}/repos/{REPO_NAME}/pulls/{PR_NUMBER}"
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3.diff"
     }
     
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        print(f"Error fetching PR: {response.status_code}")
-        return None
-    
-    return response.text
+    return github_stream_lines(url, headers=headers)
 
 
 def get_pr_files() -> List[Dict]:
     """Get list of changed files"""
-    url = f"https://api.github.com/repos/{REPO_NAME}/pulls/{PR_NUMBER}/files"
+    url = f"{GITHUB_API_URL}/repos/{REPO_NAME}/pulls/{PR_NUMBER}/files"
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json"
     }
     
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        print(f"Error fetching files: {response.status_code}")
+    try:
+        return github_paginate(url, headers=headers)
+    except requests.HTTPError as e:
+        print(f"Error fetching files: {e.response.status_code}")
         return []
+
+
+def get_issue_comments() -> List[Dict]:
+    """Get the PR's general comments (summary to update, last reviewed head)"""
+    url = f"{GITHUB_API_URL}/repos/{REPO_NAME}/issues/{PR_NUMBER}/comments"
+    headers = {
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.v3+json"
+    }
     
-    return response.json()
+    try:
+        return github_paginate(url, headers=headers)
+    except requests.HTTPError as e:
+        print(f"Error fetching comments: {e.response.status_code}")
+        return []
 
 
-def should_skip_file(filename: str) -> bool:
-    """Check if file should be skipped"""
-    skip_patterns = [
-        ".generated.", "dist/", "build/", "vendor/",
-        "package-lock.json", "yarn.lock", "Pipfile.lock",
-        ".min.js", ".min.css"
-    ]
-    return any(pattern in filename for pattern in skip_patterns)
+def get_compare(base_sha: str, head_sha: str) -> Optional[Dict]:
+    """Compare two commits; None if unavailable (e.g. SHA lost in a force push)"""
+    url = f"{GITHUB_API_URL}/repos/{REPO_NAME}/compare/{base_sha}...{head_sha}"
+    headers = {
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    
+    response = github_request("GET", url, headers=headers)
+    if response.status_code != 200:
+        print(f"Error comparing {base_sha[:7]}...{head_sha[:7]}: {response.status_code}")
+        return None
+    
+    return response.json()
 
 
-def build_review_prompt(diff: str, files: List[Dict]) -> str:
-    """Build prompt for Claude"""
-    file_list = "\n".join([f"- {f['filename']} (+{f['additions']} -{f['deletions']})" 
-                            for f in files[:10]])
+def incremental_changes(head_sha: str, comments: List[Dict]):
+    """(since, files) for the commits since the last reviewed head
+
+    since is None when a full review is needed (first run, rebase, merge
+    from base, or the compare is unavailable). Raises SystemExit if head
+    was already reviewed.
+    """
+    last_sha = last_reviewed_sha(comments, BOT_LOGIN)
+    if not last_sha:
+        return None, None
+    if head_sha.startswith(last_sha):
+        print(f"{head_sha[:7]} was already reviewed, nothing to do")
+        metrics.current().labels["outcome"] = "skipped"
+        sys.exit(0)
     
-    focus_areas = ", ".join(REVIEW_FOCUS)
+    compare = get_compare(last_sha, head_sha)
+    if not compare or not is_fast_forward(compare) or len(compare.get('files', [])) >= COMPARE_FILE_LIMIT:
+        print(f"History changed since {last_sha[:7]}, running a full review")
+        return None, None
     
-    return f"""You are an expert code reviewer. Review this pull request focusing on: {focus_areas}.
+    print(f"Incremental review of {len(compare.get('commits', []))} new commits since {last_sha[:7]}")
+    return last_sha, compare.get('files', [])
 
-**Files Changed:**
-{file_list}
 
-**Full Diff:**
-```diff
-{diff[:15000]}  # Limit diff size
-```
+def build_system_prompt(depth: str = "full") -> str:
+    """Build the static review instructions (prompt-cached across calls)"""
+    focus_areas = ", ".join(REVIEW_FOCUS)
+    guidelines = load_review_guidelines(include_output_format=False)
+    quick = ("\n**Quick review:** report only critical issues, in at most five bullets. "
+             "Skip improvements and good practices.\n" if depth == "quick" else "")
+    
+    return f"""You are an expert code reviewer. Review pull requests focusing on: {focus_areas}.
+
+{guidelines}
 
 **Instructions:**
 1. Identify critical issues (security, bugs, breaking changes)
@@ -109,18 +172,68 @@ def build_review_prompt(diff: str, files: List[Dict]) -> str:
 (what was done well)
 
 Be direct and actionable. No fluff.
+{quick}"""
+
+
+def build_review_prompt(packed: PackedDiff, files: List[Dict], since: Optional[str] = None,
+                        related: str = "") -> str:
+    """Build the per-PR prompt (file list + packed diff)"""
+    file_list = "\n".join([f"- {f['filename']} (+{f['additions']} -{f['deletions']})" 
+                            for f in files[:10]])
+    scope = (f"Review only the commits pushed since {since[:7]} (already reviewed). "
+             f"The diff below contains just those changes." if since else "Review this pull request.")
+    
+    return f"""{scope}
+
+**Files Changed:**
+{file_list}
+
+**Full Diff:**
+```diff
+{packed.text}
+```
+
+{format_omitted_section(packed)}
+
+{related}
 """
 
 
-def review_with_claude(prompt: str) -> tuple[str, float]:
+def create_message_with_backoff(max_retries: int = 3, **params):
+    """messages.create paced by the shared Anthropic limiter"""
+    run = metrics.current()
+    for attempt in range(max_retries):
+        anthropic_limiter.acquire()
+        try:
+            with run.span("http.anthropic", model=params.get("model")) as span:
+                raw = anthropic_client.messages.with_raw_response.create(**params)
+                span["status"] = raw.status_code
+                span["bytes"] = len(raw.content)
+        except (anthropic.APIStatusError, anthropic.APIConnectionError) as e:
+            # APIConnectionError (and its APITimeoutError) has no status code
+            status = getattr(e, "status_code", None)
+            if (status is not None and status not in ANTHROPIC_RETRY_STATUSES) or attempt == max_retries - 1:
+                raise
+            run.incr("anthropic_retries")
+            delay = anthropic_limiter.backoff(attempt, e.response.headers if status else None)
+            print(f"Anthropic request failed ({status or type(e).__name__}), backed off {delay:.1f}s")
+            continue
+        
+        anthropic_limiter.update_from_headers(raw.headers)
+        return raw.parse()
+
+
+def review_with_claude(prompt: str, depth: str = "full", model: Optional[str] = None) -> tuple[str, float]:
     """Get review from Claude, return (review, cost)"""
-    start_time = time.time()
+    run = metrics.current()
+    model = model or MODEL
     
     try:
-        response = anthropic_client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2000,
+        response = create_message_with_backoff(
+            model=model,
+            max_tokens=DEPTH_MAX_TOKENS[depth],
             temperature=0.3,
+            system=cached_system_blocks(build_system_prompt(depth)),
             messages=[{
                 "role": "user",
                 "content": prompt
@@ -129,16 +242,11 @@ def review_with_claude(prompt: str) -> tuple[str, float]:
         
         review_text = response.content[0].text
         
-        # Calculate cost
-        input_tokens = response.usage.input_tokens
-        output_tokens = response.usage.output_tokens
-        cost = (input_tokens / 1_000_000 * INPUT_PRICE_PER_MTK + 
-                output_tokens / 1_000_000 * OUTPUT_PRICE_PER_MTK)
-        
-        elapsed = time.time() - start_time
+        # Calculate cost (cache reads/writes are priced separately)
+        cost = calculate_cost(response.usage, model)
+        run.record_usage(response.usage, model)
         
-        print(f"Review completed in {elapsed:.1f}s")
-        print(f"Tokens: {input_tokens} in, {output_tokens} out")
+        print(format_usage(response.usage))
         print(f"Cost: ${cost:.4f}")
         
         return review_text, cost
@@ -148,30 +256,45 @@ def review_with_claude(prompt: str) -> tuple[str, float]:
         return None, 0.0
 
 
-def post_review_comment(review: str, cost: float, review_time: float):
-    """Post review as PR comment"""
-    url = f"https://api.github.com/repos/{REPO_NAME}/issues/{PR_NUMBER}/comments"
+def post_review_comment(review: str, cost: float, review_time: float, since: Optional[str] = None,
+                        existing: Optional[Dict] = None, model: Optional[str] = None,
+                        preliminary_for: Optional[str] = None) -> Optional[Dict]:
+    """Post review as PR comment, or update the bot's existing summary comment
+
+    A preliminary review (preliminary_for = the model still reviewing) has
+    no head marker, so it doesn't count as reviewed. Returns the comment.
+    """
+    if existing:
+        method, url = "PATCH", f"{GITHUB_API_URL}/repos/{REPO_NAME}/issues/comments/{existing['id']}"
+    else:
+        method, url = "POST", f"{GITHUB_API_URL}/repos/{REPO_NAME}/issues/{PR_NUMBER}/comments"
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json"
     }
     
     # Format comment
-    comment_body = f"""🤖 **AI Code Review** (Claude Sonnet 4.5)
+    scope = f"Changes since `{since[:7]}`\n\n" if since else ""
+    if preliminary_for:
+        scope += f"⚡ *Preliminary review. {preliminary_for} is reviewing in depth and will update this comment.*\n\n"
+    comment_body = f"""🤖 **AI Code Review** ({model or MODEL})
 
-{review}
+{scope}{review}
 
 ---
 *Review time: {review_time:.0f}s | Cost: ${cost:.3f} | Built by Jackson Studio*
 """
+    if HEAD_SHA and not preliminary_for:
+        comment_body += review_marker(HEAD_SHA)
     
-    response = requests.post(url, headers=headers, json={"body": comment_body})
+    response = github_request(method, url, headers=headers, json={"body": comment_body})
     
-    if response.status_code == 201:
+    if response.status_code in (200, 201):
         print("Review posted successfully")
-    else:
-        print(f"Error posting comment: {response.status_code}")
-        print(response.text)
+        return response.json()
+    print(f"Error posting comment: {response.status_code}")
+    print(response.text)
+    return None
 
 
 def main():
@@ -182,53 +305,161 @@ def main():
     if not all([ANTHROPIC_API_KEY, GITHUB_TOKEN, PR_NUMBER, REPO_NAME]):
         print("Missing required environment variables")
         sys.exit(1)
-    
-    # Get PR data
-    print("Fetching PR diff...")
-    diff = get_pr_diff()
-    if not diff:
-        print("Could not fetch PR diff")
+    if MODEL_ROUTING not in ROUTING_MODES:
+        print(f"MODEL_ROUTING must be one of {', '.join(ROUTING_MODES)}")
         sys.exit(1)
     
-    print("Fetching changed files...")
-    files = get_pr_files()
+    with metrics.run_metrics(script="claude_reviewer", repo=REPO_NAME, pr=int(PR_NUMBER),
+                             model=MODEL) as run:
+        run_review(run)
+
+
+def run_review(run: metrics.RunMetrics):
+    """Fetch, review and post for the configured PR, recording stage spans"""
+    # Earlier bot comments, fetched once: the summary to update, the reviewed head
+    with run.span("fetch"):
+        comments = get_issue_comments()
+    summary = index_comments(comments, [], BOT_LOGIN).summary
+    
+    # Only the commits since the last reviewed head, when history allows
+    since = files = None
+    if INCREMENTAL_REVIEW and HEAD_SHA:
+        with run.span("fetch"):
+            since, files = incremental_changes(HEAD_SHA, comments)
+    run.labels.update(head_sha=HEAD_SHA, incremental=since is not None)
+    
+    # Get PR data
+    if since is None:
+        print("Fetching changed files...")
+        with run.span("fetch"):
+            files = get_pr_files()
     if not files:
         print("No files changed")
+        run.labels["outcome"] = "skipped"
         sys.exit(0)
     
-    # Filter files
-    reviewable_files = [f for f in files if not should_skip_file(f['filename'])]
+    # Filter files (config.json ignore_patterns, generated, vendored, renames)
+    reviewable_files, skipped = filter_files(files)
+    run.labels.update(files=len(reviewable_files),
+                      changed_lines=sum(f.get('additions', 0) + f.get('deletions', 0) for f in reviewable_files))
     if not reviewable_files:
-        print("No reviewable files (all skipped)")
+        print(f"No reviewable files (all {len(skipped)} skipped)")
+        run.labels["outcome"] = "skipped"
         sys.exit(0)
     
     if len(reviewable_files) > MAX_FILES:
         print(f"Too many files ({len(reviewable_files)}), reviewing first {MAX_FILES}")
         reviewable_files = reviewable_files[:MAX_FILES]
     
+    # Fast model for small low-risk changes, decided before the download
+    route = choose_route(MODEL_ROUTING, reviewable_files, FAST_MODEL, MODEL)
+    
+    # Stream the diff, keeping only what fits the budget and stopping early
+    print("Fetching PR diff...")
+    with run.span("fetch") as span:
+        lines = get_pr_diff(since)
+        try:
+            collected = collect_pr_diff(lines, reviewable_files, download_budget(route, MODEL))
+        except requests.HTTPError as e:
+            print(f"Error fetching PR diff: {e.response.status_code}")
+            run.labels["outcome"] = "error"
+            sys.exit(1)
+        finally:
+            if hasattr(lines, "close"):
+                lines.close()
+        span["cut_off"] = collected.cut_off
+    
+    route = escalate_for_content(route, collected.file_diffs, MODEL)
+    model = route.model
+    run.labels.update(model=model, route=route.tier)
+    if MODEL_ROUTING != "off":
+        print(f"Routed to {model} ({route.reason})")
+    
+    # Definitions and callers of the changed code, from the checkout
+    related = ""
+    if REPO_PATH:
+        with run.span("context"):
+            # Actions checks out the merge commit (GITHUB_SHA) for pull_request events
+            related = repository_context(collected.file_diffs, model, REPO_PATH, REPO_NAME,
+                                         [HEAD_SHA, os.getenv("GITHUB_SHA")], SYMBOL_CACHE)
+    
     # Build prompt
     print("Building review prompt...")
-    prompt = build_review_prompt(diff, reviewable_files)
+    with run.span("prompt") as span:
+        # Fit the request under COST_LIMIT before spending anything
+        plan = plan_review(
+            pack=collected.pack,
+            build_prompt=lambda packed: build_review_prompt(packed, reviewable_files, since, related),
+            depths=[(depth, build_system_prompt(depth), DEPTH_MAX_TOKENS[depth]) for depth in ("full", "quick")],
+            model=model,
+            limit=COST_LIMIT,
+        )
+        packed = plan.packed
+        span.update(prompt_bytes=len(plan.prompt.encode()), skipped_files=len(skipped) + len(packed.skipped),
+                    plan=plan.action, estimated_cost=round(plan.estimated_cost, 6))
+    print(f"Packed ~{packed.tokens}/{packed.budget} diff tokens, {len(packed.omitted)} files omitted, "
+          f"{len(packed.skipped)} trivial")
+    
+    if packed.is_empty and packed.skipped:
+        print("Only whitespace/generated changes left, skipping review")
+        run.labels["outcome"] = "skipped"
+        sys.exit(0)
+    
+    if plan.refused:
+        print(f"Estimated worst-case cost (${plan.estimated_cost:.3f}) exceeds limit (${COST_LIMIT})")
+        print("Skipping this review. Consider increasing COST_LIMIT.")
+        run.labels["outcome"] = "over_budget"
+        sys.exit(0)
+    if plan.action != "full":
+        print(f"Fitted under ${COST_LIMIT}: {plan.action} ({plan.depth} depth, "
+              f"worst case ${plan.estimated_cost:.3f})")
+    
+    # Progressive mode: a quick FAST_MODEL review is posted while the deep one runs
+    progressive = MODEL_ROUTING == "progressive" and not route.fast and FAST_MODEL != MODEL
+    estimated_cost = plan.estimated_cost
+    if progressive:
+        quick_cost = worst_case_cost(build_system_prompt("quick"), plan.prompt, DEPTH_MAX_TOKENS["quick"], FAST_MODEL)
+        if COST_LIMIT and estimated_cost + quick_cost > COST_LIMIT:
+            print(f"No quick {FAST_MODEL} pass: it would exceed ${COST_LIMIT}")
+            progressive = False
+        else:
+            estimated_cost += quick_cost
     
     # Get review
     print("Calling Claude API...")
     start_time = time.time()
-    review, cost = review_with_claude(prompt)
+    if not progressive:
+        with run.span("model"):
+            review, cost = review_with_claude(plan.prompt, plan.depth, model)
+    else:
+        with ThreadPoolExecutor(max_workers=1) as deep_runner:
+            deep = deep_runner.submit(contextvars.copy_context().run, review_with_claude,
+                                      plan.prompt, plan.depth, model)
+            with run.span("model_quick"):
+                quick, quick_cost = review_with_claude(plan.prompt, "quick", FAST_MODEL)
+            if quick:
+                with run.span("post_quick"):
+                    summary = post_review_comment(quick, quick_cost, time.time() - start_time, since, summary,
+                                                  FAST_MODEL, preliminary_for=model) or summary
+            with run.span("model"):
+                review, cost = deep.result()
+            cost += quick_cost
     review_time = time.time() - start_time
+    print(f"Review completed in {review_time:.1f}s")
     
     if not review:
         print("Review failed")
+        run.labels["outcome"] = "error"
         sys.exit(1)
     
-    # Check cost limit
-    if cost > COST_LIMIT:
-        print(f"Review cost (${cost:.3f}) exceeds limit (${COST_LIMIT})")
-        print("Skipping this review. Consider increasing COST_LIMIT.")
-        sys.exit(0)
+    # The plan is a worst-case bound, so this only trips if the estimate was off
+    if cost > estimated_cost:
+        print(f"⚠️ Review cost (${cost:.3f}) exceeded the pre-flight estimate; posting anyway")
     
     # Post comment
     print("Posting review comment...")
-    post_review_comment(review, cost, review_time)
+    with run.span("post"):
+        post_review_comment(review, cost, review_time, since, summary, model)
     
     print("Done!")
 
@@ -0,0 +1,101 @@
+"""
+Index of the bot's existing PR comments
+Built by Jackson Studio
+
+Every inline finding the bot posts carries a hidden fingerprint of its
+file, anchor (the code on the commented line) and normalized message.
+The PR's comments are fetched once per run and indexed by fingerprint,
+so a re-run only posts findings that are new, and the summary comment
+(the newest one with a review marker) is edited in place rather than
+posted again. Skip notices (too many files, over the cost limit) carry
+their own marker and are likewise edited rather than repeated on every
+push. Only the bot's own comments are indexed: a quoted marker
+in someone else's comment must neither hide a finding nor be edited.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from reviewers.incremental import MARKER_RE, is_bot_comment
+from utils.diff_parser import FileDiff
+
+FINDING_RE = re.compile(r'<!-- ai-review:finding=([0-9a-f]{12}) -->')
+NOTICE_MARKER = "<!-- ai-review:notice -->"
+
+# "line 42", "lines 3-5": positions move between pushes, findings don't
+LINE_REF_RE = re.compile(r'\blines?\s+\d+(?:\s*[-–]\s*\d+)?', re.I)
+
+
+def finding_marker(fingerprint: str) -> str:
+    """Hidden marker identifying an inline finding"""
+    return f"<!-- ai-review:finding={fingerprint} -->"
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase words only, without line references or punctuation"""
+    return " ".join(re.findall(r'[a-z0-9_]+', LINE_REF_RE.sub(" ", message.lower())))
+
+
+def diff_anchors(file_diffs: Iterable[FileDiff]) -> Dict[Tuple[str, int], str]:
+    """(path, new line number) -> code on that line, for lines visible in the diff"""
+    anchors = {}
+    for fd in file_diffs:
+        for hunk in fd.hunks:
+            number = hunk.new_start
+            for line in hunk.lines:
+                if line.startswith(("-", "\\")):
+                    continue
+                anchors[(fd.path, number)] = line[1:]
+                number += 1
+    return anchors
+
+
+def finding_fingerprint(issue: Dict, anchors: Optional[Dict[Tuple[str, int], str]] = None) -> str:
+    """Stable id of a finding: file, anchor and normalized message
+
+    The anchor is the whitespace-normalized code on the commented line,
+    so the fingerprint survives the line moving; without it the line
+    number is used.
+    """
+    path = issue.get('file') or ""
+    try:
+        line = int(issue.get('line') or 0)
+    except (TypeError, ValueError):
+        line = 0
+    code = (anchors or {}).get((path, line), "")
+    anchor = " ".join(code.split()) or f"line {line}"
+    key = "\n".join([path, anchor, normalize_message(issue.get('message') or "")])
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+@dataclass
+class CommentIndex:
+    """The bot's findings (by fingerprint), summary and skip notice comments on one PR"""
+    findings: Dict[str, Dict] = field(default_factory=dict)
+    summary: Optional[Dict] = None
+    notice: Optional[Dict] = None
+
+
+def index_comments(issue_comments: List[Dict], review_comments: List[Dict],
+                   bot_login: Optional[str] = None) -> CommentIndex:
+    """Index the bot's comments from the issue and review comment endpoints
+
+    Inline findings that failed to post inline fall back to issue
+    comments, so both lists are searched for finding markers.
+    """
+    index = CommentIndex()
+    issue_comments = [c for c in issue_comments if is_bot_comment(c, bot_login)]
+    review_comments = [c for c in review_comments if is_bot_comment(c, bot_login)]
+    for comment in review_comments + issue_comments:
+        for fingerprint in FINDING_RE.findall(comment.get('body') or ""):
+            index.findings.setdefault(fingerprint, comment)
+
+    for comment in reversed(issue_comments):
+        body = comment.get('body') or ""
+        if index.summary is None and MARKER_RE.search(body):
+            index.summary = comment
+        if index.notice is None and NOTICE_MARKER in body:
+            index.notice = comment
+    return index
@@ -0,0 +1,84 @@
+"""
+Pre-flight cost planning
+Built by Jackson Studio
+
+Estimates the worst-case cost of a review request before it is sent and
+fits it under COST_LIMIT up front: first by dropping to a cheaper review
+depth (fewer output tokens), then by shrinking the diff budget, and
+refusing only when even a minimal review would not fit.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from reviewers.prompt_builder import PackedDiff, estimate_tokens, token_budget_for
+from utils.cost_tracker import calculate_cost, pricing_for
+
+# Below this many diff tokens a review isn't worth paying for
+MIN_DIFF_TOKENS = 1000
+
+# Headroom for the chars-per-token estimate being off
+ESTIMATE_MARGIN = 1.10
+
+
+@dataclass
+class ReviewPlan:
+    """What to send, and what it may cost at most"""
+    packed: PackedDiff
+    prompt: str
+    depth: str
+    max_tokens: int
+    estimated_cost: float
+    action: str  # "full", "reduced-depth", "shrunk" or "refused"
+
+    @property
+    def refused(self) -> bool:
+        return self.action == "refused"
+
+
+def worst_case_cost(system: str, prompt: str, max_tokens: int, model: str) -> float:
+    """Upper bound for one request: system block written to cache, full max_tokens output"""
+    usage = {
+        "input_tokens": int(estimate_tokens(prompt) * ESTIMATE_MARGIN),
+        "cache_creation_input_tokens": int(estimate_tokens(system) * ESTIMATE_MARGIN),
+        "output_tokens": max_tokens,
+    }
+    return calculate_cost(usage, model)
+
+
+def plan_review(pack: Callable[[int], PackedDiff], build_prompt: Callable[[PackedDiff], str],
+                depths: List[Tuple[str, str, int]], model: str, limit: Optional[float]) -> ReviewPlan:
+    """Pick the richest request whose worst-case cost fits under limit
+
+    pack(token_budget) packs the diff, build_prompt(packed) renders the
+    user prompt, and depths lists (depth, system text, max_tokens) from
+    preferred to cheapest. A falsy limit disables planning.
+    """
+    full_budget = token_budget_for(model)
+    packed = pack(full_budget)
+    prompt = build_prompt(packed)
+
+    cost = 0.0
+    for index, (depth, system, max_tokens) in enumerate(depths):
+        cost = worst_case_cost(system, prompt, max_tokens, model)
+        if not limit or cost <= limit:
+            action = "full" if index == 0 else "reduced-depth"
+            return ReviewPlan(packed, prompt, depth, max_tokens, cost, action)
+
+    # Cheapest depth still too expensive: spend what's left on a smaller diff
+    depth, system, max_tokens = depths[-1]
+    input_price = pricing_for(model)["input"] / 1_000_000
+    overhead = cost - packed.tokens * ESTIMATE_MARGIN * input_price
+    affordable = int((limit - overhead) / (input_price * ESTIMATE_MARGIN))
+
+    while affordable >= MIN_DIFF_TOKENS:
+        shrunk = pack(min(affordable, full_budget))
+        shrunk_prompt = build_prompt(shrunk)
+        shrunk_cost = worst_case_cost(system, shrunk_prompt, max_tokens, model)
+        if shrunk.is_empty:
+            break
+        if shrunk_cost <= limit:
+            return ReviewPlan(shrunk, shrunk_prompt, depth, max_tokens, shrunk_cost, "shrunk")
+        affordable = int(affordable * 0.9)
+
+    return ReviewPlan(packed, prompt, depth, max_tokens, cost, "refused")
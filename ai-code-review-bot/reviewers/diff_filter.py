@@ -0,0 +1,204 @@
+"""
+Pre-review diff filter
+Built by Jackson Studio
+
+Classifies changes locally before anything is sent to the model:
+ignore globs from config.json (plus SKIP_PATTERNS), vendored and
+generated files, pure renames and whitespace-only hunks. A PR where
+nothing survives never reaches the model; a mixed PR only sends the
+meaningful hunks.
+"""
+
+import json
+import os
+import re
+from dataclasses import replace
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.diff_parser import FileDiff, Hunk
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+
+VENDORED_RE = re.compile(
+    r'(^|/)(vendor|third[_-]party|node_modules|bower_components|Pods|external)/'
+)
+
+GENERATED_PATH_RE = re.compile(
+    r'\.generated\.|_pb2(_grpc)?\.py$|\.pb\.go$|\.pb\.(h|cc)$|_generated\.go$|'
+    r'\.min\.(js|css)$|\.map$|(^|/)(dist|build)/|'
+    r'(^|/)(package-lock\.json|yarn\.lock|pnpm-lock\.yaml|Pipfile\.lock|poetry\.lock|'
+    r'Cargo\.lock|Gemfile\.lock|composer\.lock|go\.sum)$'
+)
+
+# Markers code generators put near the top of a file
+GENERATED_MARKER_RE = re.compile(r'@generated|DO NOT EDIT|(?i:code generated by|auto-?generated)')
+MARKER_SCAN_LINES = 10
+
+# Languages where indentation changes meaning: only trailing whitespace
+# and blank lines count as whitespace-only there. Elsewhere re-indenting
+# does too; whitespace inside a line never does (`rm -rf / tmp`, strings)
+INDENT_SENSITIVE = {".py", ".yml", ".yaml", ".mk", ".haml", ".pug", ".coffee"}
+
+
+@lru_cache(maxsize=1)
+def load_config() -> Dict:
+    """config.json next to the bot (empty if missing or unreadable)"""
+    try:
+        with open(CONFIG_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def ignore_patterns() -> Tuple[str, ...]:
+    """Globs from config.json ignore_patterns plus the SKIP_PATTERNS env var"""
+    patterns = list(load_config().get("ignore_patterns", []))
+    patterns += [p.strip() for p in os.environ.get("SKIP_PATTERNS", "").split(",") if p.strip()]
+    return tuple(patterns)
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate one gitignore-style glob to a regex fragment
+
+    `**` crosses directories, `*` and `?` don't. Unless the glob starts
+    with "/", it may match at any directory level (so "dist/**" also
+    covers "packages/web/dist/app.js").
+    """
+    anchored = pattern.startswith("/")
+    pattern = pattern.lstrip("/")
+
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+
+    return ("^" if anchored else "(?:^|/)") + "".join(out) + "$"
+
+
+@lru_cache(maxsize=8)
+def compile_globs(patterns: Tuple[str, ...]) -> Optional["re.Pattern"]:
+    """All globs as one alternation, so each path is matched once"""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{glob_to_regex(p)})" for p in patterns))
+
+
+def path_skip_reason(path: str, patterns: Optional[Iterable[str]] = None) -> Optional[str]:
+    """Why a path is not worth reviewing, from its name alone (None = review it)"""
+    matcher = compile_globs(tuple(patterns) if patterns is not None else ignore_patterns())
+    if matcher and matcher.search(path):
+        return "ignored"
+    if VENDORED_RE.search(path):
+        return "vendored"
+    if GENERATED_PATH_RE.search(path):
+        return "generated"
+    return None
+
+
+def file_skip_reason(file: Dict, patterns: Optional[Iterable[str]] = None) -> Optional[str]:
+    """Classify an entry from the PR files API (no diff download needed)"""
+    reason = path_skip_reason(file['filename'], patterns)
+    if reason:
+        return reason
+    if file.get('status') == "renamed" and not file.get('changes'):
+        return "rename-only"
+    return None
+
+
+def filter_files(files: List[Dict], patterns: Optional[Iterable[str]] = None) -> Tuple[List[Dict], List[Dict]]:
+    """Split PR file entries into (reviewable, skipped)"""
+    kept, skipped = [], []
+    for f in files:
+        reason = file_skip_reason(f, patterns)
+        if reason:
+            skipped.append({
+                "file": f['filename'],
+                "additions": f.get('additions', 0),
+                "deletions": f.get('deletions', 0),
+                "reason": reason,
+            })
+        else:
+            kept.append(f)
+    return kept, skipped
+
+
+def _normalize(lines: List[str], indent_sensitive: bool) -> List[str]:
+    normalized = [line.rstrip() if indent_sensitive else line.strip() for line in lines]
+    return [line for line in normalized if line.strip()]
+
+
+def is_whitespace_only(hunk: Hunk, path: str) -> bool:
+    """True if the hunk's removed and added lines differ only in whitespace"""
+    removed = [line[1:] for line in hunk.lines if line.startswith("-")]
+    added = [line[1:] for line in hunk.lines if line.startswith("+")]
+    if not removed and not added:
+        return False
+
+    sensitive = os.path.splitext(path)[1].lower() in INDENT_SENSITIVE
+    return _normalize(removed, sensitive) == _normalize(added, sensitive)
+
+
+def has_generated_marker(fd: FileDiff) -> bool:
+    """Generator banner in the first lines of the new file"""
+    for hunk in fd.hunks:
+        if hunk.new_start <= 1:
+            head = [line for line in hunk.lines if not line.startswith("-")][:MARKER_SCAN_LINES]
+            return any(GENERATED_MARKER_RE.search(line) for line in head)
+    return False
+
+
+def classify_file_diff(fd: FileDiff, patterns: Optional[Iterable[str]] = None) -> Tuple[Optional[str], FileDiff]:
+    """Return (skip reason or None, file diff with trivial hunks dropped)"""
+    reason = path_skip_reason(fd.path, patterns)
+    if reason:
+        return reason, fd
+
+    if not fd.hunks and not fd.is_binary:
+        if any(line.startswith("rename from") for line in fd.header):
+            return "rename-only", fd
+        if any(line.startswith("old mode") for line in fd.header):
+            return "mode-only", fd
+        return None, fd
+
+    if has_generated_marker(fd):
+        return "generated", fd
+
+    meaningful = [h for h in fd.hunks if not is_whitespace_only(h, fd.path)]
+    if fd.hunks and not meaningful:
+        return "whitespace-only", fd
+    if len(meaningful) < len(fd.hunks):
+        fd = replace(fd, hunks=meaningful)
+    return None, fd
+
+
+def filter_file_diffs(file_diffs: Iterable[FileDiff],
+                      patterns: Optional[Iterable[str]] = None) -> Tuple[List[FileDiff], List[Dict]]:
+    """Split parsed file diffs into (reviewable, skipped); keeps only meaningful hunks"""
+    kept, skipped = [], []
+    for fd in file_diffs:
+        reason, trimmed = classify_file_diff(fd, patterns)
+        if reason:
+            skipped.append({
+                "file": fd.path,
+                "additions": fd.additions,
+                "deletions": fd.deletions,
+                "reason": reason,
+            })
+        else:
+            kept.append(trimmed)
+    return kept, skipped
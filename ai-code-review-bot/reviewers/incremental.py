@@ -0,0 +1,60 @@
+"""
+Incremental review support
+Built by Jackson Studio
+
+The bot's summary comment carries a hidden marker with the head SHA it
+reviewed. On the next push only the commits since that SHA are reviewed,
+using the compare API, unless the branch history was rewritten (rebase,
+force push) or base was merged in, in which case a full review runs.
+Markers are only trusted in the bot's own comments; anyone else could
+post one to skip the review of their commits.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+MARKER_RE = re.compile(r'<!-- ai-review:head=([0-9a-f]{7,40}) -->')
+
+# The compare API lists at most this many files
+COMPARE_FILE_LIMIT = 300
+
+
+def review_marker(head_sha: str) -> str:
+    """Hidden marker recording which head SHA a comment covers"""
+    return f"<!-- ai-review:head={head_sha} -->"
+
+
+def is_bot_comment(comment: Dict, bot_login: Optional[str] = None) -> bool:
+    """True if the comment was posted by the bot
+
+    With bot_login (BOT_LOGIN, e.g. when running with a personal token)
+    the author must be that account; otherwise any GitHub App account
+    such as github-actions[bot] counts.
+    """
+    user = comment.get('user') or {}
+    if bot_login:
+        return user.get('login') == bot_login
+    return user.get('type') == "Bot"
+
+
+def last_reviewed_sha(comments: List[Dict], bot_login: Optional[str] = None) -> Optional[str]:
+    """Head SHA from the bot's newest comment carrying a review marker"""
+    for comment in reversed(comments):
+        if not is_bot_comment(comment, bot_login):
+            continue
+        match = MARKER_RE.search(comment.get('body') or "")
+        if match:
+            return match.group(1)
+    return None
+
+
+def is_fast_forward(compare: Dict) -> bool:
+    """True if head only adds the PR's own commits on top of the reviewed SHA
+
+    "diverged"/"behind" mean the reviewed SHA is no longer in the branch
+    history; merge commits would pull unrelated base changes into the
+    compare diff. Both need a full review.
+    """
+    if compare.get('status') != "ahead":
+        return False
+    return all(len(commit.get('parents', [])) <= 1 for commit in compare.get('commits', []))
@@ -0,0 +1,77 @@
+"""
+Model routing
+Built by Jackson Studio
+
+Picks the model for a review from what changed: small, low-risk diffs go
+to a fast, cheap model, large or sensitive ones to the deeper model. The
+first decision uses only the file list, before the diff is downloaded;
+risky constructs in the downloaded hunks escalate it. A fast route reads
+the diff with the deep model's budget, so an escalated review still sees
+everything the deep model would have.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+from reviewers.prompt_builder import hunk_score, risk_score, token_budget_for
+from utils.diff_parser import FileDiff
+
+ROUTING_MODES = ("off", "auto", "progressive")
+
+# Upper bounds for the fast tier
+FAST_MAX_CHANGED_LINES = 200
+FAST_MAX_FILES = 5
+
+# Path-only risk score from which a file is sensitive (auth, crypto, payments, migrations)
+SENSITIVE_RISK = 5.0
+
+
+@dataclass
+class Route:
+    """Which model reviews a PR, and why"""
+    model: str
+    tier: str  # "fast" or "deep"
+    reason: str
+
+    @property
+    def fast(self) -> bool:
+        return self.tier == "fast"
+
+
+def route_by_files(files: List[Dict], fast_model: str, deep_model: str) -> Route:
+    """Route on the changed-file list alone (sizes and path risk)"""
+    sensitive = [f['filename'] for f in files if risk_score(f['filename']) >= SENSITIVE_RISK]
+    if sensitive:
+        return Route(deep_model, "deep", f"sensitive path {sensitive[0]}")
+
+    changed = sum(f.get('additions', 0) + f.get('deletions', 0) for f in files)
+    if changed > FAST_MAX_CHANGED_LINES:
+        return Route(deep_model, "deep", f"{changed} changed lines")
+    if len(files) > FAST_MAX_FILES:
+        return Route(deep_model, "deep", f"{len(files)} files")
+
+    return Route(fast_model, "fast", f"{changed} changed lines in {len(files)} files, low risk")
+
+
+def escalate_for_content(route: Route, file_diffs: Iterable[FileDiff], deep_model: str) -> Route:
+    """Move a fast route to the deep model if any hunk touches risky constructs"""
+    if not route.fast:
+        return route
+    for fd in file_diffs:
+        if any(hunk_score(hunk) > 0 for hunk in fd.hunks):
+            return Route(deep_model, "deep", f"risky code in {fd.path}")
+    return route
+
+
+def download_budget(route: Route, deep_model: str) -> int:
+    """Token budget to collect the diff with; a fast route may still escalate to deep_model"""
+    if route.fast:
+        return max(token_budget_for(route.model), token_budget_for(deep_model))
+    return token_budget_for(route.model)
+
+
+def choose_route(mode: str, files: List[Dict], fast_model: str, deep_model: str) -> Route:
+    """Route for MODEL_ROUTING mode; "off" (or one model for both tiers) always uses deep_model"""
+    if mode not in ("auto", "progressive") or not fast_model or fast_model == deep_model:
+        return Route(deep_model, "deep", "routing off")
+    return route_by_files(files, fast_model, deep_model)
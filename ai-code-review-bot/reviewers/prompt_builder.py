@@ -0,0 +1,327 @@
+"""
+Prompt assembly
+Built by Jackson Studio
+
+Ranks changed files by a cheap risk score and packs the highest-value
+hunks into the model's diff budget. Anything that doesn't fit is listed
+in an explicit "omitted files" section instead of being silently cut.
+
+The static review instructions are kept separate from the per-PR diff so
+they can be sent as a prompt-cached system block.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from reviewers.diff_filter import filter_file_diffs, filter_files
+from utils.diff_parser import FileDiff, Hunk, iter_file_diffs
+
+PROMPT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "prompts", "review-prompt.txt")
+
+# Diff token budget per model family (prefix match on the model name)
+MODEL_TOKEN_BUDGETS = {
+    "claude-haiku": 8000,
+    "claude-sonnet": 16000,
+    "claude-opus": 24000,
+}
+DEFAULT_TOKEN_BUDGET = 8000
+
+# Rough chars-per-token ratio for code; good enough for budgeting
+CHARS_PER_TOKEN = 3.5
+
+# Download up to this multiple of the budget so packing still has a choice
+DOWNLOAD_SLACK = 2.0
+
+# Rough tokens per changed line, to size files before their diff is downloaded
+TOKENS_PER_CHANGED_LINE = 12
+
+HIGH_RISK_PATTERNS = [
+    (re.compile(r'auth|login|passw|secret|token|credential|session|oauth|jwt', re.I), 5.0),
+    (re.compile(r'crypt|security|permission|acl|sanitiz|csrf|xss', re.I), 4.0),
+    (re.compile(r'payment|billing|invoice|checkout', re.I), 3.0),
+    (re.compile(r'migration|schema|\.sql$|models?\.py$|query', re.I), 3.0),
+    (re.compile(r'(^|/)\.github/workflows/|dockerfile|\.env|settings\.|config\.', re.I), 2.0),
+    (re.compile(r'api|handler|controller|route|views?\.py$|middleware', re.I), 2.0),
+]
+
+LOW_RISK_PATTERNS = [
+    (re.compile(r'(^|/)(tests?|__tests__|spec)/|_test\.|\.test\.|\.spec\.|test_', re.I), -2.0),
+    (re.compile(r'\.(md|rst|txt)$|(^|/)docs?/', re.I), -3.0),
+    (re.compile(r'\.lock$|lock\.json$|lock\.yaml$|go\.sum$', re.I), -6.0),
+    (re.compile(r'\.snap$|__snapshots__/|\.svg$|\.min\.(js|css)$', re.I), -5.0),
+]
+
+LANGUAGE_WEIGHTS = {
+    ".py": 1.5, ".js": 1.5, ".ts": 1.5, ".tsx": 1.3, ".jsx": 1.3,
+    ".go": 1.5, ".rs": 1.5, ".java": 1.3, ".cs": 1.3, ".php": 1.5,
+    ".rb": 1.3, ".c": 1.5, ".cpp": 1.5, ".sh": 1.2, ".sql": 1.5,
+    ".yml": 0.5, ".yaml": 0.5, ".json": 0.0, ".css": 0.0, ".html": 0.5,
+}
+
+RISKY_CODE_RE = re.compile(
+    r'eval\(|exec\(|subprocess|os\.system|pickle|yaml\.load|innerHTML|'
+    r'dangerouslySetInnerHTML|SELECT |INSERT |UPDATE |DELETE |password|secret|token|'
+    r'verify\s*=\s*False|shell\s*=\s*True|unsafe',
+    re.I
+)
+
+
+@dataclass
+class PackedDiff:
+    """Result of packing a diff into a token budget"""
+    text: str
+    tokens: int
+    budget: int
+    included: List[str] = field(default_factory=list)
+    partial: List[str] = field(default_factory=list)
+    omitted: List[Dict] = field(default_factory=list)
+    skipped: List[Dict] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """Nothing left for the model to look at"""
+        return not self.included and not self.partial
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer round-trip)"""
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def token_budget_for(model: str) -> int:
+    """Diff token budget for a model; PROMPT_TOKEN_BUDGET overrides"""
+    override = os.environ.get("PROMPT_TOKEN_BUDGET")
+    if override:
+        return int(override)
+
+    for prefix, budget in MODEL_TOKEN_BUDGETS.items():
+        if model.startswith(prefix):
+            return budget
+    return DEFAULT_TOKEN_BUDGET
+
+
+def risk_score(path: str, additions: int = 0, deletions: int = 0) -> float:
+    """Score a file by path patterns, language and churn size"""
+    score = 1.0
+
+    for pattern, weight in HIGH_RISK_PATTERNS + LOW_RISK_PATTERNS:
+        if pattern.search(path):
+            score += weight
+
+    ext = os.path.splitext(path)[1].lower()
+    score += LANGUAGE_WEIGHTS.get(ext, 0.5)
+
+    # Churn helps, but with diminishing returns so huge files don't dominate
+    churn = additions + deletions
+    if churn:
+        score += min(churn, 400) ** 0.5 / 5
+
+    return score
+
+
+def hunk_score(hunk: Hunk) -> float:
+    """Bonus for hunks that touch risky constructs"""
+    changed = [line for line in hunk.lines if line[:1] in "+-"]
+    hits = sum(1 for line in changed if RISKY_CODE_RE.search(line))
+    return min(hits, 5) * 0.5
+
+
+def pack_diff(file_diffs: List[FileDiff], token_budget: int,
+              allowed_paths: Optional[List[str]] = None) -> PackedDiff:
+    """Pack the highest-value hunks into token_budget
+
+    Files are ranked by risk_score; within the budget, hunks are taken in
+    order of file score plus a per-hunk bonus. Selected hunks are rendered
+    back in their original order so line numbers stay readable.
+    """
+    if allowed_paths is not None:
+        allowed = set(allowed_paths)
+        file_diffs = [fd for fd in file_diffs if fd.path in allowed]
+
+    scores = {fd.path: risk_score(fd.path, fd.additions, fd.deletions) for fd in file_diffs}
+    ranked = sorted(file_diffs, key=lambda fd: scores[fd.path], reverse=True)
+
+    candidates = []
+    for fd in ranked:
+        header_cost = estimate_tokens("\n".join(fd.header))
+        for index, hunk in enumerate(fd.hunks):
+            value = scores[fd.path] + hunk_score(hunk)
+            candidates.append((value, fd, index, estimate_tokens(hunk.text) + 1, header_cost))
+    candidates.sort(key=lambda c: c[0], reverse=True)
+
+    selected: Dict[str, List[int]] = {}
+    used = 0
+    for _value, fd, index, cost, header_cost in candidates:
+        extra = cost if fd.path in selected else cost + header_cost
+        if used + extra > token_budget:
+            continue
+        selected.setdefault(fd.path, []).append(index)
+        used += extra
+
+    sections = []
+    packed = PackedDiff(text="", tokens=used, budget=token_budget)
+    for fd in ranked:
+        indexes = sorted(selected.get(fd.path, []))
+        if not indexes:
+            if fd.is_binary:
+                reason = "binary file"
+            elif not fd.hunks:
+                reason = "no textual changes"
+            else:
+                reason = "over token budget"
+            packed.omitted.append({
+                "file": fd.path,
+                "additions": fd.additions,
+                "deletions": fd.deletions,
+                "reason": reason,
+            })
+            continue
+
+        sections.append(fd.render([fd.hunks[i] for i in indexes]))
+        if len(indexes) < len(fd.hunks) or fd.truncated:
+            packed.partial.append(fd.path)
+        else:
+            packed.included.append(fd.path)
+
+    packed.text = "\n".join(sections)
+    return packed
+
+
+@dataclass
+class CollectedDiff:
+    """The reviewable part of a PR diff, read with a bounded amount of memory"""
+    file_diffs: List[FileDiff] = field(default_factory=list)
+    skipped: List[Dict] = field(default_factory=list)
+    not_downloaded: List[Dict] = field(default_factory=list)
+    cut_off: bool = False  # stopped reading before the end of the diff
+
+    def pack(self, token_budget: int) -> PackedDiff:
+        packed = pack_diff(self.file_diffs, token_budget)
+        packed.omitted += self.not_downloaded
+        packed.skipped = list(self.skipped)
+        return packed
+
+
+def _omitted_entry(f: Dict, reason: str) -> Dict:
+    return {"file": f['filename'], "additions": f.get('additions', 0),
+            "deletions": f.get('deletions', 0), "reason": reason}
+
+
+def select_downloads(files: List[Dict], token_budget: int) -> Tuple[Set[str], List[Dict]]:
+    """Choose whose diffs to read, by risk score and size from the file list alone"""
+    cap = token_budget * DOWNLOAD_SLACK
+    ranked = sorted(files, key=lambda f: risk_score(f['filename'], f.get('additions', 0), f.get('deletions', 0)),
+                    reverse=True)
+
+    selected, left_out, used = set(), [], 0
+    for f in ranked:
+        changes = f.get('changes') or f.get('additions', 0) + f.get('deletions', 0)
+        # Big files are read only up to the budget, so never count more than that
+        estimate = min(max(changes, 1) * TOKENS_PER_CHANGED_LINE, token_budget)
+        if used + estimate > cap:
+            left_out.append(_omitted_entry(f, "over token budget"))
+            continue
+        selected.add(f['filename'])
+        used += estimate
+    return selected, left_out
+
+
+def collect_pr_diff(lines: Iterable[str], files: List[Dict], token_budget: int) -> CollectedDiff:
+    """Read diff lines (e.g. streamed from GitHub), keeping only what may be reviewed
+
+    Trivial and low-value files are dropped without being stored, each file
+    is read up to the budget, and reading stops as soon as every selected
+    file has been seen or DOWNLOAD_SLACK times the budget has been read.
+    """
+    reviewable, skipped = filter_files(files)
+    wanted, not_downloaded = select_downloads(reviewable, token_budget)
+    remaining = set(wanted)
+    max_chars = int(token_budget * CHARS_PER_TOKEN)
+    collected = CollectedDiff(skipped=skipped, not_downloaded=not_downloaded)
+
+    exhausted = False
+
+    def source() -> Iterator[str]:
+        nonlocal exhausted
+        yield from lines
+        exhausted = True
+
+    read = 0
+    for fd in iter_file_diffs(source(), keep=remaining.__contains__, max_file_chars=max_chars):
+        remaining.discard(fd.path)
+        kept, trivial = filter_file_diffs([fd])
+        collected.file_diffs += kept
+        collected.skipped += trivial
+        read += sum(len(h.text) for h in fd.hunks)
+
+        if not remaining:
+            # The last wanted file may also be the last one in the diff
+            collected.cut_off = not exhausted
+            break
+        if read > max_chars * DOWNLOAD_SLACK:
+            by_name = {f['filename']: f for f in reviewable}
+            collected.not_downloaded += [_omitted_entry(by_name[path], "over token budget")
+                                         for path in sorted(remaining)]
+            collected.cut_off = True
+            break
+
+    return collected
+
+
+def pack_pr_diff(diff: Iterable[str], files: List[Dict], model: str,
+                 token_budget: Optional[int] = None) -> PackedDiff:
+    """Parse a PR diff (string or lines), drop trivial changes and pack the rest for model
+
+    Files skipped by the pre-review filter (ignored, generated, vendored,
+    rename- or whitespace-only) are reported in packed.skipped.
+    """
+    lines = diff.splitlines() if isinstance(diff, str) else diff
+    token_budget = token_budget or token_budget_for(model)
+    return collect_pr_diff(lines, files, token_budget).pack(token_budget)
+
+
+def format_omitted_section(packed: PackedDiff) -> str:
+    """Markdown section listing what the model did not see"""
+    if not packed.omitted and not packed.partial and not packed.skipped:
+        return ""
+
+    lines = ["## Omitted Files",
+             "The following changes were not included in the diff above. "
+             "Do not report issues for code you cannot see."]
+    for entry in packed.omitted + packed.skipped:
+        lines.append(f"- {entry['file']} (+{entry['additions']} -{entry['deletions']}, {entry['reason']})")
+    for path in packed.partial:
+        lines.append(f"- {path} (some hunks omitted, over token budget)")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def load_review_guidelines(include_output_format: bool = True) -> str:
+    """Load prompts/review-prompt.txt (optionally without its JSON output section)"""
+    if not os.path.exists(PROMPT_FILE):
+        return ""
+
+    with open(PROMPT_FILE, encoding="utf-8") as f:
+        text = f.read().strip()
+
+    if not include_output_format:
+        text = text.split("## Output Format")[0].strip()
+    return text
+
+
+def cached_system_blocks(text: str) -> List[Dict]:
+    """Wrap the static instruction prefix as a prompt-cacheable system block
+
+    The block must be byte-identical across calls for cache hits, so it may
+    only contain per-deployment settings, never per-PR data. Prefixes below
+    the model's minimum cacheable length are simply processed uncached.
+    """
+    return [{
+        "type": "text",
+        "text": text,
+        "cache_control": {"type": "ephemeral"},
+    }]
@@ -0,0 +1,445 @@
+"""
+Repository symbol index
+Built by Jackson Studio
+
+Indexes definitions and call sites in the checked-out repository so a
+review can see the callers and callees of the changed code, not just the
+changed lines. Python is parsed with ast; the other languages listed in
+config.json's language_specific use regex fallbacks.
+
+Parse results are cached per file blob in a JSON file stamped with the
+commit it was built for: the same commit loads the cache as is, a new
+commit only re-parses the files whose blob changed. The checkout is only
+used when it is the PR's repository at the PR's head (or merge) commit;
+a service reviewing many PRs from one checkout gets no context rather
+than code from the wrong tree.
+"""
+
+import ast
+import json
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from reviewers.diff_filter import load_config, path_skip_reason
+from reviewers.prompt_builder import estimate_tokens, token_budget_for
+from utils import metrics
+from utils.diff_parser import FileDiff
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = os.path.join(".git", "ai-review-symbols.json")
+
+# Share of the diff token budget that related code may use on top
+CONTEXT_BUDGET_SHARE = 0.25
+
+MAX_INDEX_FILE_BYTES = 512 * 1024
+MAX_DEFINITIONS = 2       # more than this and the name is too ambiguous to resolve
+MAX_CALL_SITES = 5        # per changed symbol
+DEFINITION_LINES = 30     # longest definition excerpt
+CALL_SITE_CONTEXT = 2     # lines around each call site
+
+# owner/repo at the end of an origin URL (https or ssh)
+REMOTE_RE = re.compile(r'[/:]([^/:]+/[^/]+?)(?:\.git)?/?$')
+
+# Indexes already loaded in this process (webhook server), by (root, commit)
+_loaded: Dict[Tuple[str, str], "SymbolIndex"] = {}
+
+LANGUAGE_EXTENSIONS = {
+    "python": (".py",),
+    "javascript": (".js", ".jsx", ".mjs", ".cjs"),
+    "typescript": (".ts", ".tsx"),
+    "go": (".go",),
+    "rust": (".rs",),
+}
+
+_JS_DEFINITIONS = [
+    ("function", re.compile(r'^\s*(?:export\s+(?:default\s+)?)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)')),
+    ("class", re.compile(r'^\s*(?:export\s+(?:default\s+)?)?(?:abstract\s+)?class\s+([A-Za-z_$][\w$]*)')),
+    ("function", re.compile(r'^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*(?::[^=]+)?=\s*'
+                            r'(?:async\s+)?(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|[A-Za-z_$][\w$]*\s*=>)')),
+    ("method", re.compile(r'^\s+(?:(?:public|private|protected|static|async|readonly|override)\s+)*'
+                          r'([A-Za-z_$][\w$]*)\s*\([^)]*\)\s*(?::[^{]+)?\{\s*$')),
+]
+
+# Regex fallbacks: (kind, pattern with the symbol name as group 1)
+DEFINITION_PATTERNS = {
+    "javascript": _JS_DEFINITIONS,
+    "typescript": _JS_DEFINITIONS + [
+        ("type", re.compile(r'^\s*(?:export\s+)?(?:declare\s+)?(?:interface|type|enum)\s+([A-Za-z_$][\w$]*)')),
+    ],
+    "go": [
+        ("function", re.compile(r'^func\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)')),
+        ("type", re.compile(r'^type\s+([A-Za-z_]\w*)')),
+    ],
+    "rust": [
+        ("function", re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:const\s+)?(?:async\s+)?(?:unsafe\s+)?'
+                                r'(?:extern\s+"[^"]*"\s+)?fn\s+([A-Za-z_]\w*)')),
+        ("type", re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|trait|type|union)\s+([A-Za-z_]\w*)')),
+    ],
+}
+
+CALL_RE = re.compile(r'(?<![\w$])([A-Za-z_$][\w$]*)\s*\(')
+
+# Control-flow keywords and the like that look like calls to CALL_RE
+NOT_CALLS = {
+    "if", "for", "while", "switch", "catch", "return", "function", "typeof", "new", "await", "match",
+    "fn", "func", "loop", "sizeof", "super", "constructor", "defer", "go", "select",
+}
+
+
+def language_for(path: str) -> Optional[str]:
+    """Indexed language for a path, limited to config.json's language_specific"""
+    ext = os.path.splitext(path)[1].lower()
+    languages = load_config().get("language_specific") or LANGUAGE_EXTENSIONS
+    for language in languages:
+        if ext in LANGUAGE_EXTENSIONS.get(language, ()):
+            return language
+    return None
+
+
+@dataclass
+class Symbol:
+    """A definition site"""
+    name: str
+    kind: str
+    path: str
+    line: int
+    end_line: int
+
+
+def parse_python(source: str) -> Tuple[List[list], Dict[str, List[int]]]:
+    """Definitions and calls of a Python file via ast"""
+    tree = ast.parse(source)
+    defs, calls = [], {}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            defs.append([node.name, "function", node.lineno, node.end_lineno])
+        elif isinstance(node, ast.ClassDef):
+            defs.append([node.name, "class", node.lineno, node.end_lineno])
+        elif isinstance(node, ast.Call):
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+            if name:
+                calls.setdefault(name, []).append(node.lineno)
+    defs.sort(key=lambda d: d[2])
+    return defs, calls
+
+
+def parse_with_patterns(source: str, language: str) -> Tuple[List[list], Dict[str, List[int]]]:
+    """Definitions and calls via the regex fallback for language
+
+    A definition is taken to run until the next one starts, which is
+    enough to tell which symbol a changed line belongs to.
+    """
+    patterns = DEFINITION_PATTERNS.get(language, [])
+    lines = source.splitlines()
+    defs, calls = [], {}
+    for number, line in enumerate(lines, 1):
+        defined = None
+        for kind, pattern in patterns:
+            match = pattern.match(line)
+            if match and match.group(1) not in NOT_CALLS:
+                defined = match.group(1)
+                defs.append([defined, kind, number, len(lines)])
+                break
+        for name in CALL_RE.findall(line):
+            if name != defined and name not in NOT_CALLS:
+                calls.setdefault(name, []).append(number)
+    for current, following in zip(defs, defs[1:]):
+        current[3] = max(current[2], following[2] - 1)
+    return defs, calls
+
+
+def parse_file(root: str, path: str, blob: str, language: str) -> Dict:
+    """Cache entry for one file: blob, language, definitions and calls"""
+    entry = {"blob": blob, "language": language, "defs": [], "calls": {}}
+    try:
+        with open(os.path.join(root, path), encoding="utf-8", errors="replace") as f:
+            source = f.read()
+        if language == "python":
+            entry["defs"], entry["calls"] = parse_python(source)
+        else:
+            entry["defs"], entry["calls"] = parse_with_patterns(source, language)
+    except (OSError, SyntaxError, ValueError, RecursionError):
+        pass  # unreadable or unparsable: indexed as empty so it isn't retried
+    return entry
+
+
+def git(root: str, *args: str) -> str:
+    return subprocess.run(["git", "-C", root, *args], capture_output=True, text=True, check=True).stdout
+
+
+def tracked_blobs(root: str) -> Dict[str, Tuple[str, str]]:
+    """path -> (blob SHA, language) for tracked, indexable files"""
+    blobs = {}
+    for record in git(root, "ls-files", "-s", "-z").split("\0"):
+        if not record:
+            continue
+        meta, path = record.split("\t", 1)
+        mode, blob, _ = meta.split()
+        if mode in ("120000", "160000"):  # symlinks and submodules
+            continue
+        language = language_for(path)
+        if language is None or path_skip_reason(path):
+            continue
+        try:
+            if os.path.getsize(os.path.join(root, path)) > MAX_INDEX_FILE_BYTES:
+                continue
+        except OSError:
+            continue
+        blobs[path] = (blob, language)
+    return blobs
+
+
+class SymbolIndex:
+    """Definitions and call sites of one commit of a repository"""
+
+    def __init__(self, root: str, commit: str, files: Dict[str, Dict], parsed: int = 0):
+        self.root = root
+        self.commit = commit
+        self.files = files
+        self.parsed = parsed  # files (re-)parsed while building
+        self._definitions = None
+        self._calls = None
+        self._sources = {}
+
+    def definitions(self, name: str) -> List[Symbol]:
+        if self._definitions is None:
+            self._definitions = {}
+            for path, entry in self.files.items():
+                for def_name, kind, line, end_line in entry["defs"]:
+                    self._definitions.setdefault(def_name, []).append(Symbol(def_name, kind, path, line, end_line))
+        return self._definitions.get(name, [])
+
+    def call_sites(self, name: str) -> List[Tuple[str, int]]:
+        if self._calls is None:
+            self._calls = {}
+            for path, entry in self.files.items():
+                for call_name, lines in entry["calls"].items():
+                    self._calls.setdefault(call_name, []).extend((path, line) for line in lines)
+        return self._calls.get(name, [])
+
+    def symbols_in(self, path: str) -> List[Symbol]:
+        entry = self.files.get(path)
+        if not entry:
+            return []
+        return [Symbol(name, kind, path, line, end_line) for name, kind, line, end_line in entry["defs"]]
+
+    def lines(self, path: str, start: int, end: int) -> List[str]:
+        """Source lines start..end (1-based, inclusive) from the working tree"""
+        if path not in self._sources:
+            try:
+                with open(os.path.join(self.root, path), encoding="utf-8", errors="replace") as f:
+                    self._sources[path] = f.read().splitlines()
+            except OSError:
+                self._sources[path] = []
+        return self._sources[path][max(start, 1) - 1:end]
+
+
+def _read_cache(cache_path: str) -> Dict:
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get("version") == CACHE_VERSION else {}
+
+
+def _write_cache(cache_path: str, commit: str, files: Dict[str, Dict]):
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "commit": commit, "files": files}, f, separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️ Could not write symbol cache {cache_path}: {e}")
+
+
+def load_symbol_index(root: str, cache_path: Optional[str] = None) -> Optional[SymbolIndex]:
+    """Index of root's HEAD, reusing cached parse results for unchanged blobs
+
+    Returns None if root is not a git checkout.
+    """
+    try:
+        commit = git(root, "rev-parse", "HEAD").strip()
+    except (OSError, subprocess.CalledProcessError):
+        print(f"⚠️ {root} is not a git checkout, reviewing without repository context")
+        return None
+
+    if (root, commit) in _loaded:
+        return _loaded[(root, commit)]
+
+    cache_path = cache_path or os.path.join(root, DEFAULT_CACHE_FILE)
+    cache = _read_cache(cache_path)
+    if cache.get("commit") == commit:
+        index = _loaded[(root, commit)] = SymbolIndex(root, commit, cache["files"])
+        return index
+
+    by_blob = {(entry["blob"], entry["language"]): entry for entry in cache.get("files", {}).values()}
+    files, parsed = {}, 0
+    for path, (blob, language) in tracked_blobs(root).items():
+        entry = by_blob.get((blob, language))
+        if entry is None:
+            entry = parse_file(root, path, blob, language)
+            parsed += 1
+        files[path] = entry
+
+    _write_cache(cache_path, commit, files)
+    metrics.current().incr("symbol_files_parsed", parsed)
+    print(f"🗂️ Symbol index for {commit[:7]}: {len(files)} files, {parsed} parsed")
+    index = _loaded[(root, commit)] = SymbolIndex(root, commit, files, parsed)
+    return index
+
+
+def changed_lines(fd: FileDiff) -> Set[int]:
+    """New-file line numbers touched by a file diff (deletions count for the line after)"""
+    touched = set()
+    for hunk in fd.hunks:
+        number = hunk.new_start
+        for line in hunk.lines:
+            if line.startswith("+"):
+                touched.add(number)
+                number += 1
+            elif line.startswith("-"):
+                touched.add(number)
+            elif not line.startswith("\\"):
+                number += 1
+    return touched
+
+
+def added_calls(fd: FileDiff) -> List[str]:
+    """Names called on the added lines, in order of appearance"""
+    names = []
+    for hunk in fd.hunks:
+        for line in hunk.lines:
+            if line.startswith("+"):
+                names += [name for name in CALL_RE.findall(line[1:]) if name not in NOT_CALLS]
+    return list(dict.fromkeys(names))
+
+
+def changed_symbols(index: SymbolIndex, fd: FileDiff) -> List[Symbol]:
+    """Innermost definitions containing a changed line (the method, not its class)"""
+    symbols = index.symbols_in(fd.path)
+    changed = {}
+    for line in sorted(changed_lines(fd)):
+        containing = [s for s in symbols if s.line <= line <= s.end_line]
+        if containing:
+            innermost = max(containing, key=lambda s: s.line)
+            changed[(innermost.name, innermost.line)] = innermost
+    return list(changed.values())
+
+
+def _is_resolvable(name: str) -> bool:
+    return len(name) > 2 and not (name.startswith("__") and name.endswith("__"))
+
+
+def _fence(index: SymbolIndex, path: str) -> str:
+    return (index.files.get(path, {}).get("language") or "").replace("javascript", "js")
+
+
+def related_context(index: SymbolIndex, file_diffs: Iterable[FileDiff], token_budget: int) -> str:
+    """Markdown section with definitions and call sites related to the diff
+
+    Definitions of functions the added lines call come first, then call
+    sites of the symbols the diff changes. Code already inside the diff
+    is not repeated, and names defined in many places are left out as
+    ambiguous. Entries are added until token_budget is used up.
+    """
+    file_diffs = list(file_diffs)
+    touched = {fd.path: changed_lines(fd) for fd in file_diffs}
+
+    def in_diff(path: str, start: int, end: int) -> bool:
+        return any(start <= line <= end for line in touched.get(path, ()))
+
+    entries = []
+    seen = set()
+
+    # Definitions the changed code depends on
+    for fd in file_diffs:
+        for name in added_calls(fd):
+            definitions = index.definitions(name)
+            if name in seen or not _is_resolvable(name) or not 0 < len(definitions) <= MAX_DEFINITIONS:
+                continue
+            seen.add(name)
+            for symbol in definitions:
+                if in_diff(symbol.path, symbol.line, symbol.end_line):
+                    continue
+                end = min(symbol.end_line, symbol.line + DEFINITION_LINES - 1)
+                excerpt = index.lines(symbol.path, symbol.line, end)
+                if end < symbol.end_line:
+                    excerpt.append("...")
+                entries.append((f"### `{name}` ({symbol.kind} called in the diff), {symbol.path}:{symbol.line}",
+                                symbol.path, excerpt))
+
+    # Callers of what the diff changes
+    for fd in file_diffs:
+        for symbol in changed_symbols(index, fd):
+            if not _is_resolvable(symbol.name) or len(index.definitions(symbol.name)) > MAX_DEFINITIONS:
+                continue
+            sites = [(path, line) for path, line in index.call_sites(symbol.name)
+                     if not in_diff(path, line, line)]
+            for path, line in sites[:MAX_CALL_SITES]:
+                excerpt = index.lines(path, line - CALL_SITE_CONTEXT, line + CALL_SITE_CONTEXT)
+                entries.append((f"### Call to `{symbol.name}` (changed in {fd.path}), {path}:{line}",
+                                path, excerpt))
+            if len(sites) > MAX_CALL_SITES:
+                entries.append((f"*{len(sites) - MAX_CALL_SITES} more call sites of `{symbol.name}` not shown*",
+                                None, []))
+
+    header = ("## Related Code\n"
+              f"Definitions and call sites outside the diff, from the repository at {index.commit[:7]}. "
+              "Use them to judge the impact of the changes; do not report issues in this code.")
+    sections, used = [], estimate_tokens(header)
+    for title, path, excerpt in entries:
+        block = title if path is None else f"{title}\n```{_fence(index, path)}\n" + "\n".join(excerpt) + "\n```"
+        cost = estimate_tokens(block)
+        if used + cost > token_budget:
+            continue
+        sections.append(block)
+        used += cost
+
+    if not sections:
+        return ""
+    return "\n\n".join([header] + sections)
+
+
+def checkout_mismatch(root: str, repo_name: str, commits: Iterable[str]) -> Optional[str]:
+    """Why root is not repo_name (owner/repo) at one of commits; None if it is"""
+    try:
+        head = git(root, "rev-parse", "HEAD").strip()
+        remote = git(root, "remote", "get-url", "origin").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return f"{root} is not a git checkout with an origin remote"
+
+    match = REMOTE_RE.search(remote)
+    if not match or match.group(1).lower() != repo_name.lower():
+        return f"{root} is a checkout of {remote}, not {repo_name}"
+    commits = [sha for sha in commits if sha]
+    if head not in commits:
+        return f"{root} is at {head[:7]}, not the PR's {' or '.join(sha[:7] for sha in commits) or 'head'}"
+    return None
+
+
+def context_budget_for(model: str) -> int:
+    """Tokens of related code allowed on top of the diff budget"""
+    return int(token_budget_for(model) * CONTEXT_BUDGET_SHARE)
+
+
+def repository_context(file_diffs: Iterable[FileDiff], model: str, root: str, repo_name: str,
+                       commits: Iterable[str], cache_path: Optional[str] = None) -> str:
+    """Related Code section for a review, or "" without a usable checkout
+
+    commits are the PR's head and merge commit SHAs; root must be a
+    checkout of repo_name at one of them.
+    """
+    mismatch = checkout_mismatch(root, repo_name, commits)
+    if mismatch:
+        print(f"⚠️ {mismatch}, reviewing without repository context")
+        return ""
+    index = load_symbol_index(root, cache_path)
+    if index is None:
+        return ""
+    return related_context(index, file_diffs, context_budget_for(model))
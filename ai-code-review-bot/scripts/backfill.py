@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+AI Code Review Bot - Bulk Backfill
+Built by Jackson Studio
+
+Reviews many PRs at once through the Message Batches API (half price,
+no per-PR round trips). Prompts are built with the normal review
+pipeline, submitted as one batch, polled with backoff, and the results
+are posted with the same formatting as a regular run. Every PR is one
+run record (METRICS_OUTPUT / ANALYTICS_DB) from preparation to posting,
+costed at batch pricing.
+
+Usage:
+    python scripts/backfill.py --repo owner/name --state open --limit 200
+    python scripts/backfill.py --repo owner/name --prs 12,15,31 --dry-run
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import review
+from utils import metrics
+from utils.cost_tracker import calculate_cost
+from utils.github_client import GITHUB_API_URL, PullRequest, github_paginate
+
+POLL_INITIAL = 10.0
+POLL_MAX = 120.0
+FETCH_WORKERS = 4
+
+
+def list_pull_requests(owner: str, repo: str, state: str = "open", limit: int = 100) -> List[int]:
+    """PR numbers for a repo, newest first"""
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/pulls"
+    headers = {
+        "Authorization": f"token {review.GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    pulls = github_paginate(url, limit=limit, headers=headers, params={"state": state})
+    return [pull["number"] for pull in pulls]
+
+
+def gather_prompts(prs: List[PullRequest], post_skip_notice: bool = True) -> Dict[str, Dict]:
+    """Prepare every PR in parallel; returns custom_id -> prepared review"""
+    def prepare(pr: PullRequest):
+        # The run record stays open until the batch result is posted
+        with metrics.run_metrics(emit=False, script="backfill", repo=f"{pr.owner}/{pr.repo}", pr=pr.number,
+                                 model=review.MODEL) as run:
+            try:
+                result = review.prepare_review(pr, post_skip_notice=post_skip_notice)
+            except Exception as e:
+                print(f"⚠️ Could not prepare {pr}: {e}")
+                run.labels["outcome"] = "error"
+                result = None
+            if result is None:
+                run.labels.setdefault("outcome", "skipped")
+        if result is None:
+            run.emit()
+            run.store()
+        return pr, result, run
+
+    prepared = {}
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        for pr, result, run in pool.map(prepare, prs):
+            if result is not None:
+                result["pr"] = pr
+                result["run"] = run
+                prepared[f"pr-{pr.number}"] = result
+    return prepared
+
+
+def submit_batch(prepared: Dict[str, Dict]) -> str:
+    """Submit all prompts as one Message Batch; returns the batch id"""
+    requests = [
+        {"custom_id": custom_id,
+         "params": review.review_request_params(item["prompt"], item.get("depth"), item.get("max_tokens"),
+                                               item.get("model"))}
+        for custom_id, item in prepared.items()
+    ]
+    batch = review.anthropic_client.messages.batches.create(requests=requests)
+    print(f"📦 Submitted batch {batch.id} with {len(requests)} reviews")
+    return batch.id
+
+
+def wait_for_batch(batch_id: str, initial: float = POLL_INITIAL, maximum: float = POLL_MAX):
+    """Poll until the batch has ended, backing off between polls"""
+    delay = initial
+    while True:
+        batch = review.anthropic_client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        print(f"⏳ {batch.processing_status}: {counts.succeeded} done, "
+              f"{counts.processing} processing, {counts.errored} errored")
+        if batch.processing_status == "ended":
+            return batch
+
+        time.sleep(delay * random.uniform(0.8, 1.2))
+        delay = min(delay * 1.5, maximum)
+
+
+def publish_results(batch_id: str, prepared: Dict[str, Dict], dry_run: bool = False) -> Dict:
+    """Fan batch results out to the normal posting code; returns run totals"""
+    totals = {"succeeded": 0, "failed": 0, "cost": 0.0}
+
+    for entry in review.anthropic_client.messages.batches.results(batch_id):
+        item = prepared.get(entry.custom_id)
+        if item is None:
+            continue
+        with metrics.run_metrics(collector=item.get("run"), batch_id=batch_id, dry_run=dry_run) as run:
+            publish_result(entry, item, run, totals, dry_run)
+
+    return totals
+
+
+def publish_result(entry, item: Dict, run: metrics.RunMetrics, totals: Dict, dry_run: bool):
+    """Record and post one batch result"""
+    if entry.result.type != "succeeded":
+        totals["failed"] += 1
+        run.labels["outcome"] = entry.result.type
+        print(f"⚠️ {item['pr']}: {entry.result.type}")
+        return
+
+    message = entry.result.message
+    model = item.get("model", review.MODEL)
+    totals["succeeded"] += 1
+    totals["cost"] += calculate_cost(message.usage, model, batch=True)
+    run.record_usage(message.usage, model, batch=True)
+    result = review.parse_review_json(message.content[0].text)
+    run.labels["severity"] = result.get('severity')
+
+    if dry_run:
+        print(f"🔍 {item['pr']}: {result.get('severity')} — {len(result.get('issues', []))} issues")
+        return
+
+    try:
+        with run.span("post"):
+            review.publish_review(item["pr"], result, item)
+        print(f"✅ Posted review for {item['pr']}")
+    except Exception as e:
+        totals["failed"] += 1
+        run.labels["outcome"] = "error"
+        print(f"⚠️ Failed to post review for {item['pr']}: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Review many PRs via the Message Batches API")
+    parser.add_argument("--repo", required=True, help="owner/name")
+    parser.add_argument("--prs", help="Comma-separated PR numbers (default: list by --state)")
+    parser.add_argument("--state", default="open", choices=["open", "closed", "all"])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--dry-run", action="store_true", help="Print results instead of posting")
+    args = parser.parse_args()
+
+    owner, repo = args.repo.split("/", 1)
+    if args.prs:
+        numbers = [int(n) for n in args.prs.split(",") if n.strip()]
+    else:
+        numbers = list_pull_requests(owner, repo, args.state, args.limit)
+    print(f"🤖 Backfilling {len(numbers)} PRs in {args.repo}")
+
+    prepared = gather_prompts([PullRequest(owner, repo, n) for n in numbers],
+                              post_skip_notice=not args.dry_run)
+    if not prepared:
+        print("Nothing to review")
+        return
+
+    batch_id = submit_batch(prepared)
+    wait_for_batch(batch_id)
+    totals = publish_results(batch_id, prepared, dry_run=args.dry_run)
+
+    print(f"✅ Done: {totals['succeeded']} reviewed, {totals['failed']} failed, "
+          f"cost ${totals['cost']:.3f} (batch pricing)")
+
+
+if __name__ == "__main__":
+    main()
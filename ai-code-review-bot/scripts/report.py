@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+AI Code Review Bot - Analytics Report
+Built by Jackson Studio
+
+Summarizes the runs stored in the analytics database (ANALYTICS_DB):
+p50/p95 latency, spend and retry rate per repo and week, latency per
+stage, and latency and cost by diff size. Runs skipped before the model
+call are only counted, not averaged in.
+
+Usage:
+    python scripts/report.py --db review-analytics.db --weeks 8
+    python scripts/report.py --db review-analytics.db --repo owner/name --json
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import analytics
+
+
+def format_ms(value) -> str:
+    if value is None:
+        return "-"
+    return f"{value / 1000:.1f}s" if value >= 1000 else f"{value:.0f}ms"
+
+
+def print_table(title: str, rows: List[Dict], columns: List[tuple]):
+    """Plain-text table; columns are (header, key, formatter)"""
+    print(f"\n{title}")
+    if not rows:
+        print("  (no runs)")
+        return
+    cells = [[fmt(row[key]) for _, key, fmt in columns] for row in rows]
+    widths = [max(len(header), *(len(line[i]) for line in cells)) for i, (header, _, _) in enumerate(columns)]
+    print("  " + "  ".join(header.ljust(width) for (header, _, _), width in zip(columns, widths)))
+    for line in cells:
+        print("  " + "  ".join(cell.ljust(width) for cell, width in zip(line, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and spend report for stored review runs")
+    parser.add_argument("--db", default=analytics.ANALYTICS_DB, help="SQLite database (default: $ANALYTICS_DB)")
+    parser.add_argument("--weeks", type=int, default=8, help="Look back this many weeks (0 = all)")
+    parser.add_argument("--repo", help="Only this owner/name")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of tables")
+    args = parser.parse_args()
+
+    if not args.db or not os.path.exists(args.db):
+        print("❌ No analytics database (set ANALYTICS_DB or pass --db)")
+        sys.exit(1)
+
+    conn = analytics.connect(args.db)
+    try:
+        report = {
+            "weekly": analytics.weekly_report(conn, args.weeks, args.repo),
+            "stages": analytics.stage_report(conn, args.weeks, args.repo),
+            "sizes": analytics.size_report(conn, args.weeks, args.repo),
+        }
+    finally:
+        conn.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📊 Review runs in {args.db}" + (f" for {args.repo}" if args.repo else ""))
+    print_table("Per repo and week", report["weekly"], [
+        ("repo", "repo", str), ("week", "week", str), ("runs", "runs", str), ("skipped", "skipped", str),
+        ("p50", "p50_ms", format_ms), ("p95", "p95_ms", format_ms),
+        ("spend", "cost", lambda v: f"${v:.2f}"), ("retried", "retry_rate", lambda v: f"{v:.0%}"),
+    ])
+    print_table("Per stage", report["stages"], [
+        ("stage", "stage", str), ("runs", "runs", str),
+        ("p50", "p50_ms", format_ms), ("p95", "p95_ms", format_ms),
+    ])
+    print_table("By diff size", report["sizes"], [
+        ("size", "size", str), ("runs", "runs", str),
+        ("p50", "p50_ms", format_ms), ("p95", "p95_ms", format_ms),
+        ("avg cost", "avg_cost", lambda v: f"${v:.3f}"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,33 @@ import os
 import sys
 import json
 import time
-from typing import List, Dict, Optional
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Iterator, List, Dict, Optional
+import anthropic
 from anthropic import Anthropic
-import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from reviewers.comment_index import (
+    NOTICE_MARKER, CommentIndex, diff_anchors, finding_fingerprint, finding_marker, index_comments
+)
+from reviewers.cost_planner import plan_review, worst_case_cost
+from reviewers.diff_filter import filter_files
+from reviewers.incremental import (
+    COMPARE_FILE_LIMIT, MARKER_RE, is_fast_forward, last_reviewed_sha, review_marker
+)
+from reviewers.model_router import ROUTING_MODES, choose_route, download_budget, escalate_for_content
+from reviewers.prompt_builder import (
+    PackedDiff, cached_system_blocks, collect_pr_diff, format_omitted_section, load_review_guidelines
+)
+from reviewers.symbol_index import repository_context
+from utils import metrics
+from utils.cost_tracker import calculate_cost, format_usage
+from utils.github_client import PullRequest, github_paginate, github_request, github_stream_lines
+from utils.rate_limiter import ANTHROPIC_RETRY_STATUSES, get_limiter
+from utils.stream_parser import IssueStreamParser
 
 # Configuration
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY")
@@ -20,8 +44,21 @@ REPO_OWNER = os.environ.get("REPO_OWNER")
 REPO_NAME = os.environ.get("REPO_NAME")
 REVIEW_DEPTH = os.environ.get("REVIEW_DEPTH", "balanced")
 MODEL = os.environ.get("MODEL", "claude-sonnet-4")
+# off | auto (FAST_MODEL for small low-risk PRs) | progressive (auto + quick FAST_MODEL pass first)
+MODEL_ROUTING = os.environ.get("MODEL_ROUTING", "off")
+FAST_MODEL = os.environ.get("FAST_MODEL", "claude-haiku-4-5")
 MAX_FILES = int(os.environ.get("MAX_FILES", "10"))
 LANGUAGE = os.environ.get("LANGUAGE", "en")
+COST_LIMIT = float(os.environ.get("COST_LIMIT", "0"))  # USD per review, 0 = no limit
+INCREMENTAL_REVIEW = os.environ.get("INCREMENTAL_REVIEW", "true").lower() == "true"
+# Account the bot comments as; only its comments' markers are trusted ("" = any GitHub App bot)
+BOT_LOGIN = os.environ.get("BOT_LOGIN", "")
+# Checked-out repository for definitions/call sites of changed code ("" = diff only)
+REPO_PATH = os.environ.get("REPO_PATH") or os.environ.get("GITHUB_WORKSPACE", "")
+SYMBOL_CACHE = os.environ.get("SYMBOL_CACHE")  # default: .git/ai-review-symbols.json in REPO_PATH
+
+# Output token cap per review depth
+DEPTH_MAX_TOKENS = {"quick": 1024, "balanced": 4096, "deep": 4096}
 
 # Validation
 if not ANTHROPIC_API_KEY:
@@ -32,49 +69,67 @@ if not GITHUB_TOKEN:
     print("❌ GITHUB_TOKEN not set")
     sys.exit(1)
 
+if MODEL_ROUTING not in ROUTING_MODES:
+    print(f"❌ MODEL_ROUTING must be one of {', '.join(ROUTING_MODES)}")
+    sys.exit(1)
+
 # Initialize clients
-anthropic = Anthropic(api_key=ANTHROPIC_API_KEY)
-github_api = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}"
+# Retries are handled by the shared limiter, not the SDK
+anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY, max_retries=0)
+anthropic_limiter = get_limiter("anthropic")
+
+# The PR this run was triggered for (None when used as a library)
+DEFAULT_PR = PullRequest(REPO_OWNER, REPO_NAME, int(PR_NUMBER)) if PR_NUMBER else None
 
-def get_pr_diff() -> str:
-    """Fetch PR diff from GitHub API"""
-    url = f"{github_api}/pulls/{PR_NUMBER}"
+
+class ReviewCancelled(Exception):
+    """A newer push superseded the review in progress"""
+    pass
+
+def check_cancelled(cancel: Optional[threading.Event]):
+    if cancel is not None and cancel.is_set():
+        raise ReviewCancelled()
+
+def get_pr_diff(pr: Optional[PullRequest] = None) -> Iterator[str]:
+    """Stream the PR diff from GitHub API, line by line"""
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/pulls/{pr.number}"
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3.diff"
     }
     
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.text
+    return github_stream_lines(url, headers=headers)
 
-def get_pr_details() -> Dict:
+def get_pr_details(pr: Optional[PullRequest] = None) -> Dict:
     """Fetch PR metadata"""
-    url = f"{github_api}/pulls/{PR_NUMBER}"
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/pulls/{pr.number}"
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json"
     }
     
-    response = requests.get(url, headers=headers)
+    response = github_request("GET", url, headers=headers)
     response.raise_for_status()
     return response.json()
 
-def get_pr_files() -> List[Dict]:
+def get_pr_files(pr: Optional[PullRequest] = None) -> List[Dict]:
     """Get list of changed files"""
-    url = f"{github_api}/pulls/{PR_NUMBER}/files"
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/pulls/{pr.number}/files"
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json"
     }
     
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return github_paginate(url, headers=headers)
 
-def post_review_comment(body: str, commit_id: str, path: str = None, line: int = None):
+def post_review_comment(body: str, commit_id: str, path: str = None, line: int = None,
+                        pr: Optional[PullRequest] = None):
     """Post review comment to PR"""
-    url = f"{github_api}/pulls/{PR_NUMBER}/comments"
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/pulls/{pr.number}/comments"
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json"
@@ -89,28 +144,102 @@ def post_review_comment(body: str, commit_id: str, path: str = None, line: int =
         data["path"] = path
         data["line"] = line
     
-    response = requests.post(url, headers=headers, json=data)
+    response = github_request("POST", url, headers=headers, json=data)
     
     if response.status_code == 422:
         # Line might not be in diff, post as general comment instead
-        post_general_comment(body)
+        post_general_comment(body, pr=pr)
     else:
         response.raise_for_status()
 
-def post_general_comment(body: str):
+def get_issue_comments(pr: Optional[PullRequest] = None) -> List[Dict]:
+    """Get all general (issue) comments on the PR"""
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/issues/{pr.number}/comments"
+    headers = {
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    
+    return github_paginate(url, headers=headers)
+
+def get_review_comments(pr: Optional[PullRequest] = None) -> List[Dict]:
+    """Get all inline review comments on the PR"""
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/pulls/{pr.number}/comments"
+    headers = {
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    
+    return github_paginate(url, headers=headers)
+
+def get_compare(base_sha: str, head_sha: str, pr: Optional[PullRequest] = None) -> Optional[Dict]:
+    """Compare two commits; None if either is gone (e.g. after a force push)"""
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/compare/{base_sha}...{head_sha}"
+    headers = {
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    
+    response = github_request("GET", url, headers=headers)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+def get_compare_diff(base_sha: str, head_sha: str, pr: Optional[PullRequest] = None) -> Iterator[str]:
+    """Stream the unified diff between two commits, line by line"""
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/compare/{base_sha}...{head_sha}"
+    headers = {
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.v3.diff"
+    }
+    
+    return github_stream_lines(url, headers=headers)
+
+def post_general_comment(body: str, pr: Optional[PullRequest] = None):
     """Post general comment to PR"""
-    url = f"{github_api}/issues/{PR_NUMBER}/comments"
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/issues/{pr.number}/comments"
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json"
     }
     
     data = {"body": body}
-    response = requests.post(url, headers=headers, json=data)
+    response = github_request("POST", url, headers=headers, json=data)
     response.raise_for_status()
+    return response.json()
 
-def build_review_prompt(pr_details: Dict, diff: str, files: List[Dict]) -> str:
-    """Build context-aware review prompt"""
+def update_general_comment(comment_id: int, body: str, pr: Optional[PullRequest] = None):
+    """Replace the body of an existing general comment"""
+    pr = pr or DEFAULT_PR
+    url = f"{pr.api_url}/issues/comments/{comment_id}"
+    headers = {
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    
+    response = github_request("PATCH", url, headers=headers, json={"body": body})
+    response.raise_for_status()
+    return response.json()
+
+def post_summary_comment(body: str, pr: Optional[PullRequest] = None, existing: Optional[Dict] = None):
+    """Edit the bot's summary comment in place, or post it if there is none yet"""
+    if existing:
+        return update_general_comment(existing['id'], body, pr=pr)
+    return post_general_comment(body, pr=pr)
+
+@lru_cache(maxsize=None)
+def build_system_prompt(depth: str = REVIEW_DEPTH) -> str:
+    """Build the static review instructions (identical for every PR)
+    
+    Sent as a prompt-cached system block, so it must not contain any
+    per-PR data.
+    """
     
     depth_instructions = {
         "quick": "Focus only on critical bugs, security issues, and obvious errors.",
@@ -126,19 +255,10 @@ def build_review_prompt(pr_details: Dict, diff: str, files: List[Dict]) -> str:
         "de": "Antworten Sie auf Deutsch."
     }
     
-    file_list = "\n".join([f"- {f['filename']} (+{f['additions']} -{f['deletions']})" for f in files[:20]])
-    
-    prompt = f"""You are an expert code reviewer. Review this pull request.
-
-## PR Context
-**Title:** {pr_details['title']}
-**Description:** {pr_details.get('body', 'No description provided')}
-
-## Changed Files
-{file_list}
+    return f"""{load_review_guidelines() or "You are an expert code reviewer."}
 
 ## Review Instructions
-{depth_instructions.get(REVIEW_DEPTH, depth_instructions['balanced'])}
+{depth_instructions.get(depth, depth_instructions['balanced'])}
 
 Focus on:
 1. **Security** (injection, XSS, secrets, auth)
@@ -147,12 +267,7 @@ Focus on:
 4. **Code Quality** (naming, complexity, duplication)
 5. **Best Practices** (error handling, type safety)
 
-## Diff
-```diff
-{diff[:8000]}  # Truncate to avoid token limits
-```
-
-## Output Format
+## Response Format
 Provide a structured JSON response:
 
 ```json
@@ -174,56 +289,160 @@ Provide a structured JSON response:
 ```
 
 {language_instructions.get(LANGUAGE, language_instructions['en'])}
+"""
+
+def build_review_prompt(pr_details: Dict, packed: PackedDiff, files: List[Dict],
+                        since: Optional[str] = None, related: str = "") -> str:
+    """Build the per-PR part of the prompt (context + diff)"""
+    
+    file_list = "\n".join([f"- {f['filename']} (+{f['additions']} -{f['deletions']})" for f in files[:20]])
+    scope = (f"Review the new commits pushed to this pull request since commit {since[:7]}, "
+             f"which was already reviewed. The diff only shows those changes."
+             if since else "Review this pull request.")
+    
+    prompt = f"""{scope}
+
+## PR Context
+**Title:** {pr_details['title']}
+**Description:** {pr_details.get('body', 'No description provided')}
+
+## Changed Files
+{file_list}
+
+## Diff
+```diff
+{packed.text}
+```
+
+{format_omitted_section(packed)}
+
+{related}
 """
     
     return prompt
 
-def review_with_claude(prompt: str) -> Dict:
-    """Send review request to Claude"""
+def review_depths() -> List[tuple]:
+    """(depth, system prompt, max_tokens) options, preferred first, for the cost planner"""
+    depths = [REVIEW_DEPTH] if REVIEW_DEPTH == "quick" else [REVIEW_DEPTH, "quick"]
+    return [(depth, build_system_prompt(depth), DEPTH_MAX_TOKENS.get(depth, 4096)) for depth in depths]
+
+def review_request_params(prompt: str, depth: Optional[str] = None, max_tokens: Optional[int] = None,
+                          model: Optional[str] = None) -> Dict:
+    """Messages API parameters for one review (shared by streaming and batch mode)"""
+    depth = depth or REVIEW_DEPTH
+    return {
+        "model": model or MODEL,
+        "max_tokens": max_tokens or DEPTH_MAX_TOKENS.get(depth, 4096),
+        "temperature": 0.3,
+        "system": cached_system_blocks(build_system_prompt(depth)),
+        "messages": [{
+            "role": "user",
+            "content": prompt
+        }]
+    }
+
+def parse_review_json(content: str) -> Dict:
+    """Parse the model's JSON review, tolerating markdown code fences"""
+    raw = content
+    
+    # Extract JSON from markdown code blocks if present
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+    
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        print(f"⚠️ Failed to parse JSON response: {e}")
+        print(f"Raw response: {raw[:500]}")
+        # Return minimal valid structure
+        return {
+            "summary": "Review completed but response parsing failed",
+            "severity": "unknown",
+            "issues": [],
+            "positives": []
+        }
+
+def review_with_claude(prompt: str, on_issue: Optional[Callable[[Dict], None]] = None,
+                       cancel: Optional[threading.Event] = None, depth: Optional[str] = None,
+                       max_tokens: Optional[int] = None, model: Optional[str] = None) -> Dict:
+    """Stream a review from Claude
+    
+    Each issue is handed to on_issue as soon as its JSON object is complete,
+    while the rest of the response is still being generated. Setting cancel
+    closes the stream and raises ReviewCancelled.
+    """
     max_retries = 3
-    retry_delay = 5
+    model = model or MODEL
+    
+    run = metrics.current()
     
     for attempt in range(max_retries):
         try:
-            response = anthropic.messages.create(
-                model=MODEL,
-                max_tokens=4096,
-                temperature=0.3,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
+            anthropic_limiter.acquire()
+            parser = IssueStreamParser()
+            with run.span("http.anthropic", model=model, bytes=0) as span:
+                started = time.perf_counter()
+                params = review_request_params(prompt, depth, max_tokens, model)
+                with anthropic_client.messages.stream(**params) as stream:
+                    span["status"] = stream.response.status_code
+                    anthropic_limiter.update_from_headers(stream.response.headers)
+                    for text in stream.text_stream:
+                        if "first_token_ms" not in span:
+                            span["first_token_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                        span["bytes"] += len(text.encode())
+                        check_cancelled(cancel)
+                        if on_issue:
+                            for issue in parser.feed(text):
+                                on_issue(issue)
+                    response = stream.get_final_message()
             
-            content = response.content[0].text
+            run.record_usage(response.usage, model)
+            print(f"   {format_usage(response.usage)}")
+            print(f"   Cost: ${calculate_cost(response.usage, model):.4f}")
             
-            # Extract JSON from markdown code blocks if present
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
+            return parse_review_json(response.content[0].text)
             
-            return json.loads(content)
-            
-        except anthropic.RateLimitError:
-            if attempt < max_retries - 1:
-                print(f"⏳ Rate limited, retrying in {retry_delay}s...")
-                time.sleep(retry_delay)
-                retry_delay *= 2
-            else:
+        except (anthropic.APIStatusError, anthropic.APIConnectionError) as e:
+            # APIConnectionError (and its APITimeoutError) has no status code
+            status = getattr(e, "status_code", None)
+            if (status is not None and status not in ANTHROPIC_RETRY_STATUSES) or attempt == max_retries - 1:
                 raise
-        except json.JSONDecodeError as e:
-            print(f"⚠️ Failed to parse JSON response: {e}")
-            print(f"Raw response: {content[:500]}")
-            # Return minimal valid structure
-            return {
-                "summary": "Review completed but response parsing failed",
-                "severity": "unknown",
-                "issues": [],
-                "positives": []
-            }
-
-def format_review_comment(review: Dict) -> str:
+            run.incr("anthropic_retries")
+            delay = anthropic_limiter.backoff(attempt, e.response.headers if status else None)
+            print(f"⏳ Anthropic request failed ({status or type(e).__name__}), backed off {delay:.1f}s")
+
+def post_inline_issue(issue: Dict, commit_id: str, pr: Optional[PullRequest] = None,
+                      cancel: Optional[threading.Event] = None, fingerprint: Optional[str] = None):
+    """Post a single issue as an inline review comment"""
+    if not (issue.get('file') and issue.get('line')):
+        return
+    if cancel is not None and cancel.is_set():
+        return
+    
+    try:
+        inline_comment = f"**{issue.get('category', 'issue').title()}:** {issue.get('message', '')}"
+        if issue.get('suggestion'):
+            inline_comment += f"\n\n💡 **Suggestion:** {issue['suggestion']}"
+        if fingerprint:
+            # Lets the next run recognise this finding and not post it again
+            inline_comment += f"\n{finding_marker(fingerprint)}"
+        
+        post_review_comment(
+            body=inline_comment,
+            commit_id=commit_id,
+            path=issue['file'],
+            line=issue['line'],
+            pr=pr
+        )
+        print(f"  ✅ Posted inline comment on {issue['file']}:{issue['line']}")
+    except Exception as e:
+        print(f"  ⚠️ Failed to post inline comment: {e}")
+
+def format_review_comment(review: Dict, packed: Optional[PackedDiff] = None,
+                          head_sha: Optional[str] = None, since: Optional[str] = None,
+                          notice: str = "") -> str:
     """Format review as markdown comment"""
     
     severity_emoji = {
@@ -241,6 +460,12 @@ def format_review_comment(review: Dict) -> str:
 
 """
     
+    if since:
+        comment += f"🔁 *Incremental review of changes since `{since[:7]}`*\n\n"
+    
+    if notice:
+        comment += f"{notice}\n\n"
+    
     if review.get('issues'):
         comment += "\n### Issues Found\n\n"
         for issue in review['issues']:
@@ -258,60 +483,300 @@ def format_review_comment(review: Dict) -> str:
         for positive in review['positives']:
             comment += f"- {positive}\n"
     
+    if packed and (packed.omitted or packed.partial):
+        skipped = [entry['file'] for entry in packed.omitted] + packed.partial
+        comment += f"\n<details><summary>⏭️ Not fully reviewed ({len(skipped)} files, token budget)</summary>\n\n"
+        for path in skipped:
+            comment += f"- `{path}`\n"
+        comment += "\n</details>\n"
+    
+    if packed and packed.skipped:
+        comment += f"\n<details><summary>🧹 Skipped as trivial ({len(packed.skipped)} files)</summary>\n\n"
+        for entry in packed.skipped:
+            comment += f"- `{entry['file']}` ({entry['reason']})\n"
+        comment += "\n</details>\n"
+    
     comment += "\n---\n*Built by [Jackson Studio](https://jackson.studio) • [Get this bot](https://jackson.gumroad.com/l/ai-review)*"
     
+    if head_sha:
+        comment += f"\n{review_marker(head_sha)}"
+    
     return comment
 
-def main():
-    print("🤖 Starting AI Code Review...")
+def prepare_review(pr: Optional[PullRequest] = None, cancel: Optional[threading.Event] = None,
+                   post_skip_notice: bool = True) -> Optional[Dict]:
+    """Fetch PR data and build the prompt; returns None if the PR is skipped"""
+    pr = pr or DEFAULT_PR
+    run = metrics.current()
     
     # Fetch PR data
-    print("📥 Fetching PR details...")
-    pr_details = get_pr_details()
-    files = get_pr_files()
+    print(f"📥 Fetching PR details for {pr}...")
+    with run.span("fetch"):
+        pr_details = get_pr_details(pr)
+        head_sha = pr_details['head']['sha']
+        since = None
+        
+        # The bot's earlier comments, fetched once: findings, summary, reviewed head
+        issue_comments = get_issue_comments(pr)
+        existing = index_comments(issue_comments, get_review_comments(pr), BOT_LOGIN)
+        
+        # Only review commits pushed since the last reviewed head, if history allows
+        last_sha = last_reviewed_sha(issue_comments, BOT_LOGIN) if INCREMENTAL_REVIEW else None
+        if last_sha and head_sha.startswith(last_sha):
+            print(f"⏭️ Skipped: {head_sha[:7]} was already reviewed")
+            return None
+        if last_sha:
+            compare = get_compare(last_sha, head_sha, pr)
+            if compare and is_fast_forward(compare) and len(compare.get('files', [])) < COMPARE_FILE_LIMIT:
+                since = last_sha
+                files = compare.get('files', [])
+                print(f"🔁 Incremental review: {len(compare.get('commits', []))} new commits since {since[:7]}")
+            else:
+                print(f"🔁 History changed since {last_sha[:7]} (rebase or merge), running a full review")
+        if since is None:
+            files = get_pr_files(pr)
+    check_cancelled(cancel)
+    run.labels.update(head_sha=head_sha, incremental=since is not None)
+    
+    # Ignored, generated, vendored and rename-only files never count
+    reviewable, skipped = filter_files(files)
+    run.labels.update(files=len(reviewable),
+                      changed_lines=sum(f.get('additions', 0) + f.get('deletions', 0) for f in reviewable))
+    if not reviewable:
+        skip_trivial(pr, skipped, post_skip_notice, head_sha, existing.summary)
+        return None
     
     # Check file count limit
-    if len(files) > MAX_FILES:
-        comment = f"⚠️ This PR changes {len(files)} files (limit: {MAX_FILES}). Skipping automated review.\n\n*Tip: Break large PRs into smaller chunks for better reviews.*"
-        post_general_comment(comment)
-        print(f"⏭️ Skipped: too many files ({len(files)} > {MAX_FILES})")
-        return
+    if len(reviewable) > MAX_FILES:
+        if post_skip_notice:
+            comment = f"⚠️ This PR changes {len(reviewable)} files (limit: {MAX_FILES}). Skipping automated review.\n\n*Tip: Break large PRs into smaller chunks for better reviews.*"
+            post_notice(comment, pr, existing)
+        print(f"⏭️ Skipped: too many files ({len(reviewable)} > {MAX_FILES})")
+        return None
+    
+    # Fast model for small low-risk changes, decided before the download
+    route = choose_route(MODEL_ROUTING, reviewable, FAST_MODEL, MODEL)
     
+    # Stream the diff, keeping only what fits the budget and stopping early
     print("📥 Fetching diff...")
-    diff = get_pr_diff()
+    with run.span("fetch") as span:
+        lines = get_compare_diff(since, head_sha, pr) if since else get_pr_diff(pr)
+        try:
+            collected = collect_pr_diff(lines, files, download_budget(route, MODEL))
+        finally:
+            # Drop the connection instead of downloading the rest
+            if hasattr(lines, "close"):
+                lines.close()
+        span["cut_off"] = collected.cut_off
+    check_cancelled(cancel)
+    
+    route = escalate_for_content(route, collected.file_diffs, MODEL)
+    model = route.model
+    run.labels.update(model=model, route=route.tier)
+    if MODEL_ROUTING != "off":
+        print(f"🧭 Routed to {model} ({route.reason})")
+    
+    # Definitions and callers of the changed code, from the checkout
+    related = ""
+    if REPO_PATH:
+        with run.span("context") as span:
+            related = repository_context(collected.file_diffs, model, REPO_PATH, f"{pr.owner}/{pr.repo}",
+                                         [head_sha, pr_details.get('merge_commit_sha')], SYMBOL_CACHE)
+            span["context_bytes"] = len(related.encode())
     
     # Build prompt
     print("🔨 Building review prompt...")
-    prompt = build_review_prompt(pr_details, diff, files)
+    with run.span("prompt") as span:
+        # Fit the request under COST_LIMIT before anything is spent
+        plan = plan_review(
+            pack=collected.pack,
+            build_prompt=lambda packed: build_review_prompt(pr_details, packed, files, since, related),
+            depths=review_depths(),
+            model=model,
+            limit=COST_LIMIT,
+        )
+        packed = plan.packed
+        span.update(prompt_bytes=len(plan.prompt.encode()), packed_tokens=packed.tokens,
+                    omitted_files=len(packed.omitted), skipped_files=len(packed.skipped),
+                    plan=plan.action, estimated_cost=round(plan.estimated_cost, 6))
+    print(f"   Packed ~{packed.tokens}/{packed.budget} tokens, {len(packed.omitted)} files omitted, "
+          f"{len(packed.skipped)} trivial")
     
-    # Get review from Claude
-    print(f"🧠 Requesting review from {MODEL}...")
-    review = review_with_claude(prompt)
+    # e.g. every remaining change was whitespace-only
+    if packed.is_empty and packed.skipped:
+        skip_trivial(pr, packed.skipped, post_skip_notice, head_sha, existing.summary)
+        return None
     
-    # Post comment
-    print("💬 Posting review...")
-    comment = format_review_comment(review)
-    commit_id = pr_details['head']['sha']
+    if plan.refused:
+        if post_skip_notice:
+            comment = f"💸 Estimated review cost (${plan.estimated_cost:.3f}) exceeds the limit (${COST_LIMIT:.2f}) even at quick depth with a reduced diff. Skipping automated review."
+            post_notice(comment, pr, existing)
+        print(f"⏭️ Skipped: worst-case cost ${plan.estimated_cost:.3f} > limit ${COST_LIMIT:.2f}")
+        return None
+    if plan.action != "full":
+        print(f"   💸 Fitted under ${COST_LIMIT:.2f}: {plan.action} ({plan.depth}, "
+              f"max {plan.max_tokens} output tokens, worst case ${plan.estimated_cost:.3f})")
+    
+    # Progressive mode: a quick FAST_MODEL pass is posted while the deep review runs
+    progressive = MODEL_ROUTING == "progressive" and not route.fast and FAST_MODEL != MODEL
+    if progressive and COST_LIMIT:
+        quick_cost = worst_case_cost(build_system_prompt("quick"), plan.prompt,
+                                     DEPTH_MAX_TOKENS["quick"], FAST_MODEL)
+        if plan.estimated_cost + quick_cost > COST_LIMIT:
+            print(f"   💸 No quick {FAST_MODEL} pass: it would exceed ${COST_LIMIT:.2f}")
+            progressive = False
+    
+    return {
+        "pr_details": pr_details,
+        "files": files,
+        "packed": packed,
+        "prompt": plan.prompt,
+        "depth": plan.depth,
+        "max_tokens": plan.max_tokens,
+        "model": model,
+        "progressive": progressive,
+        "since": since,
+        "existing": existing,
+        "anchors": diff_anchors(collected.file_diffs),
+    }
+
+def post_notice(body: str, pr: PullRequest, existing: CommentIndex):
+    """Post the bot's skip notice, or edit the one from an earlier push"""
+    notice = post_summary_comment(f"{body}\n{NOTICE_MARKER}", pr=pr, existing=existing.notice)
+    if notice:
+        existing.notice = notice
+
+def skip_trivial(pr: PullRequest, skipped: List[Dict], post_skip_notice: bool = True,
+                 head_sha: Optional[str] = None, summary: Optional[Dict] = None):
+    """Skip the model call for a PR with only trivial changes
+    
+    An earlier review summary is kept; only its head marker moves, so the
+    push counts as reviewed and the next one is reviewed incrementally.
+    """
+    reasons = sorted({entry['reason'] for entry in skipped})
+    if post_skip_notice:
+        if summary and head_sha:
+            body = MARKER_RE.sub(review_marker(head_sha), summary.get('body') or "")
+            update_general_comment(summary['id'], body, pr=pr)
+        else:
+            comment = f"✅ Only trivial changes ({', '.join(reasons)}) in {len(skipped)} files. Skipping automated review."
+            if head_sha:
+                comment += f"\n{review_marker(head_sha)}"
+            post_general_comment(comment, pr=pr)
+    print(f"⏭️ Skipped: only trivial changes ({', '.join(reasons)})")
+
+def post_new_finding(issue: Dict, prepared: Dict, posted: set, pr: PullRequest,
+                     cancel: Optional[threading.Event] = None, submit: Optional[Callable] = None) -> bool:
+    """Post issue inline unless an identical finding is already on the PR or in posted"""
+    fingerprint = finding_fingerprint(issue, prepared['anchors'])
+    if fingerprint in posted:
+        return False
+    posted.add(fingerprint)
+    args = (issue, prepared['pr_details']['head']['sha'], pr, cancel, fingerprint)
+    if submit is not None:
+        submit(post_inline_issue, *args)
+    else:
+        post_inline_issue(*args)
+    return True
+
+def publish_review(pr: PullRequest, review: Dict, prepared: Dict, posted: Optional[set] = None,
+                   cancel: Optional[threading.Event] = None, preliminary: bool = False):
+    """Post new inline findings, then create or update the summary comment
     
-    post_general_comment(comment)
+    posted holds fingerprints already on the PR (or posted by this run);
+    it defaults to the findings found on the PR before the review. A
+    preliminary summary has no head marker, so it only counts as reviewed
+    once the deep review has replaced it.
+    """
+    existing: CommentIndex = prepared['existing']
+    posted = set(existing.findings) if posted is None else posted
+    commit_id = prepared['pr_details']['head']['sha']
     
-    # Post inline comments for specific issues
     for issue in review.get('issues', []):
-        if issue.get('file') and issue.get('line'):
-            try:
-                inline_comment = f"**{issue['category'].title()}:** {issue['message']}"
-                if issue.get('suggestion'):
-                    inline_comment += f"\n\n💡 **Suggestion:** {issue['suggestion']}"
-                
-                post_review_comment(
-                    body=inline_comment,
-                    commit_id=commit_id,
-                    path=issue['file'],
-                    line=issue['line']
-                )
-                print(f"  ✅ Posted inline comment on {issue['file']}:{issue['line']}")
-            except Exception as e:
-                print(f"  ⚠️ Failed to post inline comment: {e}")
+        post_new_finding(issue, prepared, posted, pr, cancel)
+    
+    # Post summary comment
+    check_cancelled(cancel)
+    print("💬 Posting review...")
+    if preliminary:
+        notice = (f"⚡ *Preliminary review by {FAST_MODEL}. {prepared['model']} is reviewing in depth "
+                  f"and will update this comment.*")
+        comment = format_review_comment(review, prepared['packed'], since=prepared.get('since'), notice=notice)
+    else:
+        comment = format_review_comment(review, prepared['packed'], commit_id, prepared.get('since'))
+    summary = post_summary_comment(comment, pr=pr, existing=existing.summary)
+    if summary:
+        # Later passes of this run edit the comment just posted
+        existing.summary = summary
+
+def run_review(pr: Optional[PullRequest] = None, cancel: Optional[threading.Event] = None) -> Optional[Dict]:
+    """Review one PR end to end; returns the review, or None if skipped
+    
+    Raises ReviewCancelled if cancel is set before results are posted.
+    """
+    pr = pr or DEFAULT_PR
+    
+    with metrics.run_metrics(script="review", repo=f"{pr.owner}/{pr.repo}", pr=pr.number,
+                             model=MODEL) as run:
+        prepared = prepare_review(pr, cancel)
+        if prepared is None:
+            run.labels["outcome"] = "skipped"
+            return None
+        
+        # Findings already on the PR from earlier runs are never posted again
+        posted = set(prepared['existing'].findings)
+        
+        if not prepared['progressive']:
+            # Get review from Claude, posting inline comments as issues stream in
+            print(f"🧠 Requesting review from {prepared['model']}...")
+            review = stream_review(pr, prepared, posted, cancel)
+        else:
+            # Deep review in the background while the quick pass is streamed and posted
+            print(f"🧠 Requesting review from {prepared['model']}, quick pass from {FAST_MODEL}...")
+            with ThreadPoolExecutor(max_workers=1) as deep_runner:
+                deep = deep_runner.submit(
+                    contextvars.copy_context().run, review_with_claude, prepared['prompt'], cancel=cancel,
+                    depth=prepared['depth'], max_tokens=prepared['max_tokens'], model=prepared['model'])
+                quick = stream_review(pr, prepared, posted, cancel, quick=True)
+                with run.span("post_quick"):
+                    publish_review(pr, quick, prepared, posted, cancel, preliminary=True)
+                with run.span("model"):
+                    review = deep.result()
+        
+        # Anything the stream parser missed (e.g. malformed chunks), then the summary
+        with run.span("post", streamed_issues=len(posted) - len(prepared['existing'].findings)):
+            publish_review(pr, review, prepared, posted, cancel)
+        
+        run.labels["severity"] = review.get('severity')
+        return review
+
+def stream_review(pr: PullRequest, prepared: Dict, posted: set, cancel: Optional[threading.Event] = None,
+                  quick: bool = False) -> Dict:
+    """Run the prepared review (or the quick FAST_MODEL pass), posting new findings as they stream in"""
+    run = metrics.current()
+    
+    with run.span("model_quick" if quick else "model"), ThreadPoolExecutor(max_workers=1) as poster:
+        def submit(fn, *args):
+            # Carry the run's metrics collector into the poster thread
+            poster.submit(contextvars.copy_context().run, fn, *args)
+        
+        def on_issue(issue: Dict):
+            if not post_new_finding(issue, prepared, posted, pr, cancel, submit):
+                run.incr("duplicate_findings")
+        
+        if quick:
+            return review_with_claude(prepared['prompt'], on_issue=on_issue, cancel=cancel, depth="quick",
+                                      max_tokens=DEPTH_MAX_TOKENS["quick"], model=FAST_MODEL)
+        return review_with_claude(prepared['prompt'], on_issue=on_issue, cancel=cancel,
+                                  depth=prepared['depth'], max_tokens=prepared['max_tokens'],
+                                  model=prepared['model'])
+
+def main():
+    print("🤖 Starting AI Code Review...")
+    
+    review = run_review()
+    if review is None:
+        return
     
     print("✅ Review complete!")
     
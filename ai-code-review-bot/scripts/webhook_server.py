@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+AI Code Review Bot - Webhook Server Mode
+Built by Jackson Studio
+
+Long-running alternative to the one-shot GitHub Actions step. Receives
+pull_request webhooks, reviews them on a bounded worker pool with warm
+API clients, and cancels queued or in-flight reviews when a newer head
+SHA arrives for the same PR.
+
+Usage:
+    WEBHOOK_SECRET=... ANTHROPIC_API_KEY=... GITHUB_TOKEN=... \
+        python scripts/webhook_server.py --port 8080
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import review
+from review import ReviewCancelled
+from utils.github_client import PullRequest
+
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET", "")
+WEBHOOK_WORKERS = int(os.environ.get("WEBHOOK_WORKERS", "4"))
+WEBHOOK_MAX_QUEUE = int(os.environ.get("WEBHOOK_MAX_QUEUE", "50"))
+
+REVIEW_ACTIONS = {"opened", "synchronize", "reopened"}
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check GitHub's X-Hub-Signature-256 header"""
+    if not secret:
+        return True
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"sha256={expected}", signature)
+
+
+def parse_pull_request(payload: Dict) -> Tuple[PullRequest, str]:
+    """Get (PR, head SHA) from a pull_request delivery; ValueError if it is malformed"""
+    try:
+        pull = payload["pull_request"]
+        owner, repo = payload["repository"]["full_name"].split("/", 1)
+        pr = PullRequest(owner, repo, int(pull["number"]))
+        head_sha = pull["head"]["sha"]
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"malformed pull_request payload ({type(e).__name__}: {e})") from e
+    if not (owner and repo and isinstance(head_sha, str) and head_sha):
+        raise ValueError("malformed pull_request payload (bad repository or head SHA)")
+    return pr, head_sha
+
+
+class ReviewJob:
+    """One scheduled review of a PR at a specific head SHA"""
+
+    def __init__(self, pr: PullRequest, head_sha: str):
+        self.pr = pr
+        self.head_sha = head_sha
+        self.cancel = threading.Event()
+        self.future = None
+        self.status = "queued"
+
+
+class ReviewScheduler:
+    """Bounded worker pool with one live job per PR
+
+    Submitting a newer head SHA for a PR cancels the previous job: queued
+    jobs never start, running jobs stop streaming and skip posting.
+    """
+
+    def __init__(self, run: Callable = review.run_review,
+                 workers: int = WEBHOOK_WORKERS, max_queue: int = WEBHOOK_MAX_QUEUE):
+        self.run = run
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="review")
+        self.jobs: Dict[PullRequest, ReviewJob] = {}
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def submit(self, pr: PullRequest, head_sha: str) -> Optional[ReviewJob]:
+        """Schedule a review; returns None if the queue is full
+
+        Redelivery of the SHA already being reviewed returns the existing job.
+        """
+        with self.lock:
+            current = self.jobs.get(pr)
+            if current and current.head_sha == head_sha and not current.cancel.is_set():
+                return current
+            if self.pending >= self.max_queue:
+                return None
+
+            if current:
+                current.cancel.set()
+                if current.future and current.future.cancel():
+                    current.status = "cancelled"
+                    self.pending -= 1
+
+            job = ReviewJob(pr, head_sha)
+            self.jobs[pr] = job
+            self.pending += 1
+            job.future = self.executor.submit(self._run_job, job)
+            return job
+
+    def _run_job(self, job: ReviewJob):
+        try:
+            if job.cancel.is_set():
+                job.status = "cancelled"
+                return
+            job.status = "running"
+            print(f"🧠 Reviewing {job.pr} @ {job.head_sha[:7]}")
+            self.run(job.pr, cancel=job.cancel)
+            job.status = "done"
+        except ReviewCancelled:
+            job.status = "cancelled"
+            print(f"⏭️ Superseded: {job.pr} @ {job.head_sha[:7]}")
+        except Exception as e:
+            job.status = "failed"
+            print(f"⚠️ Review failed for {job.pr}: {e}")
+        finally:
+            with self.lock:
+                self.pending -= 1
+                if self.jobs.get(job.pr) is job:
+                    del self.jobs[job.pr]
+
+    def shutdown(self, wait: bool = True):
+        with self.lock:
+            for job in self.jobs.values():
+                job.cancel.set()
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def make_handler(scheduler: ReviewScheduler, secret: str = WEBHOOK_SECRET):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def reply(self, status: int, message: str):
+            payload = json.dumps({"message": message}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/healthz":
+                self.reply(200, f"ok, {scheduler.pending} pending")
+            else:
+                self.reply(404, "not found")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+
+            if not verify_signature(secret, body, self.headers.get("X-Hub-Signature-256")):
+                self.reply(401, "bad signature")
+                return
+
+            event = self.headers.get("X-GitHub-Event", "")
+            if event == "ping":
+                self.reply(200, "pong")
+                return
+            if event != "pull_request":
+                self.reply(202, f"ignored event {event}")
+                return
+
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                self.reply(400, "body is not valid JSON")
+                return
+            if not isinstance(payload, dict):
+                self.reply(400, "body is not a JSON object")
+                return
+            if payload.get("action") not in REVIEW_ACTIONS:
+                self.reply(202, f"ignored action {payload.get('action')}")
+                return
+
+            try:
+                pr, head_sha = parse_pull_request(payload)
+            except ValueError as e:
+                self.reply(400, str(e))
+                return
+
+            job = scheduler.submit(pr, head_sha)
+            if job is None:
+                self.reply(503, "queue full")
+                return
+            self.reply(202, f"queued {pr} @ {job.head_sha[:7]}")
+
+    return WebhookHandler
+
+
+def serve(port: int, host: str = "0.0.0.0", scheduler: Optional[ReviewScheduler] = None) -> ThreadingHTTPServer:
+    """Create the webhook HTTP server (call serve_forever() on it)"""
+    scheduler = scheduler or ReviewScheduler()
+    return ThreadingHTTPServer((host, port), make_handler(scheduler))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the review bot as a webhook service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8080")))
+    args = parser.parse_args()
+
+    if not WEBHOOK_SECRET:
+        print("⚠️ WEBHOOK_SECRET not set — accepting unsigned deliveries")
+
+    scheduler = ReviewScheduler()
+    server = serve(args.port, args.host, scheduler)
+    print(f"🤖 Listening for GitHub webhooks on {args.host}:{args.port} ({WEBHOOK_WORKERS} workers)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️ Shutting down...")
+    finally:
+        server.server_close()
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Shared test setup
+Built by Jackson Studio
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+# The entry-point scripts validate these at import time
+os.environ.setdefault("ANTHROPIC_API_KEY", "sk-ant-test")
+os.environ.setdefault("GITHUB_TOKEN", "ghp_test")
+os.environ.setdefault("PR_NUMBER", "1")
+os.environ.setdefault("REPO_OWNER", "jackson-studio")
+os.environ.setdefault("REPO_NAME", "demo")
+
+# Never index the checkout the tests happen to run in
+os.environ.pop("GITHUB_WORKSPACE", None)
+os.environ.pop("REPO_PATH", None)
+os.environ.pop("ANALYTICS_DB", None)
+os.environ.pop("BOT_LOGIN", None)
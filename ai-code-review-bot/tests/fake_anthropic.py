@@ -0,0 +1,215 @@
+"""
+Local stand-in for the Anthropic Messages API
+Built by Jackson Studio
+
+Records every request body (with timestamps) so tests can assert on the
+exact request shape and the benchmark can attribute model latency.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler
+from typing import Dict, List, Optional
+
+from fake_github import QuietHTTPServer
+
+
+class FakeMessagesAPI:
+    """Canned Messages API responses plus a log of received requests"""
+
+    def __init__(self, text: str = "{}", usage: Optional[Dict] = None,
+                 chunk_size: int = 40, chunk_delay: float = 0.0, latency: float = 0.0):
+        self.text = text
+        # None = estimate tokens from the request and response size
+        self.usage = usage
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.chunks_sent = 0
+        self.requests: List[Dict] = []
+        # (status, headers) to answer with before succeeding
+        self.failures: List = []
+        # Message Batches: id -> {"requests": [...], "polls": int}
+        self.batches: Dict[str, Dict] = {}
+        self.polls_until_ended = 2
+
+    @property
+    def total_chunks(self) -> int:
+        return max(1, -(-len(self.text) // self.chunk_size))
+
+    def usage_for(self, body: Dict) -> Dict:
+        if self.usage is not None:
+            return self.usage
+        prompt_chars = len(json.dumps(body.get("system", ""))) + len(json.dumps(body.get("messages", [])))
+        return {"input_tokens": prompt_chars // 4, "output_tokens": len(self.text) // 4 + 1}
+
+    def message(self, body: Dict) -> Dict:
+        return {
+            "id": f"msg_{len(self.requests):04d}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-sonnet-4"),
+            "content": [{"type": "text", "text": self.text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": self.usage_for(body),
+        }
+
+    def create_batch(self, body: Dict) -> Dict:
+        batch_id = f"msgbatch_{len(self.batches):04d}"
+        self.batches[batch_id] = {"requests": body["requests"], "polls": 0}
+        return self.batch_status(batch_id, "")
+
+    def batch_status(self, batch_id: str, base_url: str) -> Dict:
+        batch = self.batches[batch_id]
+        ended = batch["polls"] >= self.polls_until_ended
+        count = len(batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {"processing": 0 if ended else count, "succeeded": count if ended else 0,
+                               "errored": 0, "canceled": 0, "expired": 0},
+            "created_at": "2026-02-15T00:00:00Z",
+            "expires_at": "2026-02-16T00:00:00Z",
+            "ended_at": "2026-02-15T00:05:00Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def batch_results(self, batch_id: str) -> str:
+        lines = []
+        for item in self.batches[batch_id]["requests"]:
+            lines.append(json.dumps({
+                "custom_id": item["custom_id"],
+                "result": {"type": "succeeded", "message": self.message(item["params"])},
+            }))
+        return "\n".join(lines) + "\n"
+
+    def stream_events(self, body: Dict):
+        """Server-sent events for a streamed message, text split into chunks"""
+        start = self.message(body)
+        start["content"] = []
+        start["stop_reason"] = None
+        usage = self.usage_for(body)
+        start["usage"] = dict(usage, output_tokens=1)
+        yield "message_start", {"type": "message_start", "message": start}
+        yield "content_block_start", {"type": "content_block_start", "index": 0,
+                                      "content_block": {"type": "text", "text": ""}}
+        for i in range(0, len(self.text), self.chunk_size):
+            yield "content_block_delta", {"type": "content_block_delta", "index": 0,
+                                          "delta": {"type": "text_delta",
+                                                    "text": self.text[i:i + self.chunk_size]}}
+        yield "content_block_stop", {"type": "content_block_stop", "index": 0}
+        yield "message_delta", {"type": "message_delta",
+                                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                "usage": {"output_tokens": usage["output_tokens"]}}
+        yield "message_stop", {"type": "message_stop"}
+
+
+def make_handler(api: FakeMessagesAPI):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            record = {"path": self.path, "headers": dict(self.headers), "body": body,
+                      "started": time.time()}
+            api.requests.append(record)
+            if api.latency:
+                time.sleep(api.latency)
+            try:
+                self.handle_post(body)
+            finally:
+                record["finished"] = time.time()
+
+        def handle_post(self, body: Dict):
+            if api.failures:
+                status, headers = api.failures.pop(0)
+                self.send_error_response(status, headers)
+                return
+
+            if self.path.startswith("/v1/messages/batches"):
+                self.send_json(api.create_batch(body))
+                return
+
+            if body.get("stream"):
+                self.send_stream(body)
+                return
+
+            self.send_json(api.message(body))
+
+        def do_GET(self):
+            base_url = f"http://{self.headers['Host']}"
+            parts = self.path.split("?")[0].strip("/").split("/")
+            # v1/messages/batches/{id}[/results]
+            if len(parts) < 4 or parts[3] not in api.batches:
+                self.send_error_response(404, {})
+                return
+
+            batch_id = parts[3]
+            if len(parts) == 5 and parts[4] == "results":
+                payload = api.batch_results(batch_id).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-jsonl")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            api.batches[batch_id]["polls"] += 1
+            self.send_json(api.batch_status(batch_id, base_url))
+
+        def send_json(self, data: Dict):
+            payload = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def send_error_response(self, status: int, headers: Dict):
+            payload = json.dumps({"type": "error", "error": {
+                "type": {429: "rate_limit_error", 404: "not_found_error"}.get(status, "overloaded_error"),
+                "message": "slow down"}}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def send_stream(self, body: Dict):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            for event, data in api.stream_events(body):
+                if event == "content_block_delta":
+                    if api.chunk_delay:
+                        time.sleep(api.chunk_delay)
+                    api.chunks_sent += 1
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+                self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+@contextmanager
+def serve(api: FakeMessagesAPI):
+    """Run the fake API on a free localhost port, yield its base URL"""
+    server = QuietHTTPServer(("127.0.0.1", 0), make_handler(api))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
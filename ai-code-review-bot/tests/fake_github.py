@@ -0,0 +1,280 @@
+"""
+Local stand-in for GitHub
+Built by Jackson Studio
+
+Builds and signs pull_request webhook deliveries the way GitHub does, and
+serves recorded (or synthetic) PR payloads over a fake REST API: PR
+details, paginated file lists, raw diffs and comment endpoints.
+"""
+
+import hashlib
+import hmac
+import json
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """Threading server that ignores clients hanging up mid-response
+
+    Tests regularly stop reading a streamed body early (that is the point of
+    streaming), which would otherwise print a traceback per connection.
+    """
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+# name -> (files, changed lines per file)
+PR_SIZES = {
+    "small": (3, 20),
+    "medium": (15, 120),
+    "huge": (300, 400),
+}
+
+
+def pull_request_payload(full_name: str, number: int, head_sha: str,
+                         action: str = "synchronize") -> Dict:
+    return {
+        "action": action,
+        "number": number,
+        "pull_request": {
+            "number": number,
+            "title": f"PR {number}",
+            "body": "",
+            "head": {"sha": head_sha},
+            "base": {"sha": "0" * 40},
+        },
+        "repository": {"full_name": full_name},
+    }
+
+
+def deliver(url: str, event: str, payload: Union[Dict, bytes], secret: str = "") -> Tuple[int, Dict]:
+    """POST a webhook delivery (a dict, or a raw body as-is); returns (status, json body)"""
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": str(uuid.uuid4()),
+    }
+    if secret:
+        digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        headers["X-Hub-Signature-256"] = f"sha256={digest}"
+
+    request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def make_pr_fixture(number: int, files: int, lines_per_file: int, head_sha: str = "f" * 40) -> Dict:
+    """Synthetic recorded PR: details, file list and unified diff"""
+    file_entries = []
+    diff_parts = []
+    for i in range(files):
+        path = f"src/module_{i:03d}/service.py" if i % 5 else f"src/auth/handler_{i:03d}.py"
+        body = [f"+def handler_{i}_{j}(request):" if j % 10 == 0 else f"+    value_{j} = request.get('k{j}')"
+                for j in range(lines_per_file)]
+        diff_parts.append(
+            f"diff --git a/{path} b/{path}\n"
+            f"index 1111111..2222222 100644\n"
+            f"--- a/{path}\n"
+            f"+++ b/{path}\n"
+            f"@@ -1,0 +1,{lines_per_file} @@\n" + "\n".join(body) + "\n"
+        )
+        file_entries.append({"filename": path, "status": "modified",
+                             "additions": lines_per_file, "deletions": 0, "changes": lines_per_file})
+
+    return {
+        "details": {
+            "number": number,
+            "title": f"Synthetic PR {number}",
+            "body": "Recorded fixture",
+            "head": {"sha": head_sha},
+            "base": {"sha": "0" * 40},
+        },
+        "files": file_entries,
+        "diff": "".join(diff_parts),
+    }
+
+
+def load_recording(path: str) -> Dict:
+    """Load a recorded PR ({"details", "files", "diff"}) from JSON"""
+    with open(path) as f:
+        return json.load(f)
+
+
+class FakeGitHubAPI:
+    """Serves PR fixtures for one repo and records every request"""
+
+    def __init__(self, owner: str = "o", repo: str = "r", latency: float = 0.0, per_page_max: int = 100):
+        self.owner = owner
+        self.repo = repo
+        self.latency = latency
+        self.per_page_max = per_page_max
+        self.pulls: Dict[int, Dict] = {}
+        self.comments: List[Dict] = []
+        self.compares: Dict[str, Dict] = {}
+        self.requests: List[Dict] = []
+        # Author of comments posted through the API, as the Actions token would be
+        self.user = {"login": "github-actions[bot]", "type": "Bot"}
+
+    def add_pull(self, fixture: Dict):
+        self.pulls[fixture["details"]["number"]] = fixture
+
+    def add_compare(self, base: str, head: str, compare: Dict):
+        """Serve /compare/base...head ({"status", "commits", "files", "diff"})"""
+        self.compares[f"{base}...{head}"] = compare
+
+    def page(self, items: List, query: Dict, base_url: str, path: str) -> Tuple[List, Dict]:
+        per_page = min(int(query.get("per_page", ["30"])[0]), self.per_page_max)
+        page = int(query.get("page", ["1"])[0])
+        chunk = items[(page - 1) * per_page:page * per_page]
+        headers = {}
+        if page * per_page < len(items):
+            headers["Link"] = f'<{base_url}{path}?per_page={per_page}&page={page + 1}>; rel="next"'
+        return chunk, headers
+
+
+def make_github_handler(api: FakeGitHubAPI):
+    prefix = f"/repos/{api.owner}/{api.repo}"
+    pull_re = re.compile(rf"^{prefix}/pulls/(\d+)$")
+    files_re = re.compile(rf"^{prefix}/pulls/(\d+)/files$")
+    comment_re = re.compile(rf"^{prefix}/(pulls|issues)/(\d+)/comments$")
+    compare_re = re.compile(rf"^{prefix}/compare/(\w+\.\.\.\w+)$")
+    comment_id_re = re.compile(rf"^{prefix}/issues/comments/(\d+)$")
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send(self, status: int, payload, content_type: str = "application/json", headers: Dict = None):
+            data = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("x-ratelimit-remaining", "4999")
+            self.send_header("x-ratelimit-reset", str(int(time.time()) + 3600))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def record(self, method: str, body=None) -> Dict:
+            entry = {"method": method, "path": self.path, "body": body, "started": time.time()}
+            api.requests.append(entry)
+            if api.latency:
+                time.sleep(api.latency)
+            return entry
+
+        def do_GET(self):
+            entry = self.record("GET")
+            try:
+                self.handle_get()
+            finally:
+                entry["finished"] = time.time()
+
+        def handle_get(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            base_url = f"http://{self.headers['Host']}"
+
+            if url.path == f"{prefix}/pulls":
+                pulls = [p["details"] for p in api.pulls.values()]
+                chunk, headers = api.page(pulls, query, base_url, url.path)
+                self.send(200, chunk, headers=headers)
+                return
+
+            match = files_re.match(url.path)
+            if match and int(match.group(1)) in api.pulls:
+                files = api.pulls[int(match.group(1))]["files"]
+                chunk, headers = api.page(files, query, base_url, url.path)
+                self.send(200, chunk, headers=headers)
+                return
+
+            match = comment_re.match(url.path)
+            if match:
+                comments = [c for c in api.comments
+                            if c["kind"] == match.group(1) and c["pull"] == int(match.group(2))]
+                chunk, headers = api.page(comments, query, base_url, url.path)
+                self.send(200, chunk, headers=headers)
+                return
+
+            match = compare_re.match(url.path)
+            if match and match.group(1) in api.compares:
+                compare = api.compares[match.group(1)]
+                if "diff" in self.headers.get("Accept", ""):
+                    self.send(200, compare["diff"], content_type="text/plain; charset=utf-8")
+                else:
+                    self.send(200, {k: v for k, v in compare.items() if k != "diff"})
+                return
+
+            match = pull_re.match(url.path)
+            if match and int(match.group(1)) in api.pulls:
+                pull = api.pulls[int(match.group(1))]
+                if "diff" in self.headers.get("Accept", ""):
+                    self.send(200, pull["diff"], content_type="text/plain; charset=utf-8")
+                else:
+                    self.send(200, pull["details"])
+                return
+
+            self.send(404, {"message": "Not Found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            entry = self.record("POST", body)
+            try:
+                match = comment_re.match(urlparse(self.path).path)
+                if not match:
+                    self.send(404, {"message": "Not Found"})
+                    return
+                comment = dict(body, id=len(api.comments) + 1, kind=match.group(1),
+                               pull=int(match.group(2)), user=api.user)
+                api.comments.append(comment)
+                self.send(201, comment)
+            finally:
+                entry["finished"] = time.time()
+
+        def do_PATCH(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            entry = self.record("PATCH", body)
+            try:
+                match = comment_id_re.match(urlparse(self.path).path)
+                comment = next((c for c in api.comments
+                                if match and c["kind"] == "issues" and c["id"] == int(match.group(1))), None)
+                if comment is None:
+                    self.send(404, {"message": "Not Found"})
+                    return
+                comment.update(body)
+                self.send(200, comment)
+            finally:
+                entry["finished"] = time.time()
+
+    return Handler
+
+
+@contextmanager
+def serve_github(api: FakeGitHubAPI):
+    """Run the fake REST API on a free localhost port, yield its base URL"""
+    server = QuietHTTPServer(("127.0.0.1", 0), make_github_handler(api))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
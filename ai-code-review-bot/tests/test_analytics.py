@@ -0,0 +1,81 @@
+"""
+Tests for the SQLite review analytics store
+Built by Jackson Studio
+"""
+
+import os
+import subprocess
+import sys
+
+from utils import analytics, metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_record(run_id, repo, duration_ms, cost, timestamp="2026-03-04T10:00:00+00:00", outcome="ok",
+                **counters):
+    return {"run_id": run_id, "timestamp": timestamp, "repo": repo, "pr": 1, "model": "claude-sonnet-4",
+            "outcome": outcome, "duration_ms": duration_ms, "cost": cost,
+            "stages": {"fetch": duration_ms / 4, "model": duration_ms / 2},
+            "tokens": {"input_tokens": 1000, "output_tokens": 200}, "counters": counters}
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert analytics.percentile(values, 50) == 50
+    assert analytics.percentile(values, 95) == 95
+    assert analytics.percentile([7], 95) == 7
+    assert analytics.percentile([], 50) is None
+
+
+def test_weekly_and_stage_reports(tmp_path):
+    db = str(tmp_path / "runs.db")
+    for i in range(20):
+        analytics.record_run(make_record(f"a{i}", "o/a", 1000 + i * 100, 0.01,
+                                         anthropic_retries=1 if i < 5 else 0, diff_bytes=5000), db)
+    analytics.record_run(make_record("b0", "o/b", 500, 0.02, timestamp="2026-03-10T09:00:00+00:00",
+                                     diff_bytes=2_000_000), db)
+    # Runs that stopped before the model call are counted, not averaged in
+    for i, outcome in enumerate(["skipped", "skipped", "over_budget"]):
+        analytics.record_run(make_record(f"s{i}", "o/a", 5, 0.0, outcome=outcome, diff_bytes=100), db)
+
+    conn = analytics.connect(db)
+    weekly = {(row["repo"], row["week"]): row for row in analytics.weekly_report(conn)}
+    stages = {row["stage"]: row for row in analytics.stage_report(conn, repo="o/a")}
+    sizes = {row["size"]: row for row in analytics.size_report(conn)}
+    conn.close()
+
+    a = weekly[("o/a", "2026-W10")]
+    assert (a["runs"], a["p50_ms"], a["p95_ms"], a["cost"], a["retry_rate"]) == (20, 1900, 2800, 0.2, 0.25)
+    assert a["skipped"] == 3
+    assert weekly[("o/b", "2026-W11")]["runs"] == 1
+    assert stages["model"]["p95_ms"] == 1400 and stages["fetch"]["runs"] == 20
+    assert sizes["<10KB"]["runs"] == 20 and sizes[">1MB"]["avg_cost"] == 0.02
+
+
+def test_run_metrics_stores_each_run(tmp_path, monkeypatch):
+    db = str(tmp_path / "runs.db")
+    monkeypatch.setattr(analytics, "ANALYTICS_DB", db)
+
+    with metrics.run_metrics(script="review", repo="o/r", pr=3, model="claude-sonnet-4") as run:
+        run.labels["head_sha"] = "abc123"
+        with run.span("fetch"):
+            run.incr("diff_bytes", 1234)
+
+    conn = analytics.connect(db)
+    row = conn.execute("SELECT repo, pr, head_sha, outcome, diff_bytes FROM review_runs").fetchone()
+    stages = [r["stage"] for r in conn.execute("SELECT stage FROM review_stages")]
+    conn.close()
+    assert tuple(row) == ("o/r", 3, "abc123", "ok", 1234)
+    assert stages == ["fetch"]
+
+
+def test_report_command_prints_tables(tmp_path):
+    db = str(tmp_path / "runs.db")
+    analytics.record_run(make_record("a0", "o/a", 1500, 0.05), db)
+
+    result = subprocess.run([sys.executable, "scripts/report.py", "--db", db, "--weeks", "0"],
+                            capture_output=True, text=True, cwd=ROOT)
+
+    assert result.returncode == 0, result.stderr
+    assert "o/a" in result.stdout and "$0.05" in result.stdout and "1.5s" in result.stdout
@@ -0,0 +1,105 @@
+"""
+Tests for bulk backfill via the Message Batches API
+Built by Jackson Studio
+"""
+
+import json
+
+from anthropic import Anthropic
+
+import backfill
+import review
+from fake_anthropic import FakeMessagesAPI, serve
+from utils import analytics
+from utils.cost_tracker import calculate_cost
+from utils.github_client import PullRequest
+
+REVIEW_JSON = json.dumps({
+    "summary": "ok", "severity": "medium",
+    "issues": [{"file": "app.py", "line": 3, "severity": "medium", "category": "bug", "message": "m"}],
+    "positives": [],
+})
+
+
+def fake_github(monkeypatch, posted):
+    monkeypatch.setattr(review, "get_pr_details",
+                        lambda pr=None: {"title": f"PR {pr.number}", "body": "", "head": {"sha": "abc"}})
+    monkeypatch.setattr(review, "get_pr_files",
+                        lambda pr=None: [{"filename": "app.py", "additions": 1, "deletions": 0}])
+    monkeypatch.setattr(review, "get_pr_diff", lambda pr=None: "")
+    monkeypatch.setattr(review, "get_issue_comments", lambda pr=None: [])
+    monkeypatch.setattr(review, "get_review_comments", lambda pr=None: [])
+    monkeypatch.setattr(review, "post_general_comment", lambda body, pr=None: posted.append(("summary", pr.number)))
+    monkeypatch.setattr(review, "post_review_comment",
+                        lambda body, commit_id, path=None, line=None, pr=None: posted.append(("inline", pr.number)))
+
+
+def test_backfill_submits_one_batch_and_posts_every_result(monkeypatch):
+    posted = []
+    fake_github(monkeypatch, posted)
+    api = FakeMessagesAPI(text=REVIEW_JSON, usage={"input_tokens": 1000, "output_tokens": 200})
+
+    with serve(api) as base_url:
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        prepared = backfill.gather_prompts([PullRequest("o", "r", n) for n in (1, 2, 3)])
+        batch_id = backfill.submit_batch(prepared)
+        batch = backfill.wait_for_batch(batch_id, initial=0.01, maximum=0.02)
+        totals = backfill.publish_results(batch_id, prepared)
+
+    creates = [r for r in api.requests if r["path"] == "/v1/messages/batches"]
+    assert len(creates) == 1
+    sent = creates[0]["body"]["requests"]
+    assert [item["custom_id"] for item in sent] == ["pr-1", "pr-2", "pr-3"]
+    assert sent[0]["params"]["system"][0]["cache_control"] == {"type": "ephemeral"}
+
+    assert batch.processing_status == "ended"
+    assert totals["succeeded"] == 3
+    assert sorted(posted) == sorted([("inline", n) for n in (1, 2, 3)] + [("summary", n) for n in (1, 2, 3)])
+
+
+def test_batch_pricing_is_half_of_sync(monkeypatch):
+    posted = []
+    fake_github(monkeypatch, posted)
+    api = FakeMessagesAPI(text=REVIEW_JSON, usage={"input_tokens": 1_000_000, "output_tokens": 0})
+    api.polls_until_ended = 0
+
+    with serve(api) as base_url:
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        prepared = backfill.gather_prompts([PullRequest("o", "r", 9)])
+        batch_id = backfill.submit_batch(prepared)
+        backfill.wait_for_batch(batch_id, initial=0.01)
+        totals = backfill.publish_results(batch_id, prepared, dry_run=True)
+
+    assert posted == []
+    assert abs(totals["cost"] - 1.50) < 1e-9
+
+
+def test_every_backfilled_pr_is_recorded_at_batch_pricing(monkeypatch, tmp_path):
+    posted = []
+    fake_github(monkeypatch, posted)
+    # PR 4 only touches a lockfile: skipped before the batch
+    monkeypatch.setattr(review, "get_pr_files", lambda pr=None: [
+        {"filename": "yarn.lock" if pr.number == 4 else "app.py", "additions": 1, "deletions": 0}])
+    db = str(tmp_path / "runs.db")
+    monkeypatch.setattr(analytics, "ANALYTICS_DB", db)
+    usage = {"input_tokens": 1000, "output_tokens": 200}
+    api = FakeMessagesAPI(text=REVIEW_JSON, usage=usage)
+    api.polls_until_ended = 0
+
+    with serve(api) as base_url:
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        prepared = backfill.gather_prompts([PullRequest("o", "r", n) for n in (1, 2, 4)])
+        batch_id = backfill.submit_batch(prepared)
+        backfill.wait_for_batch(batch_id, initial=0.01)
+        backfill.publish_results(batch_id, prepared)
+
+    conn = analytics.connect(db)
+    rows = {row["pr"]: row for row in conn.execute("SELECT pr, script, outcome, cost, input_tokens, record "
+                                                    "FROM review_runs")}
+    conn.close()
+    assert sorted(rows) == [1, 2, 4]
+    assert rows[4]["outcome"] == "skipped" and rows[4]["cost"] == 0
+    for pr in (1, 2):
+        assert (rows[pr]["script"], rows[pr]["outcome"], rows[pr]["input_tokens"]) == ("backfill", "ok", 1000)
+        assert rows[pr]["cost"] == round(calculate_cost(usage, review.MODEL, batch=True), 6)
+        assert json.loads(rows[pr]["record"])["batch_id"] == batch_id
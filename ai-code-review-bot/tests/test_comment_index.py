@@ -0,0 +1,119 @@
+"""
+Tests for de-duplicating the bot's findings and summary comment
+Built by Jackson Studio
+"""
+
+import json
+
+from anthropic import Anthropic
+
+import review
+from fake_anthropic import FakeMessagesAPI, serve
+from fake_github import FakeGitHubAPI, make_pr_fixture, serve_github
+from reviewers.comment_index import (
+    NOTICE_MARKER, diff_anchors, finding_fingerprint, finding_marker, index_comments, normalize_message
+)
+from reviewers.incremental import review_marker
+from utils import github_client
+from utils.diff_parser import parse_diff
+from utils.github_client import PullRequest
+
+DIFF = (
+    "diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n"
+    "@@ -1,2 +1,3 @@\n import os\n+os.system(cmd)\n-x = 1\n print(x)\n"
+)
+
+
+BOT = {"login": "github-actions[bot]", "type": "Bot"}
+AUTHOR = {"login": "octocat", "type": "User"}
+
+
+def issue(message, line=2, path="app.py"):
+    return {"file": path, "line": line, "severity": "high", "category": "security", "message": message}
+
+
+def test_fingerprint_ignores_wording_noise_but_not_content():
+    anchors = diff_anchors(parse_diff(DIFF))
+    assert anchors[("app.py", 2)] == "os.system(cmd)"
+    assert anchors[("app.py", 3)] == "print(x)"
+
+    same = finding_fingerprint(issue("Shell injection on line 2!"), anchors)
+    assert same == finding_fingerprint(issue("shell injection  on line 7"), anchors)
+    assert same != finding_fingerprint(issue("Shell injection"), {("app.py", 2): "os.system(other)"})
+    assert same != finding_fingerprint(issue("Unchecked return value"), anchors)
+    assert normalize_message("Use `subprocess.run`, not lines 3-4.") == "use subprocess run not"
+
+
+def test_index_finds_markers_in_both_comment_lists():
+    review_comments = [{"id": 1, "body": "x\n" + finding_marker("a" * 12), "user": BOT}]
+    issue_comments = [{"id": 2, "body": "old summary " + review_marker("1" * 40), "user": BOT},
+                      {"id": 3, "body": "fallback\n" + finding_marker("b" * 12), "user": BOT},
+                      {"id": 4, "body": "new summary " + review_marker("2" * 40), "user": BOT},
+                      {"id": 5, "body": None, "user": BOT}]
+
+    index = index_comments(issue_comments, review_comments)
+
+    assert set(index.findings) == {"a" * 12, "b" * 12}
+    assert index.summary["id"] == 4
+
+
+def test_index_ignores_markers_in_other_authors_comments():
+    review_comments = [{"id": 1, "body": "x\n" + finding_marker("a" * 12), "user": BOT},
+                       {"id": 2, "body": "nope\n" + finding_marker("c" * 12), "user": AUTHOR}]
+    issue_comments = [{"id": 3, "body": "summary " + review_marker("1" * 40), "user": BOT},
+                      {"id": 4, "body": "> summary " + review_marker("1" * 40), "user": AUTHOR},
+                      {"id": 5, "body": "> fallback\n" + finding_marker("d" * 12)}]
+
+    index = index_comments(issue_comments, review_comments)
+
+    assert set(index.findings) == {"a" * 12}
+    assert index.summary["id"] == 3
+    assert index_comments(issue_comments, review_comments, bot_login="octocat").summary["id"] == 4
+
+
+def test_rerun_posts_only_new_findings_and_edits_summary(monkeypatch):
+    github = FakeGitHubAPI()
+    fixture = make_pr_fixture(4, files=1, lines_per_file=5)
+    github.add_pull(fixture)
+    path = fixture["files"][0]["filename"]
+    first = {"summary": "One issue", "severity": "medium", "positives": [],
+             "issues": [dict(issue("Request value is not validated", line=3, path=path), severity="medium")]}
+    second = dict(first, summary="Two issues", issues=first["issues"] + [
+        dict(issue("Handler lacks error handling", line=1, path=path), severity="low")])
+    api = FakeMessagesAPI(text=json.dumps(first))
+    monkeypatch.setattr(review, "INCREMENTAL_REVIEW", False)
+
+    with serve_github(github) as github_url, serve(api) as anthropic_url:
+        monkeypatch.setattr(github_client, "GITHUB_API_URL", github_url)
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=anthropic_url, max_retries=0))
+        review.run_review(PullRequest("o", "r", 4))
+        api.text = json.dumps(second)
+        review.run_review(PullRequest("o", "r", 4))
+
+    inline = [c for c in github.comments if c["kind"] == "pulls"]
+    summaries = [c for c in github.comments if c["kind"] == "issues"]
+    assert [c["line"] for c in inline] == [3, 1]
+    assert len(summaries) == 1 and "Two issues" in summaries[0]["body"]
+    assert [r["method"] for r in github.requests].count("PATCH") == 1
+
+
+def test_skip_notice_is_edited_on_every_later_push(monkeypatch):
+    github = FakeGitHubAPI()
+    fixture = make_pr_fixture(7, files=3, lines_per_file=5)
+    github.add_pull(fixture)
+    monkeypatch.setattr(review, "MAX_FILES", 2)
+
+    with serve_github(github) as github_url:
+        monkeypatch.setattr(github_client, "GITHUB_API_URL", github_url)
+        for head in ("1" * 40, "2" * 40, "3" * 40):
+            fixture["details"]["head"]["sha"] = head
+            assert review.run_review(PullRequest("o", "r", 7)) is None
+
+    posts = [r for r in github.requests if r["method"] == "POST"]
+    edits = [r for r in github.requests if r["method"] == "PATCH"]
+    assert len(posts) == 1 and len(edits) == 2
+    assert len(github.comments) == 1
+    assert "changes 3 files (limit: 2)" in github.comments[0]["body"]
+    assert NOTICE_MARKER in github.comments[0]["body"]
+    # Not a review: the next push still gets a full one
+    assert index_comments(github.comments, []).summary is None
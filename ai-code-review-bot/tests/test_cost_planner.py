@@ -0,0 +1,95 @@
+"""
+Tests for pre-flight cost planning
+Built by Jackson Studio
+"""
+
+import pytest
+
+from reviewers import claude_reviewer
+from reviewers.cost_planner import plan_review, worst_case_cost
+from reviewers.prompt_builder import pack_diff
+from utils.diff_parser import parse_diff
+
+MODEL = "claude-sonnet-4"
+SYSTEM = "x" * 3500  # ~1000 tokens
+
+
+def big_diff(files: int = 20, lines: int = 400) -> str:
+    parts = []
+    for i in range(files):
+        body = "\n".join(f"+    value_{j} = request.get('key_{j}')" for j in range(lines))
+        parts.append(f"diff --git a/src/m{i}.py b/src/m{i}.py\n--- a/src/m{i}.py\n+++ b/src/m{i}.py\n"
+                     f"@@ -1,0 +1,{lines} @@\n{body}\n")
+    return "".join(parts)
+
+
+def plan(limit):
+    file_diffs = parse_diff(big_diff())
+    return plan_review(
+        pack=lambda budget: pack_diff(file_diffs, budget),
+        build_prompt=lambda packed: "Review this pull request.\n" + packed.text,
+        depths=[("balanced", SYSTEM, 4096), ("quick", SYSTEM, 1024)],
+        model=MODEL,
+        limit=limit,
+    )
+
+
+def test_worst_case_assumes_cache_write_and_full_output():
+    cost = worst_case_cost(SYSTEM, "", 1000, MODEL)
+    assert cost == pytest.approx((1100 * 1.25 * 3 + 1 * 3 + 1000 * 15) / 1_000_000, rel=0.01)
+
+
+@pytest.mark.parametrize("limit, action, depth", [
+    (None, "full", "balanced"),
+    (0.20, "full", "balanced"),
+    (0.10, "reduced-depth", "quick"),
+    (0.04, "shrunk", "quick"),
+    (0.02, "refused", "quick"),
+])
+def test_plan_fits_under_limit(limit, action, depth):
+    result = plan(limit)
+
+    assert result.action == action
+    assert result.depth == depth
+    if limit and action != "refused":
+        assert result.estimated_cost <= limit
+
+
+def test_shrunk_plan_reports_what_was_left_out():
+    result = plan(0.04)
+
+    assert result.packed.tokens < 16000
+    assert result.packed.omitted or result.packed.partial
+
+
+def test_claude_reviewer_refuses_before_calling_the_model(monkeypatch):
+    files = [{"filename": f"src/m{i}.py", "status": "added", "additions": 400, "deletions": 0, "changes": 400}
+             for i in range(20)]
+    monkeypatch.setattr(claude_reviewer, "get_pr_diff", lambda since=None: iter(big_diff().splitlines()))
+    monkeypatch.setattr(claude_reviewer, "get_pr_files", lambda: files)
+    monkeypatch.setattr(claude_reviewer, "get_issue_comments", lambda: [])
+    monkeypatch.setattr(claude_reviewer, "COST_LIMIT", 0.005)
+
+    def no_call(*args, **kwargs):
+        raise AssertionError("model must not be called")
+
+    monkeypatch.setattr(claude_reviewer, "review_with_claude", no_call)
+
+    with pytest.raises(SystemExit) as exit_info:
+        claude_reviewer.main()
+    assert exit_info.value.code == 0
+
+
+@pytest.mark.parametrize("limit, cost, warned", [(0, 0.01, False), (0.10, 0.01, False), (0, 5.0, True)])
+def test_claude_reviewer_warns_only_above_the_estimate(monkeypatch, capsys, limit, cost, warned):
+    files = [{"filename": "src/m0.py", "status": "added", "additions": 5, "deletions": 0, "changes": 5}]
+    monkeypatch.setattr(claude_reviewer, "get_pr_diff", lambda since=None: iter(big_diff(1, 5).splitlines()))
+    monkeypatch.setattr(claude_reviewer, "get_pr_files", lambda: files)
+    monkeypatch.setattr(claude_reviewer, "get_issue_comments", lambda: [])
+    monkeypatch.setattr(claude_reviewer, "COST_LIMIT", limit)
+    monkeypatch.setattr(claude_reviewer, "review_with_claude", lambda prompt, depth, model: ("Looks fine", cost))
+    monkeypatch.setattr(claude_reviewer, "post_review_comment", lambda *args, **kwargs: None)
+
+    claude_reviewer.main()
+
+    assert ("exceeded the pre-flight estimate" in capsys.readouterr().out) == warned
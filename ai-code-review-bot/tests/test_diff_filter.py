@@ -0,0 +1,142 @@
+"""
+Tests for the pre-review diff filter
+Built by Jackson Studio
+"""
+
+import review
+from reviewers.diff_filter import (
+    classify_file_diff, filter_files, glob_to_regex, ignore_patterns, path_skip_reason
+)
+from reviewers.incremental import review_marker
+from reviewers.prompt_builder import pack_pr_diff
+from utils.diff_parser import parse_diff
+from utils.github_client import PullRequest
+
+
+def file_diff(path: str, lines: str, header: str = "index 111..222 100644") -> str:
+    return (f"diff --git a/{path} b/{path}\n{header}\n--- a/{path}\n+++ b/{path}\n"
+            f"@@ -1,3 +1,3 @@\n{lines}\n")
+
+
+def entry(path: str, status: str = "modified", changes: int = 4) -> dict:
+    return {"filename": path, "status": status, "additions": changes // 2,
+            "deletions": changes // 2, "changes": changes}
+
+
+def test_config_globs_are_honoured_at_any_depth():
+    patterns = ignore_patterns()
+    assert "dist/**" in patterns
+
+    assert path_skip_reason("dist/app.js") == "ignored"
+    assert path_skip_reason("packages/web/dist/app.js") == "ignored"
+    assert path_skip_reason("src/button.test.ts") == "ignored"
+    assert path_skip_reason("src/distance.py") is None
+    assert path_skip_reason("src/button.ts") is None
+
+
+def test_glob_translation():
+    assert glob_to_regex("/docs/*.md") == r"^docs/[^/]*\.md$"
+    assert path_skip_reason("a/b/c.snap", patterns=["**/*.snap"]) == "ignored"
+    assert path_skip_reason("root.snap", patterns=["**/*.snap"]) == "ignored"
+
+
+def test_skip_patterns_env_adds_globs(monkeypatch):
+    monkeypatch.setenv("SKIP_PATTERNS", "*.mock.js, docs/**")
+    assert path_skip_reason("src/api.mock.js") == "ignored"
+    assert path_skip_reason("docs/intro.md") == "ignored"
+
+
+def test_vendored_generated_and_renamed_files_are_skipped():
+    files = [
+        entry("vendor/github.com/x/y.go"),
+        entry("api/service_pb2.py"),
+        entry("go.sum"),
+        entry("src/old_name.py", status="renamed", changes=0),
+        entry("src/real.py"),
+    ]
+    kept, skipped = filter_files(files, patterns=[])
+
+    assert [f["filename"] for f in kept] == ["src/real.py"]
+    assert [s["reason"] for s in skipped] == ["vendored", "generated", "generated", "rename-only"]
+
+
+def test_whitespace_only_hunks_are_dropped_from_mixed_files():
+    diff = (
+        "diff --git a/app.js b/app.js\nindex 1..2 100644\n--- a/app.js\n+++ b/app.js\n"
+        "@@ -1,2 +1,3 @@\n-if (a) {\n-  go();\n+if (a) {   \n+    go();\n+\n"
+        "@@ -40,1 +40,1 @@\n-const limit = 10;\n+const limit = 100;\n"
+    )
+    reason, trimmed = classify_file_diff(parse_diff(diff)[0], patterns=[])
+
+    assert reason is None
+    assert len(trimmed.hunks) == 1
+    assert "limit = 100" in trimmed.render()
+
+
+def test_reindenting_python_is_not_whitespace_only():
+    diff = file_diff("app.py", "-if a:\n-    go()\n+if a:\n+go()")
+    assert classify_file_diff(parse_diff(diff)[0], patterns=[])[0] is None
+
+    trailing = file_diff("app.py", "-x = 1   \n+x = 1")
+    assert classify_file_diff(parse_diff(trailing)[0], patterns=[])[0] == "whitespace-only"
+
+
+def test_whitespace_inside_a_line_is_a_real_change():
+    shell = file_diff("build.sh", "-rm -rf /tmp/build\n+rm -rf / tmp/build")
+    string = file_diff("src/greet.js", "-const sep = ', ';\n+const sep = ',';")
+    collapsed = file_diff("src/greet.js", "-log('a b');\n+log('a  b');")
+
+    for diff in (shell, string, collapsed):
+        assert classify_file_diff(parse_diff(diff)[0], patterns=[])[0] is None
+
+
+def test_generated_banner_and_pure_rename_in_diff():
+    generated = file_diff("src/client.ts", "+// Code generated by openapi-gen. DO NOT EDIT.\n+export const x = 1;")
+    rename = "diff --git a/a.py b/b.py\nsimilarity index 100%\nrename from a.py\nrename to b.py\n"
+
+    assert classify_file_diff(parse_diff(generated)[0], patterns=[])[0] == "generated"
+    assert classify_file_diff(parse_diff(rename)[0], patterns=[])[0] == "rename-only"
+
+
+def test_pack_pr_diff_reports_trivial_files():
+    diff = file_diff("src/fmt.js", "-  a(b)\n+\ta(b) ") + file_diff("src/logic.js", "-x = 1\n+x = 2")
+    packed = pack_pr_diff(diff, [entry("src/fmt.js"), entry("src/logic.js")], "claude-sonnet-4")
+
+    assert packed.included == ["src/logic.js"]
+    assert packed.skipped == [{"file": "src/fmt.js", "additions": 1, "deletions": 1, "reason": "whitespace-only"}]
+
+
+def test_trivial_pr_skips_model_call(monkeypatch):
+    files = [entry("yarn.lock"), entry("dist/bundle.js")]
+    monkeypatch.setattr(review, "get_pr_details", lambda pr=None: {"title": "Bump", "head": {"sha": "abc"}})
+    monkeypatch.setattr(review, "get_pr_files", lambda pr=None: files)
+    monkeypatch.setattr(review, "get_issue_comments", lambda pr=None: [])
+    monkeypatch.setattr(review, "get_review_comments", lambda pr=None: [])
+
+    def get_pr_diff(pr=None):
+        raise AssertionError("diff should not be downloaded")
+
+    monkeypatch.setattr(review, "get_pr_diff", get_pr_diff)
+    notices = []
+    monkeypatch.setattr(review, "post_general_comment", lambda body, pr=None: notices.append(body))
+
+    assert review.prepare_review(PullRequest("o", "r", 1)) is None
+    assert "trivial" in notices[0]
+
+
+def test_trivial_push_keeps_previous_summary(monkeypatch):
+    summary = {"id": 7, "body": "## 🤖 AI Code Review\nLooks fine\n" + review_marker("a" * 40),
+               "user": {"login": "github-actions[bot]", "type": "Bot"}}
+    monkeypatch.setattr(review, "INCREMENTAL_REVIEW", False)
+    monkeypatch.setattr(review, "get_pr_details", lambda pr=None: {"title": "Bump", "head": {"sha": "b" * 40}})
+    monkeypatch.setattr(review, "get_pr_files", lambda pr=None: [entry("yarn.lock")])
+    monkeypatch.setattr(review, "get_issue_comments", lambda pr=None: [summary])
+    monkeypatch.setattr(review, "get_review_comments", lambda pr=None: [])
+    posted, edits = [], []
+    monkeypatch.setattr(review, "post_general_comment", lambda body, pr=None: posted.append(body))
+    monkeypatch.setattr(review, "update_general_comment",
+                        lambda comment_id, body, pr=None: edits.append((comment_id, body)))
+
+    assert review.prepare_review(PullRequest("o", "r", 1)) is None
+    assert not posted
+    assert edits == [(7, "## 🤖 AI Code Review\nLooks fine\n" + review_marker("b" * 40))]
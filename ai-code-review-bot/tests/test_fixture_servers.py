@@ -0,0 +1,61 @@
+"""
+Tests for the local GitHub stand-in and the benchmark harness
+Built by Jackson Studio
+"""
+
+import argparse
+import os
+import sys
+
+import review
+from fake_github import FakeGitHubAPI, QuietHTTPServer, make_github_handler, make_pr_fixture, serve_github
+from utils import github_client
+from utils.github_client import PullRequest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import run_benchmark
+
+
+def test_get_pr_files_follows_pagination(monkeypatch):
+    api = FakeGitHubAPI()
+    api.add_pull(make_pr_fixture(5, files=250, lines_per_file=2))
+
+    with serve_github(api) as base_url:
+        monkeypatch.setattr(github_client, "GITHUB_API_URL", base_url)
+        files = review.get_pr_files(PullRequest("o", "r", 5))
+        diff = "\n".join(review.get_pr_diff(PullRequest("o", "r", 5)))
+
+    assert len(files) == 250
+    assert len([r for r in api.requests if "/files" in r["path"]]) == 3
+    assert diff.startswith("diff --git")
+
+
+def test_benchmark_runs_review_script_end_to_end():
+    args = argparse.Namespace(github_latency=0.0, model_latency=0.0, chunk_delay=0.0, max_files=1000)
+    fixture = make_pr_fixture(1, files=2, lines_per_file=5)
+
+    result = run_benchmark.run_once("review.py", "small", fixture, args)
+
+    assert result["exit_code"] == 0, result["stderr"]
+    assert result["model_requests"] == 1
+    assert result["github_posts"] == 3  # two inline comments + summary
+    assert result["cost"] > 0
+
+
+def test_fake_servers_ignore_clients_hanging_up(capsys):
+    server = QuietHTTPServer(("127.0.0.1", 0), make_github_handler(FakeGitHubAPI()))
+    try:
+        for error in (BrokenPipeError(), ConnectionResetError()):
+            try:
+                raise error
+            except OSError:
+                server.handle_error(None, ("127.0.0.1", 0))
+        assert capsys.readouterr().err == ""
+
+        try:
+            raise ValueError("handler bug")
+        except ValueError:
+            server.handle_error(None, ("127.0.0.1", 0))
+        assert "ValueError: handler bug" in capsys.readouterr().err
+    finally:
+        server.server_close()
@@ -0,0 +1,124 @@
+"""
+Tests for incremental review since the last reviewed head
+Built by Jackson Studio
+"""
+
+import json
+
+from anthropic import Anthropic
+
+import review
+from fake_anthropic import FakeMessagesAPI, serve
+from fake_github import FakeGitHubAPI, make_pr_fixture, serve_github
+from reviewers.incremental import is_bot_comment, is_fast_forward, last_reviewed_sha, review_marker
+from utils import github_client
+from utils.github_client import PullRequest
+
+OLD_HEAD = "a" * 40
+NEW_HEAD = "b" * 40
+BOT = {"login": "github-actions[bot]", "type": "Bot"}
+AUTHOR = {"login": "octocat", "type": "User"}
+REVIEW_TEXT = json.dumps({"summary": "Looks fine", "severity": "low", "issues": [], "positives": []})
+NEW_COMMIT_DIFF = (
+    "diff --git a/src/auth/session.py b/src/auth/session.py\n--- a/src/auth/session.py\n"
+    "+++ b/src/auth/session.py\n@@ -1,0 +1,1 @@\n+TIMEOUT = 0\n"
+)
+
+
+def test_marker_round_trip_uses_newest_comment():
+    comments = [{"body": "first " + review_marker(OLD_HEAD), "user": BOT}, {"body": "chatter", "user": BOT},
+                {"body": "second " + review_marker(NEW_HEAD), "user": BOT}, {"body": None, "user": BOT}]
+    assert last_reviewed_sha(comments) == NEW_HEAD
+    assert last_reviewed_sha([{"body": "no marker", "user": BOT}]) is None
+
+
+def test_markers_from_other_authors_are_ignored():
+    comments = [{"body": review_marker(OLD_HEAD), "user": BOT},
+                {"body": "> quoted " + review_marker(NEW_HEAD), "user": AUTHOR},
+                {"body": review_marker(NEW_HEAD)}]
+    assert last_reviewed_sha(comments) == OLD_HEAD
+
+    # With BOT_LOGIN only that account counts, bot or not
+    mine = {"login": "review-bot", "type": "User"}
+    assert is_bot_comment({"user": mine}, "review-bot")
+    assert not is_bot_comment({"user": BOT}, "review-bot")
+    assert last_reviewed_sha(comments + [{"body": review_marker("c" * 40), "user": mine}], "review-bot") == "c" * 40
+
+
+def test_foreign_marker_for_current_head_does_not_skip_review(monkeypatch):
+    github = FakeGitHubAPI()
+    fixture = make_pr_fixture(5, files=1, lines_per_file=5, head_sha=NEW_HEAD)
+    github.add_pull(fixture)
+    # The PR author claims the current head was already reviewed
+    github.comments.append({"id": 1, "kind": "issues", "pull": 5, "user": AUTHOR,
+                            "body": "lgtm " + review_marker(NEW_HEAD)})
+    api = FakeMessagesAPI(text=REVIEW_TEXT)
+
+    with serve_github(github) as github_url, serve(api) as anthropic_url:
+        monkeypatch.setattr(github_client, "GITHUB_API_URL", github_url)
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=anthropic_url, max_retries=0))
+        review.run_review(PullRequest("o", "r", 5))
+
+    assert len(api.requests) == 1
+    assert api.requests[0]["body"]["messages"][0]["content"].startswith("Review this pull request.")
+    # The author's comment is left alone; the bot posts its own summary
+    assert github.comments[0]["body"] == "lgtm " + review_marker(NEW_HEAD)
+    assert not [r for r in github.requests if r["method"] == "PATCH"]
+
+
+def test_fast_forward_requires_ahead_without_merges():
+    assert is_fast_forward({"status": "ahead", "commits": [{"parents": [{"sha": "x"}]}]})
+    assert not is_fast_forward({"status": "diverged", "commits": []})
+    assert not is_fast_forward({"status": "ahead", "commits": [{"parents": [{"sha": "x"}, {"sha": "y"}]}]})
+
+
+def run_twice(monkeypatch, compare_status):
+    """Review at OLD_HEAD, push NEW_HEAD, review again; returns (github, anthropic) fakes"""
+    github = FakeGitHubAPI()
+    fixture = make_pr_fixture(3, files=2, lines_per_file=5, head_sha=OLD_HEAD)
+    github.add_pull(fixture)
+    github.add_compare(OLD_HEAD, NEW_HEAD, {
+        "status": compare_status,
+        "commits": [{"sha": NEW_HEAD, "parents": [{"sha": OLD_HEAD}]}],
+        "files": [{"filename": "src/auth/session.py", "status": "modified",
+                   "additions": 1, "deletions": 0, "changes": 1}],
+        "diff": NEW_COMMIT_DIFF,
+    })
+    api = FakeMessagesAPI(text=REVIEW_TEXT)
+    pr = PullRequest("o", "r", 3)
+
+    with serve_github(github) as github_url, serve(api) as anthropic_url:
+        monkeypatch.setattr(github_client, "GITHUB_API_URL", github_url)
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=anthropic_url, max_retries=0))
+        review.run_review(pr)
+        fixture["details"]["head"]["sha"] = NEW_HEAD
+        review.run_review(pr)
+        review.run_review(pr)  # same head again: nothing to do
+
+    return github, api
+
+
+def test_second_push_reviews_only_new_commits(monkeypatch):
+    github, api = run_twice(monkeypatch, "ahead")
+
+    assert len(api.requests) == 2
+    second_prompt = api.requests[1]["body"]["messages"][0]["content"]
+    assert "TIMEOUT = 0" in second_prompt
+    assert "since commit aaaaaaa" in second_prompt
+    assert "src/module_001" not in second_prompt
+
+    # The summary is edited in place, so its marker moves to the new head
+    posted = [r["body"]["body"] for r in github.requests if r["method"] == "POST" and "/issues/" in r["path"]]
+    edits = [r["body"]["body"] for r in github.requests if r["method"] == "PATCH"]
+    assert len(posted) == 1 and review_marker(OLD_HEAD) in posted[0]
+    assert len(edits) == 1 and review_marker(NEW_HEAD) in edits[0]
+    assert "Incremental review" in edits[0]
+
+
+def test_rebase_falls_back_to_full_review(monkeypatch):
+    github, api = run_twice(monkeypatch, "diverged")
+
+    assert len(api.requests) == 2
+    second_prompt = api.requests[1]["body"]["messages"][0]["content"]
+    assert second_prompt.startswith("Review this pull request.")
+    assert "src/module_001" in second_prompt
@@ -0,0 +1,83 @@
+"""
+Tests for per-run spans and the JSON metrics record
+Built by Jackson Studio
+"""
+
+import json
+
+import pytest
+from anthropic import Anthropic
+
+import review
+from fake_anthropic import FakeMessagesAPI, serve
+from fake_github import FakeGitHubAPI, make_pr_fixture, serve_github
+from test_streaming import REVIEW
+from utils import github_client, metrics
+from utils.github_client import PullRequest
+
+
+def test_spans_outside_a_run_are_no_ops():
+    with metrics.current().span("fetch") as span:
+        span["bytes"] = 10
+    metrics.current().incr("github_retries")
+
+    assert metrics.current() is metrics.NULL_METRICS
+    assert metrics.NULL_METRICS.spans == []
+
+
+def test_run_record_aggregates_stages_and_outcome(tmp_path):
+    out = tmp_path / "metrics.jsonl"
+
+    with pytest.raises(ValueError):
+        with metrics.run_metrics(emit=False, repo="o/r") as run:
+            with run.span("fetch"):
+                with run.span("http.github", bytes=100):
+                    pass
+                with run.span("http.github", bytes=50):
+                    pass
+            run.record_usage({"input_tokens": 1000, "output_tokens": 200, "cache_read_input_tokens": 500},
+                             "claude-sonnet-4")
+            raise ValueError("boom")
+
+    run.emit(str(out))
+    record = json.loads(out.read_text())
+
+    assert record["outcome"] == "ValueError"
+    assert record["repo"] == "o/r"
+    assert set(record["stages"]) == {"fetch"}
+    assert record["http"]["github"]["requests"] == 2
+    assert record["http"]["github"]["bytes"] == 150
+    assert record["tokens"]["input_tokens"] == 1000
+    assert record["counters"]["cache_hits"] == 1
+    assert record["cost"] > 0
+
+
+def test_run_review_emits_one_record(monkeypatch, tmp_path):
+    out = tmp_path / "metrics.jsonl"
+    fixture = make_pr_fixture(7, files=2, lines_per_file=5)
+    issue = dict(REVIEW["issues"][0], file=fixture["files"][0]["filename"], line=2)
+    review_text = json.dumps(dict(REVIEW, issues=[issue]))
+    github = FakeGitHubAPI()
+    github.add_pull(fixture)
+    api = FakeMessagesAPI(text=review_text)
+
+    with serve_github(github) as github_url, serve(api) as anthropic_url:
+        monkeypatch.setattr(github_client, "GITHUB_API_URL", github_url)
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=anthropic_url, max_retries=0))
+        monkeypatch.setattr(metrics, "METRICS_OUTPUT", str(out))
+        review.run_review(PullRequest("o", "r", 7))
+
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert len(records) == 1
+    record = records[0]
+
+    assert record["outcome"] == "ok"
+    assert record["pr"] == 7
+    assert set(record["stages"]) == {"fetch", "prompt", "model", "post"}
+    assert record["http"]["github"]["requests"] == len(github.requests)
+    assert record["http"]["anthropic"]["requests"] == 1
+    assert record["tokens"]["output_tokens"] > 0
+    assert any(s["name"] == "http.anthropic" and "first_token_ms" in s for s in record["spans"])
+    # The inline comment posted from the streaming worker thread is still attributed to this run
+    assert any(s["name"] == "http.github" and s["method"] == "POST" and s["path"].endswith("/pulls/7/comments")
+               for s in record["spans"])
@@ -0,0 +1,73 @@
+"""
+Tests for size- and risk-based model routing
+Built by Jackson Studio
+"""
+
+import json
+
+from anthropic import Anthropic
+
+import review
+from fake_anthropic import FakeMessagesAPI, serve
+from fake_github import FakeGitHubAPI, make_pr_fixture, serve_github
+from reviewers.incremental import MARKER_RE
+from reviewers.model_router import choose_route, download_budget, escalate_for_content, route_by_files
+from reviewers.prompt_builder import token_budget_for
+from utils import github_client
+from utils.diff_parser import parse_diff
+from utils.github_client import PullRequest
+
+FAST, DEEP = "claude-haiku-4-5", "claude-sonnet-4"
+
+
+def changed(path, lines=5):
+    return {"filename": path, "additions": lines, "deletions": 0}
+
+
+def test_small_low_risk_changes_go_to_the_fast_model():
+    route = route_by_files([changed("docs/guide.md"), changed("src/utils/format.py")], FAST, DEEP)
+    assert route.fast and route.model == FAST
+
+
+def test_sensitive_or_large_changes_go_to_the_deep_model():
+    assert route_by_files([changed("src/auth/login.py", 2)], FAST, DEEP).reason == "sensitive path src/auth/login.py"
+    assert route_by_files([changed("src/utils/format.py", 500)], FAST, DEEP).model == DEEP
+    assert choose_route("off", [changed("README.md")], FAST, DEEP).model == DEEP
+
+
+def test_risky_hunks_escalate_a_fast_route():
+    diff = "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n@@ -1,0 +1,1 @@\n+subprocess.run(cmd, shell=True)\n"
+    route = route_by_files([changed("a.py", 1)], FAST, DEEP)
+
+    escalated = escalate_for_content(route, parse_diff(diff), DEEP)
+
+    assert escalated.model == DEEP and "risky code" in escalated.reason
+
+
+def test_fast_route_collects_with_the_deep_budget():
+    fast = route_by_files([changed("a.py", 1)], FAST, DEEP)
+    deep = route_by_files([changed("src/auth/login.py", 1)], FAST, DEEP)
+
+    # Collected for DEEP in case the hunks escalate it; packing later uses the final model's budget
+    assert download_budget(fast, DEEP) == token_budget_for(DEEP) > token_budget_for(FAST)
+    assert download_budget(deep, DEEP) == token_budget_for(DEEP)
+
+
+def test_progressive_mode_posts_quick_pass_then_updates_it(monkeypatch):
+    github = FakeGitHubAPI()
+    github.add_pull(make_pr_fixture(6, files=1, lines_per_file=5))  # src/auth/...: deep route
+    api = FakeMessagesAPI(text=json.dumps({"summary": "Checked", "severity": "low", "issues": [], "positives": []}))
+    monkeypatch.setattr(review, "MODEL_ROUTING", "progressive")
+    monkeypatch.setattr(review, "FAST_MODEL", FAST)
+
+    with serve_github(github) as github_url, serve(api) as anthropic_url:
+        monkeypatch.setattr(github_client, "GITHUB_API_URL", github_url)
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=anthropic_url, max_retries=0))
+        review.run_review(PullRequest("o", "r", 6))
+
+    assert sorted(r["body"]["model"] for r in api.requests) == sorted([FAST, review.MODEL])
+    preliminary = [r["body"]["body"] for r in github.requests if r["method"] == "POST" and "/issues/" in r["path"]]
+    final = [r["body"]["body"] for r in github.requests if r["method"] == "PATCH"]
+    assert len(preliminary) == 1 and "Preliminary review" in preliminary[0]
+    assert not MARKER_RE.search(preliminary[0])
+    assert len(final) == 1 and MARKER_RE.search(final[0]) and "Preliminary" not in final[0]
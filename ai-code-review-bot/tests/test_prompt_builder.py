@@ -0,0 +1,72 @@
+"""
+Tests for token-budgeted prompt assembly
+Built by Jackson Studio
+"""
+
+from reviewers.prompt_builder import (
+    estimate_tokens, format_omitted_section, pack_diff, risk_score, token_budget_for
+)
+from utils.diff_parser import parse_diff
+
+
+def make_file_diff(path: str, body_lines: int, line: str = "+x = 1") -> str:
+    hunk = "\n".join([line] * body_lines)
+    return (
+        f"diff --git a/{path} b/{path}\n"
+        f"index 111..222 100644\n"
+        f"--- a/{path}\n"
+        f"+++ b/{path}\n"
+        f"@@ -1,0 +1,{body_lines} @@\n"
+        f"{hunk}\n"
+    )
+
+
+def test_parse_diff_splits_files_and_hunks():
+    diff = make_file_diff("a.py", 3) + make_file_diff("b.py", 2)
+    files = parse_diff(diff)
+
+    assert [f.path for f in files] == ["a.py", "b.py"]
+    assert files[0].additions == 3
+    assert len(files[1].hunks) == 1
+
+
+def test_risk_score_prefers_security_code_over_lockfiles():
+    assert risk_score("app/auth/login.py", 10, 2) > risk_score("package-lock.json", 10, 2)
+    assert risk_score("src/api/users.py") > risk_score("docs/guide.md")
+
+
+def test_token_budget_by_model_prefix(monkeypatch):
+    monkeypatch.delenv("PROMPT_TOKEN_BUDGET", raising=False)
+    assert token_budget_for("claude-opus-4") > token_budget_for("claude-haiku-4")
+
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "1234")
+    assert token_budget_for("claude-sonnet-4") == 1234
+
+
+def test_large_lockfile_does_not_crowd_out_security_file():
+    diff = make_file_diff("yarn.lock", 2000, "+resolved abcdef") + make_file_diff("app/auth.py", 5)
+    files = parse_diff(diff)
+
+    packed = pack_diff(files, token_budget=500)
+
+    assert "app/auth.py" in packed.included
+    assert "app/auth.py" in packed.text
+    assert [entry["file"] for entry in packed.omitted] == ["yarn.lock"]
+    assert packed.tokens <= 500
+
+
+def test_omitted_section_lists_skipped_files():
+    diff = make_file_diff("big.py", 3000) + make_file_diff("small.py", 2)
+    packed = pack_diff(parse_diff(diff), token_budget=estimate_tokens("x" * 400))
+
+    section = format_omitted_section(packed)
+    assert "## Omitted Files" in section
+    assert "big.py" in section
+
+
+def test_allowed_paths_filters_skipped_files():
+    diff = make_file_diff("dist/bundle.js", 5) + make_file_diff("src/app.js", 5)
+    packed = pack_diff(parse_diff(diff), token_budget=10000, allowed_paths=["src/app.js"])
+
+    assert packed.included == ["src/app.js"]
+    assert "dist/bundle.js" not in packed.text
@@ -0,0 +1,61 @@
+"""
+Tests for prompt-cached review requests
+Built by Jackson Studio
+"""
+
+import json
+
+from anthropic import Anthropic
+
+import review
+from fake_anthropic import FakeMessagesAPI, serve
+from reviewers import claude_reviewer
+from utils.cost_tracker import calculate_cost
+
+REVIEW_JSON = json.dumps({"summary": "ok", "severity": "low", "issues": [], "positives": []})
+CACHED_USAGE = {
+    "input_tokens": 400,
+    "output_tokens": 120,
+    "cache_creation_input_tokens": 0,
+    "cache_read_input_tokens": 1800,
+}
+
+
+def test_static_instructions_sent_as_cached_system_block(monkeypatch, capsys):
+    api = FakeMessagesAPI(text=REVIEW_JSON, usage=CACHED_USAGE)
+    with serve(api) as base_url:
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        review.review_with_claude("Review this pull request.\n\n## Diff\n+a")
+        review.review_with_claude("Review this pull request.\n\n## Diff\n+b")
+
+    first, second = (r["body"] for r in api.requests)
+    assert first["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert first["system"] == second["system"]
+    assert "Core Responsibilities" in first["system"][0]["text"]
+    assert first["messages"][0]["content"].endswith("+a")
+    assert "+a" not in first["system"][0]["text"]
+
+    out = capsys.readouterr().out
+    assert "Cache: 1800 read, 0 written" in out
+
+
+def test_claude_reviewer_reports_cache_tokens(monkeypatch, capsys):
+    api = FakeMessagesAPI(text="LGTM", usage=CACHED_USAGE)
+    with serve(api) as base_url:
+        monkeypatch.setattr(claude_reviewer, "anthropic_client",
+                            Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        text, cost = claude_reviewer.review_with_claude("Review this pull request.")
+
+    body = api.requests[0]["body"]
+    assert text == "LGTM"
+    assert body["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert cost == calculate_cost(CACHED_USAGE, claude_reviewer.MODEL)
+    assert "Cache: 1800 read" in capsys.readouterr().out
+
+
+def test_cache_reads_are_cheaper_than_fresh_input():
+    fresh = {"input_tokens": 2200, "output_tokens": 120}
+    assert calculate_cost(CACHED_USAGE, "claude-sonnet-4") < calculate_cost(fresh, "claude-sonnet-4")
+
+    written = dict(CACHED_USAGE, cache_read_input_tokens=0, cache_creation_input_tokens=1800)
+    assert calculate_cost(written, "claude-sonnet-4") > calculate_cost(fresh, "claude-sonnet-4")
@@ -0,0 +1,180 @@
+"""
+Tests for the shared adaptive rate limiter
+Built by Jackson Studio
+"""
+
+import time
+
+import anthropic
+from anthropic import Anthropic
+
+import pytest
+
+import review
+from fake_anthropic import FakeMessagesAPI, serve
+from reviewers import claude_reviewer
+from utils import github_client, rate_limiter
+from utils.rate_limiter import RateLimiter, parse_reset
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+        self.content = text.encode()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_bucket_allows_burst_then_paces():
+    limiter = RateLimiter("test", rate=50.0, burst=3)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+
+    # 3 free from the burst, 3 more at 50/s
+    assert 0.04 <= elapsed < 0.5
+
+
+def test_retry_after_blocks_all_callers():
+    limiter = RateLimiter("test", rate=100.0, burst=5)
+    limiter.update_from_headers({"Retry-After": "0.2"})
+
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.15
+
+
+def test_exhausted_window_blocks_until_reset():
+    limiter = RateLimiter("test", rate=100.0, burst=5)
+    reset = str(int(time.time()) + 30)
+    limiter.update_from_headers({"x-ratelimit-remaining": "0", "x-ratelimit-reset": reset})
+
+    assert limiter.blocked_until - time.monotonic() > 25
+
+
+def test_low_remaining_spreads_requests_over_window():
+    limiter = RateLimiter("test", rate=100.0, burst=5)
+    reset = str(int(time.time()) + 10)
+    limiter.update_from_headers({"x-ratelimit-remaining": "5", "x-ratelimit-reset": reset})
+
+    assert limiter._current_rate(time.monotonic()) < 1.0
+
+
+def test_parse_reset_formats():
+    now = 1_700_000_000.0
+    assert parse_reset("1700000060", now) == 1_700_000_060.0
+    assert parse_reset("2023-11-14T22:14:20Z", now) == 1_700_000_060.0
+    assert parse_reset("", now) is None
+
+
+def test_github_request_retries_secondary_rate_limit(monkeypatch):
+    responses = [
+        FakeResponse(403, {"retry-after": "0"}, "You have exceeded a secondary rate limit"),
+        FakeResponse(200),
+    ]
+    limited = responses[0]
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append((method, url))
+        return responses.pop(0)
+
+    monkeypatch.setattr(github_client.session, "request", fake_request)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda seconds: None)
+
+    response = github_client.github_request("POST", "https://api.github.test/x", json={})
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert limited.closed and not response.closed
+
+
+def test_rate_limited_stream_is_closed_before_retrying(monkeypatch):
+    responses = [FakeResponse(429, {"retry-after": "0"}), FakeResponse(200)]
+    limited = responses[0]
+    monkeypatch.setattr(github_client.session, "request", lambda method, url, **kwargs: responses.pop(0))
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda seconds: None)
+
+    response = github_client.github_request("GET", "https://api.github.test/diff", stream=True)
+
+    assert response.status_code == 200
+    assert limited.closed and not response.closed
+
+
+def test_github_request_returns_plain_403(monkeypatch):
+    monkeypatch.setattr(github_client.session, "request",
+                        lambda method, url, **kwargs: FakeResponse(403, {}, "Resource not accessible"))
+
+    assert github_client.github_request("GET", "https://api.github.test/x").status_code == 403
+
+
+def test_review_retries_anthropic_429_with_retry_after(monkeypatch):
+    api = FakeMessagesAPI(text='{"summary": "ok", "severity": "low", "issues": []}')
+    api.failures.append((429, {"retry-after": "0"}))
+    sleeps = []
+    monkeypatch.setattr(rate_limiter.time, "sleep", sleeps.append)
+
+    with serve(api) as base_url:
+        monkeypatch.setattr(review, "anthropic_client",
+                            Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        result = review.review_with_claude("Review this pull request.")
+
+    assert result["summary"] == "ok"
+    assert len(api.requests) == 2
+    assert sleeps
+
+
+def test_review_retries_transient_server_errors(monkeypatch):
+    api = FakeMessagesAPI(text='{"summary": "ok", "severity": "low", "issues": []}')
+    api.failures += [(500, {}), (503, {})]
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda _: None)
+
+    with serve(api) as base_url:
+        monkeypatch.setattr(review, "anthropic_client",
+                            Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        result = review.review_with_claude("Review this pull request.")
+
+    assert result["summary"] == "ok"
+    assert len(api.requests) == 3
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    api = FakeMessagesAPI(text="{}")
+    api.failures.append((400, {}))
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda _: None)
+
+    with serve(api) as base_url:
+        monkeypatch.setattr(claude_reviewer, "anthropic_client",
+                            Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        with pytest.raises(anthropic.BadRequestError):
+            claude_reviewer.create_message_with_backoff(model="claude-sonnet-4", max_tokens=10, messages=[])
+
+    assert len(api.requests) == 1
+
+
+def test_connection_errors_are_retried(monkeypatch):
+    api = FakeMessagesAPI(text="{}")
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda _: None)
+
+    with serve(api) as base_url:
+        client = Anthropic(api_key="test", base_url=base_url, max_retries=0, timeout=5)
+        create = client.messages.with_raw_response.create
+        attempts = []
+
+        def flaky_create(**params):
+            attempts.append(params)
+            if len(attempts) == 1:
+                raise anthropic.APITimeoutError(request=None)
+            return create(**params)
+
+        monkeypatch.setattr(client.messages.with_raw_response, "create", flaky_create)
+        monkeypatch.setattr(claude_reviewer, "anthropic_client", client)
+        message = claude_reviewer.create_message_with_backoff(model="claude-sonnet-4", max_tokens=10, messages=[])
+
+    assert message.content[0].text == "{}"
+    assert len(attempts) == 2 and len(api.requests) == 1
@@ -0,0 +1,132 @@
+"""
+Tests for streaming PR diffs into the parser with an early cutoff
+Built by Jackson Studio
+"""
+
+from fake_github import make_pr_fixture
+from reviewers.prompt_builder import collect_pr_diff, pack_pr_diff, select_downloads
+from utils import github_client
+from utils.diff_parser import iter_file_diffs
+
+
+class ChunkedResponse:
+    """Streamed response handing out the body in fixed-size chunks"""
+
+    def __init__(self, body: bytes, size: int):
+        self.chunks = [body[i:i + size] for i in range(0, len(body), size)]
+        self.served = 0
+        self.headers = {}
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            self.served += 1
+            yield chunk
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_stream_lines_split_across_chunk_boundaries(monkeypatch):
+    body = "diff --git a/x.py b/x.py\n@@ -1 +1 @@\n+héllo\n\n+end".encode()
+    monkeypatch.setattr(github_client, "github_request", lambda *a, **kw: ChunkedResponse(body, 3))
+
+    lines = list(github_client.github_stream_lines("http://example/diff"))
+
+    assert lines == ["diff --git a/x.py b/x.py", "@@ -1 +1 @@", "+héllo", "", "+end"]
+
+
+def test_huge_single_line_file_is_cut_and_marked_truncated(monkeypatch):
+    generated = "+" + "x" * (5 * 1024 * 1024)  # one 5 MB line
+    body = "\n".join([
+        "diff --git a/bundle.js b/bundle.js", "@@ -0,0 +1 @@", generated,
+        "diff --git a/x.py b/x.py", "@@ -1 +1 @@", "+ok",
+    ]).encode()
+    monkeypatch.setattr(github_client, "github_request",
+                        lambda *a, **kw: ChunkedResponse(body, github_client.STREAM_CHUNK_SIZE))
+    files = [{"filename": name, "additions": 1, "deletions": 0} for name in ("bundle.js", "x.py")]
+
+    lines = list(github_client.github_stream_lines("http://example/diff"))
+    assert max(len(line) for line in lines) == github_client.MAX_LINE_BYTES
+    assert lines[3:] == ["diff --git a/x.py b/x.py", "@@ -1 +1 @@", "+ok"]
+
+    collected = collect_pr_diff(iter(lines), files, token_budget=20000)
+    big, small = collected.file_diffs
+    assert big.truncated and not big.hunks[0].lines
+    assert not small.truncated and small.hunks[0].lines == ["+ok"]
+
+
+def test_iter_file_diffs_drops_unwanted_files_and_truncates():
+    diff = make_pr_fixture(1, files=3, lines_per_file=50)["diff"]
+    wanted = {"src/module_001/service.py", "src/module_002/service.py"}
+
+    fds = list(iter_file_diffs(diff.splitlines(), keep=wanted.__contains__, max_file_chars=200))
+
+    assert [fd.path for fd in fds] == sorted(wanted)
+    assert all(fd.truncated for fd in fds)
+    assert all(sum(len(line) + 1 for line in fd.hunks[0].lines) < 300 for fd in fds)
+
+
+def test_select_downloads_prefers_risky_files_within_budget():
+    files = [{"filename": f"docs/notes_{i}.md", "additions": 200, "deletions": 0} for i in range(3)]
+    files.append({"filename": "src/auth/login.py", "additions": 200, "deletions": 0})
+
+    selected, left_out = select_downloads(files, token_budget=1500)
+
+    assert "src/auth/login.py" in selected
+    assert len(selected) == 2
+    assert all(entry["file"].startswith("docs/") for entry in left_out)
+
+
+def test_collect_stops_reading_once_selected_files_are_seen():
+    fixture = make_pr_fixture(1, files=200, lines_per_file=40)
+    consumed = []
+
+    def lines():
+        for line in fixture["diff"].splitlines():
+            consumed.append(line)
+            yield line
+
+    collected = collect_pr_diff(lines(), fixture["files"], token_budget=2000)
+    packed = collected.pack(2000)
+
+    assert collected.cut_off
+    assert len(consumed) < len(fixture["diff"].splitlines()) / 4
+    assert packed.included and packed.tokens <= 2000
+    assert any(entry["reason"] == "over token budget" for entry in packed.omitted)
+
+
+def test_collect_reads_whole_small_diff():
+    fixture = make_pr_fixture(1, files=3, lines_per_file=5)
+
+    collected = collect_pr_diff(fixture["diff"].splitlines(), fixture["files"], token_budget=20000)
+
+    assert len(collected.file_diffs) == 3
+    assert not collected.not_downloaded
+    assert not collected.cut_off  # the last wanted file ended the diff
+
+
+def test_collect_is_cut_off_only_with_lines_left_unread():
+    fixture = make_pr_fixture(1, files=3, lines_per_file=5)
+    first = fixture["files"][:1]
+
+    collected = collect_pr_diff(fixture["diff"].splitlines(), first, token_budget=20000)
+
+    assert [fd.path for fd in collected.file_diffs] == [first[0]["filename"]]
+    assert collected.cut_off
+
+
+def test_pack_pr_diff_honours_an_explicit_budget():
+    fixture = make_pr_fixture(1, files=60, lines_per_file=40)  # ~26k tokens
+
+    # Larger than claude-haiku's own budget: the diff must be read for it too
+    packed = pack_pr_diff(fixture["diff"], fixture["files"], "claude-haiku-4-5", token_budget=40000)
+    assert packed.budget == 40000 and not packed.omitted
+
+    packed = pack_pr_diff(fixture["diff"], fixture["files"], "claude-haiku-4-5", token_budget=1000)
+    assert packed.budget == 1000 and packed.tokens <= 1000
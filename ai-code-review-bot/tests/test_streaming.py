@@ -0,0 +1,93 @@
+"""
+Tests for streamed reviews and incremental issue parsing
+Built by Jackson Studio
+"""
+
+import json
+
+from anthropic import Anthropic
+
+import review
+from fake_anthropic import FakeMessagesAPI, serve
+from utils.stream_parser import IssueStreamParser
+
+ISSUES = [
+    {"file": "app/auth.py", "line": 10, "severity": "high", "category": "security",
+     "message": "Token compared with == {not constant time}", "suggestion": "Use hmac.compare_digest"},
+    {"file": "app/db.py", "line": 42, "severity": "medium", "category": "performance",
+     "message": "Query \"inside\" loop [N+1]", "suggestion": "Batch the query"},
+]
+REVIEW = {"summary": "Two issues", "severity": "high", "issues": ISSUES, "positives": ["Tests added"]}
+
+
+def feed_in_chunks(text: str, size: int):
+    parser = IssueStreamParser()
+    found = []
+    for i in range(0, len(text), size):
+        found.extend(parser.feed(text[i:i + size]))
+    return found
+
+
+def test_parser_emits_issues_across_arbitrary_chunk_boundaries():
+    text = "```json\n" + json.dumps(REVIEW, indent=2) + "\n```"
+    for size in (1, 3, 7, 64, len(text)):
+        assert feed_in_chunks(text, size) == ISSUES
+
+
+def test_parser_ignores_issues_key_inside_strings():
+    text = json.dumps({"summary": "see \"issues\": [{}]", "issues": [ISSUES[0]]})
+    assert feed_in_chunks(text, 5) == [ISSUES[0]]
+
+
+def test_parser_skips_nested_issues_keys():
+    text = json.dumps({"meta": {"issues": [{"x": 1}]}, "issues": [ISSUES[1]]})
+    assert feed_in_chunks(text, 4) == [ISSUES[1]]
+
+
+def test_issues_reach_callback_before_stream_finishes(monkeypatch):
+    text = json.dumps(REVIEW) + " " * 400
+    api = FakeMessagesAPI(text=text, chunk_size=16, chunk_delay=0.002)
+    seen = []
+
+    def on_issue(issue):
+        seen.append((issue["file"], api.chunks_sent))
+
+    with serve(api) as base_url:
+        monkeypatch.setattr(review, "anthropic_client", Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        result = review.review_with_claude("Review this pull request.", on_issue=on_issue)
+
+    assert api.requests[0]["body"]["stream"] is True
+    assert [file for file, _ in seen] == ["app/auth.py", "app/db.py"]
+    assert seen[0][1] < api.total_chunks
+    assert result["summary"] == "Two issues"
+
+
+def test_main_posts_streamed_issues_once(monkeypatch):
+    posted = []
+    monkeypatch.setattr(review, "get_pr_details",
+                        lambda pr=None: {"title": "t", "body": "", "head": {"sha": "abc"}})
+    monkeypatch.setattr(review, "get_pr_files",
+                        lambda pr=None: [{"filename": "app/auth.py", "additions": 1, "deletions": 0}])
+    monkeypatch.setattr(review, "get_pr_diff", lambda pr=None: "")
+    monkeypatch.setattr(review, "get_issue_comments", lambda pr=None: [])
+    monkeypatch.setattr(review, "get_review_comments", lambda pr=None: [])
+    monkeypatch.setattr(review, "post_general_comment",
+                        lambda body, pr=None: posted.append(("summary", body)))
+    monkeypatch.setattr(review, "post_review_comment",
+                        lambda body, commit_id, path=None, line=None, pr=None: posted.append((path, line)))
+
+    def fake_review(prompt, on_issue=None, cancel=None, **params):
+        for issue in ISSUES:
+            on_issue(issue)
+        return REVIEW
+
+    monkeypatch.setattr(review, "review_with_claude", fake_review)
+
+    try:
+        review.main()
+    except SystemExit:
+        pass
+
+    assert posted[:2] == [("app/auth.py", 10), ("app/db.py", 42)]
+    assert posted[2][0] == "summary"
+    assert len(posted) == 3
@@ -0,0 +1,114 @@
+"""
+Tests for the repository symbol index
+Built by Jackson Studio
+"""
+
+import subprocess
+
+from reviewers.symbol_index import load_symbol_index, parse_with_patterns, related_context, repository_context
+from utils.diff_parser import parse_diff
+
+BILLING = '''\
+def apply_discount(total, code):
+    rate = lookup_rate(code)
+    return total * (1 - rate)
+
+
+def lookup_rate(code):
+    return {"SAVE10": 0.1}.get(code, 0.0)
+'''
+
+CHECKOUT = '''\
+from billing import apply_discount
+
+
+def checkout(cart):
+    return apply_discount(cart.total, cart.code)
+'''
+
+DIFF = '''\
+diff --git a/billing.py b/billing.py
+index 111..222 100644
+--- a/billing.py
++++ b/billing.py
+@@ -1,3 +1,3 @@
+ def apply_discount(total, code):
+-    rate = lookup_rate(code)
++    rate = min(lookup_rate(code), 0.5)
+     return total * (1 - rate)
+'''
+
+
+def git(root, *args):
+    subprocess.run(["git", "-C", str(root), *args], check=True, capture_output=True)
+
+
+def make_repo(tmp_path):
+    (tmp_path / "billing.py").write_text(BILLING)
+    (tmp_path / "checkout.py").write_text(CHECKOUT)
+    (tmp_path / "widget.ts").write_text("export function renderWidget(el: Element) {\n  mount(el);\n}\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "init")
+    return tmp_path
+
+
+def test_index_finds_python_and_regex_definitions(tmp_path):
+    index = load_symbol_index(str(make_repo(tmp_path)), str(tmp_path / "cache.json"))
+
+    assert [(s.path, s.line, s.end_line) for s in index.definitions("apply_discount")] == [("billing.py", 1, 3)]
+    assert ("checkout.py", 5) in index.call_sites("apply_discount")
+    assert index.definitions("renderWidget")[0].path == "widget.ts"
+    assert index.parsed == 3
+
+
+def test_cache_reparses_only_changed_blobs(tmp_path):
+    root = make_repo(tmp_path)
+    cache = str(tmp_path / "cache.json")
+    load_symbol_index(str(root), cache)
+
+    (root / "checkout.py").write_text(CHECKOUT + "\n\ndef refund(cart):\n    return apply_discount(-cart.total, None)\n")
+    git(root, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qam", "refund")
+    index = load_symbol_index(str(root), cache)
+
+    assert index.parsed == 1
+    assert ("checkout.py", 9) in index.call_sites("apply_discount")
+
+
+def test_related_context_has_callers_and_callees_within_budget(tmp_path):
+    index = load_symbol_index(str(make_repo(tmp_path)), str(tmp_path / "cache.json"))
+    file_diffs = parse_diff(DIFF)
+
+    context = related_context(index, file_diffs, token_budget=2000)
+
+    assert "`lookup_rate` (function called in the diff), billing.py:6" in context
+    assert "Call to `apply_discount` (changed in billing.py), checkout.py:5" in context
+    assert "cart.total, cart.code" in context
+    assert related_context(index, file_diffs, token_budget=10) == ""
+
+
+def test_context_needs_the_prs_repo_at_its_head(tmp_path, capsys):
+    root = str(make_repo(tmp_path))
+    git(root, "remote", "add", "origin", "https://github.com/jackson-studio/shop.git")
+    head = subprocess.run(["git", "-C", root, "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    file_diffs = parse_diff(DIFF)
+    cache = str(tmp_path / "cache.json")
+
+    assert "checkout.py:5" in repository_context(file_diffs, "claude-sonnet-4", root, "jackson-studio/shop",
+                                                 ["b" * 40, head], cache)
+
+    # Another commit of the same repo: line numbers would not match the diff
+    assert repository_context(file_diffs, "claude-sonnet-4", root, "jackson-studio/shop", ["b" * 40], cache) == ""
+    assert f"is at {head[:7]}, not the PR's bbbbbbb" in capsys.readouterr().out
+    # Another repository at the "right" SHA
+    assert repository_context(file_diffs, "claude-sonnet-4", root, "jackson-studio/other", [head], cache) == ""
+    assert "not jackson-studio/other" in capsys.readouterr().out
+
+
+def test_regex_fallback_ranges_run_to_the_next_definition():
+    source = "package x\n\nfunc A() {\n\tB()\n}\n\nfunc B() {\n}\n"
+
+    defs, calls = parse_with_patterns(source, "go")
+
+    assert defs == [["A", "function", 3, 6], ["B", "function", 7, 8]]
+    assert calls == {"B": [4]}
@@ -0,0 +1,148 @@
+"""
+End-to-end tests for webhook server mode
+Built by Jackson Studio
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from anthropic import Anthropic
+
+import review
+import webhook_server
+from fake_anthropic import FakeMessagesAPI, serve as serve_anthropic
+from fake_github import deliver, pull_request_payload
+from webhook_server import ReviewScheduler
+
+SECRET = "s3cret"
+
+
+@contextmanager
+def running_server(scheduler):
+    server = webhook_server.serve(0, "127.0.0.1", scheduler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/webhook"
+    finally:
+        server.shutdown()
+        server.server_close()
+        scheduler.shutdown()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_rejects_bad_signature():
+    scheduler = ReviewScheduler(run=lambda pr, cancel: None, workers=1)
+    server = webhook_server.ThreadingHTTPServer(("127.0.0.1", 0), webhook_server.make_handler(scheduler, SECRET))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/webhook"
+        status, _ = deliver(url, "pull_request", pull_request_payload("o/r", 1, "a" * 40), secret="wrong")
+        assert status == 401
+    finally:
+        server.shutdown()
+        server.server_close()
+        scheduler.shutdown()
+
+
+def test_newer_push_cancels_queued_review():
+    started = []
+    release = threading.Event()
+
+    def slow_run(pr, cancel):
+        started.append(pr.number)
+        release.wait(5)
+
+    scheduler = ReviewScheduler(run=slow_run, workers=1)
+    with running_server(scheduler) as url:
+        # PR 1 occupies the only worker; PR 2 gets queued twice
+        deliver(url, "pull_request", pull_request_payload("o/r", 1, "a" * 40))
+        assert wait_for(lambda: started == [1])
+        deliver(url, "pull_request", pull_request_payload("o/r", 2, "b" * 40))
+        status, body = deliver(url, "pull_request", pull_request_payload("o/r", 2, "c" * 40))
+        assert status == 202
+        release.set()
+        assert wait_for(lambda: scheduler.pending == 0)
+
+    assert started == [1, 2]
+
+
+def test_newer_push_cancels_in_flight_review_end_to_end(monkeypatch):
+    posted = []
+    shas = iter(["a" * 40, "b" * 40])
+    monkeypatch.setattr(review, "get_pr_details",
+                        lambda pr=None: {"title": "t", "body": "", "head": {"sha": next(shas)}})
+    monkeypatch.setattr(review, "get_pr_files",
+                        lambda pr=None: [{"filename": "app.py", "additions": 1, "deletions": 0}])
+    monkeypatch.setattr(review, "get_pr_diff", lambda pr=None: "")
+    monkeypatch.setattr(review, "get_issue_comments", lambda pr=None: [])
+    monkeypatch.setattr(review, "get_review_comments", lambda pr=None: [])
+    monkeypatch.setattr(review, "post_general_comment", lambda body, pr=None: posted.append(pr))
+    monkeypatch.setattr(review, "post_review_comment", lambda *args, **kwargs: None)
+
+    text = json.dumps({"summary": "ok", "severity": "low", "issues": []}) + " " * 600
+    api = FakeMessagesAPI(text=text, chunk_size=8, chunk_delay=0.005)
+
+    with serve_anthropic(api) as base_url:
+        monkeypatch.setattr(review, "anthropic_client",
+                            Anthropic(api_key="test", base_url=base_url, max_retries=0))
+        scheduler = ReviewScheduler(run=review.run_review, workers=2)
+        with running_server(scheduler) as url:
+            deliver(url, "pull_request", pull_request_payload("o/r", 7, "a" * 40))
+            assert wait_for(lambda: api.chunks_sent > 0)
+            first = scheduler.jobs[next(iter(scheduler.jobs))]
+
+            deliver(url, "pull_request", pull_request_payload("o/r", 7, "b" * 40))
+            assert wait_for(lambda: scheduler.pending == 0, timeout=10)
+
+    assert first.status == "cancelled"
+    assert len(posted) == 1
+    assert str(posted[0]) == "o/r#7"
+
+
+def test_ping_and_ignored_actions():
+    scheduler = ReviewScheduler(run=lambda pr, cancel: None, workers=1)
+    with running_server(scheduler) as url:
+        assert deliver(url, "ping", {"zen": "hi"})[0] == 200
+        assert deliver(url, "pull_request", pull_request_payload("o/r", 1, "a" * 40, action="closed"))[0] == 202
+        assert scheduler.pending == 0
+
+
+def test_malformed_signed_deliveries_get_400():
+    reviewed = []
+    scheduler = ReviewScheduler(run=lambda pr, cancel: reviewed.append(str(pr)), workers=1)
+    server = webhook_server.ThreadingHTTPServer(("127.0.0.1", 0), webhook_server.make_handler(scheduler, SECRET))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    no_head = pull_request_payload("o/r", 1, "a" * 40)
+    del no_head["pull_request"]["head"]
+    bad_bodies = [
+        b'{"action": "opened", ',
+        b'["opened"]',
+        {"action": "opened", "repository": {"full_name": "o/r"}},
+        no_head,
+        pull_request_payload("no-slash", 1, "a" * 40),
+    ]
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/webhook"
+        for body in bad_bodies:
+            status, reply = deliver(url, "pull_request", body, secret=SECRET)
+            assert status == 400, body
+            assert reply["message"]
+        assert deliver(url, "pull_request", pull_request_payload("o/r", 1, "a" * 40), secret=SECRET)[0] == 202
+        assert wait_for(lambda: reviewed == ["o/r#1"])
+    finally:
+        server.shutdown()
+        server.server_close()
+        scheduler.shutdown()
@@ -0,0 +1,4 @@
+"""
+Shared helpers for the AI Code Review Bot
+Built by Jackson Studio
+"""
@@ -0,0 +1,207 @@
+"""
+Review analytics store
+Built by Jackson Studio
+
+Keeps every review run's metrics record in a local SQLite database
+(ANALYTICS_DB) so cost and latency can be tracked over time: one row per
+run in review_runs, one row per stage in review_stages, indexed for the
+per-repo and per-week queries used by scripts/report.py. Runs that never
+called the model (trivial PR, too many files, over the cost limit) are
+counted separately and kept out of the latency and cost figures.
+"""
+
+import json
+import math
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+ANALYTICS_DB = os.environ.get("ANALYTICS_DB", "")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS review_runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    week TEXT NOT NULL,
+    script TEXT,
+    repo TEXT,
+    pr INTEGER,
+    head_sha TEXT,
+    model TEXT,
+    outcome TEXT,
+    files INTEGER,
+    changed_lines INTEGER,
+    diff_bytes INTEGER,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cache_read_tokens INTEGER,
+    cache_write_tokens INTEGER,
+    cache_hits INTEGER,
+    retries INTEGER,
+    cost REAL,
+    duration_ms REAL,
+    record TEXT
+);
+CREATE INDEX IF NOT EXISTS review_runs_repo_started ON review_runs (repo, started_at);
+CREATE INDEX IF NOT EXISTS review_runs_week_repo ON review_runs (week, repo);
+CREATE INDEX IF NOT EXISTS review_runs_repo_pr ON review_runs (repo, pr);
+
+CREATE TABLE IF NOT EXISTS review_stages (
+    run_id TEXT NOT NULL REFERENCES review_runs (run_id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    PRIMARY KEY (run_id, stage)
+);
+CREATE INDEX IF NOT EXISTS review_stages_stage ON review_stages (stage);
+"""
+
+# Outcomes of runs that stopped before calling the model
+SKIPPED_OUTCOMES = ("skipped", "over_budget")
+
+# Diff size buckets for the latency-by-size report: (label, upper bound in bytes)
+SIZE_BUCKETS = [("<10KB", 10_000), ("10-100KB", 100_000), ("100KB-1MB", 1_000_000), (">1MB", None)]
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """Open (and if needed create) the analytics database"""
+    path = path or ANALYTICS_DB
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # WAL lets the webhook server's workers write while a report reads
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def iso_week(timestamp: str) -> str:
+    return datetime.fromisoformat(timestamp).strftime("%G-W%V")
+
+
+def record_run(record: Dict, path: Optional[str] = None):
+    """Store one metrics record (utils.metrics.RunMetrics.to_record())"""
+    tokens = record.get("tokens", {})
+    counters = record.get("counters", {})
+    row = {
+        "run_id": record["run_id"],
+        "started_at": record["timestamp"],
+        "week": iso_week(record["timestamp"]),
+        "script": record.get("script"),
+        "repo": record.get("repo"),
+        "pr": record.get("pr"),
+        "head_sha": record.get("head_sha"),
+        "model": record.get("model"),
+        "outcome": record.get("outcome"),
+        "files": record.get("files"),
+        "changed_lines": record.get("changed_lines"),
+        "diff_bytes": int(counters.get("diff_bytes", 0)),
+        "input_tokens": tokens.get("input_tokens", 0),
+        "output_tokens": tokens.get("output_tokens", 0),
+        "cache_read_tokens": tokens.get("cache_read_input_tokens", 0),
+        "cache_write_tokens": tokens.get("cache_creation_input_tokens", 0),
+        "cache_hits": int(counters.get("cache_hits", 0)),
+        "retries": int(counters.get("github_retries", 0) + counters.get("anthropic_retries", 0)),
+        "cost": record.get("cost", 0.0),
+        "duration_ms": record.get("duration_ms"),
+        "record": json.dumps(record),
+    }
+
+    conn = connect(path)
+    try:
+        with conn:
+            conn.execute(f"INSERT OR REPLACE INTO review_runs ({', '.join(row)}) "
+                         f"VALUES ({', '.join(':' + name for name in row)})", row)
+            conn.executemany("INSERT OR REPLACE INTO review_stages (run_id, stage, duration_ms) VALUES (?, ?, ?)",
+                             [(record["run_id"], stage, ms) for stage, ms in record.get("stages", {}).items()])
+    finally:
+        conn.close()
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100) of already sorted values"""
+    if not values:
+        return None
+    return values[max(1, math.ceil(len(values) * q / 100)) - 1]
+
+
+def _since(weeks: Optional[int]) -> str:
+    if not weeks:
+        return ""
+    return (datetime.now(timezone.utc) - timedelta(weeks=weeks)).isoformat()
+
+
+def _filters(since: str, repo: Optional[str], table: str = "r", reviewed_only: bool = True) -> tuple:
+    clauses, params = [f"{table}.started_at >= ?"], [since]
+    if repo:
+        clauses.append(f"{table}.repo = ?")
+        params.append(repo)
+    if reviewed_only:
+        clauses.append(f"{table}.outcome NOT IN ({', '.join('?' * len(SKIPPED_OUTCOMES))})")
+        params.extend(SKIPPED_OUTCOMES)
+    return " AND ".join(clauses), params
+
+
+def weekly_report(conn: sqlite3.Connection, weeks: Optional[int] = None, repo: Optional[str] = None) -> List[Dict]:
+    """Reviews, p50/p95 latency, spend and retry rate per repo and week, plus skipped runs"""
+    where, params = _filters(_since(weeks), repo, reviewed_only=False)
+    rows = conn.execute(
+        f"SELECT r.repo, r.week, r.outcome, r.duration_ms, r.cost, r.retries FROM review_runs r "
+        f"WHERE {where} ORDER BY r.repo, r.week, r.duration_ms", params)
+
+    groups: Dict[tuple, Dict] = {}
+    for row in rows:
+        group = groups.setdefault((row["repo"], row["week"]),
+                                  {"durations": [], "cost": 0.0, "retried": 0, "skipped": 0})
+        if row["outcome"] in SKIPPED_OUTCOMES:
+            group["skipped"] += 1
+            continue
+        group["durations"].append(row["duration_ms"] or 0.0)
+        group["cost"] += row["cost"] or 0.0
+        group["retried"] += 1 if row["retries"] else 0
+
+    return [{
+        "repo": repo_name,
+        "week": week,
+        "runs": len(group["durations"]),
+        "skipped": group["skipped"],
+        "p50_ms": percentile(group["durations"], 50),
+        "p95_ms": percentile(group["durations"], 95),
+        "cost": round(group["cost"], 4),
+        "retry_rate": round(group["retried"] / len(group["durations"]), 3) if group["durations"] else 0.0,
+    } for (repo_name, week), group in groups.items()]
+
+
+def stage_report(conn: sqlite3.Connection, weeks: Optional[int] = None, repo: Optional[str] = None) -> List[Dict]:
+    """p50/p95 latency of each stage (fetch, prompt, model, post, ...)"""
+    where, params = _filters(_since(weeks), repo)
+    rows = conn.execute(
+        f"SELECT s.stage, s.duration_ms FROM review_stages s JOIN review_runs r ON r.run_id = s.run_id "
+        f"WHERE {where} ORDER BY s.stage, s.duration_ms", params)
+
+    durations: Dict[str, List[float]] = {}
+    for row in rows:
+        durations.setdefault(row["stage"], []).append(row["duration_ms"])
+    return [{"stage": stage, "runs": len(values), "p50_ms": percentile(values, 50),
+             "p95_ms": percentile(values, 95)} for stage, values in durations.items()]
+
+
+def size_report(conn: sqlite3.Connection, weeks: Optional[int] = None, repo: Optional[str] = None) -> List[Dict]:
+    """Latency and average cost by downloaded diff size"""
+    where, params = _filters(_since(weeks), repo)
+    rows = conn.execute(
+        f"SELECT r.diff_bytes, r.duration_ms, r.cost FROM review_runs r "
+        f"WHERE {where} ORDER BY r.duration_ms", params)
+
+    buckets = {label: {"durations": [], "cost": 0.0} for label, _ in SIZE_BUCKETS}
+    for row in rows:
+        label = next(label for label, bound in SIZE_BUCKETS if bound is None or (row["diff_bytes"] or 0) < bound)
+        buckets[label]["durations"].append(row["duration_ms"] or 0.0)
+        buckets[label]["cost"] += row["cost"] or 0.0
+
+    return [{"size": label, "runs": len(bucket["durations"]),
+             "p50_ms": percentile(bucket["durations"], 50), "p95_ms": percentile(bucket["durations"], 95),
+             "avg_cost": round(bucket["cost"] / len(bucket["durations"]), 4)}
+            for label, bucket in buckets.items() if bucket["durations"]]
@@ -0,0 +1,65 @@
+"""
+API cost tracking
+Built by Jackson Studio
+
+Turns Messages API usage blocks into dollars, including prompt-cache
+writes and reads.
+"""
+
+from typing import Dict
+
+# USD per million tokens (as of Feb 2026, adjust if needed)
+MODEL_PRICING = {
+    "claude-haiku": {"input": 1.00, "output": 5.00},
+    "claude-sonnet": {"input": 3.00, "output": 15.00},
+    "claude-opus": {"input": 15.00, "output": 75.00},
+}
+DEFAULT_PRICING = MODEL_PRICING["claude-sonnet"]
+
+# Prompt caching multipliers relative to the base input price
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.10
+
+# Message Batches API requests are billed at half price
+BATCH_DISCOUNT = 0.50
+
+
+def pricing_for(model: str) -> Dict[str, float]:
+    """Per-million-token pricing for a model (prefix match)"""
+    for prefix, pricing in MODEL_PRICING.items():
+        if model.startswith(prefix):
+            return pricing
+    return DEFAULT_PRICING
+
+
+def usage_to_dict(usage) -> Dict[str, int]:
+    """Normalize an SDK usage object (or dict) into plain token counts"""
+    fields = ("input_tokens", "output_tokens",
+              "cache_creation_input_tokens", "cache_read_input_tokens")
+    if isinstance(usage, dict):
+        return {name: usage.get(name) or 0 for name in fields}
+    return {name: getattr(usage, name, None) or 0 for name in fields}
+
+
+def calculate_cost(usage, model: str, batch: bool = False) -> float:
+    """Dollar cost of one Messages API call (batch=True for Message Batches)"""
+    tokens = usage_to_dict(usage)
+    pricing = pricing_for(model)
+
+    input_cost = (
+        tokens["input_tokens"]
+        + tokens["cache_creation_input_tokens"] * CACHE_WRITE_MULTIPLIER
+        + tokens["cache_read_input_tokens"] * CACHE_READ_MULTIPLIER
+    ) * pricing["input"]
+    output_cost = tokens["output_tokens"] * pricing["output"]
+
+    cost = (input_cost + output_cost) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+def format_usage(usage) -> str:
+    """One-line token summary for logs"""
+    tokens = usage_to_dict(usage)
+    return (f"Tokens: {tokens['input_tokens']} in, {tokens['output_tokens']} out | "
+            f"Cache: {tokens['cache_read_input_tokens']} read, "
+            f"{tokens['cache_creation_input_tokens']} written")
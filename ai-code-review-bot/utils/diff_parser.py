@@ -0,0 +1,120 @@
+"""
+Unified diff parser
+Built by Jackson Studio
+
+Splits a GitHub PR diff into per-file sections and hunks so the prompt
+builder can rank and pack them instead of cutting the raw text.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional
+
+FILE_HEADER_RE = re.compile(r'^diff --git a/(.+?) b/(.+)$')
+HUNK_HEADER_RE = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+@dataclass
+class Hunk:
+    """A single @@ hunk of a file diff"""
+    header: str
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def additions(self) -> int:
+        return sum(1 for line in self.lines if line.startswith('+'))
+
+    @property
+    def deletions(self) -> int:
+        return sum(1 for line in self.lines if line.startswith('-'))
+
+    @property
+    def new_start(self) -> int:
+        match = HUNK_HEADER_RE.match(self.header)
+        return int(match.group(3)) if match else 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join([self.header] + self.lines)
+
+
+@dataclass
+class FileDiff:
+    """All hunks touching one file, plus the git header lines"""
+    path: str
+    old_path: str
+    header: List[str] = field(default_factory=list)
+    hunks: List[Hunk] = field(default_factory=list)
+    truncated: bool = False  # later hunks were dropped while parsing
+
+    @property
+    def additions(self) -> int:
+        return sum(h.additions for h in self.hunks)
+
+    @property
+    def deletions(self) -> int:
+        return sum(h.deletions for h in self.hunks)
+
+    @property
+    def is_binary(self) -> bool:
+        return any(line.startswith("Binary files") for line in self.header)
+
+    def render(self, hunks: Optional[List[Hunk]] = None) -> str:
+        """Render the file section, optionally with only a subset of hunks"""
+        hunks = self.hunks if hunks is None else hunks
+        return "\n".join(self.header + [h.text for h in hunks])
+
+
+def iter_file_diffs(lines: Iterable[str], keep: Optional[Callable[[str], bool]] = None,
+                    max_file_chars: Optional[int] = None) -> Iterator[FileDiff]:
+    """Yield FileDiff objects as soon as each file section is complete
+
+    Files for which keep(path) is false are skipped without storing their
+    lines. Once a file's hunks exceed max_file_chars, the rest of the file
+    is dropped and it is marked truncated. Together these keep memory
+    bounded no matter how large the input is.
+    """
+    current = None
+    hunk = None
+    size = 0
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+
+        match = FILE_HEADER_RE.match(line)
+        if match:
+            if current is not None:
+                yield current
+            current = FileDiff(path=match.group(2), old_path=match.group(1), header=[line])
+            if keep is not None and not keep(current.path):
+                current = None
+            hunk = None
+            size = 0
+            continue
+
+        if current is None:
+            continue
+
+        if line.startswith("@@"):
+            if current.truncated:
+                continue
+            hunk = Hunk(header=line)
+            current.hunks.append(hunk)
+        elif hunk is not None:
+            # A line that would not fit (e.g. one huge minified line) ends the file too
+            if max_file_chars is not None and size + len(line) > max_file_chars:
+                current.truncated = True
+                hunk = None
+                continue
+            hunk.lines.append(line)
+            size += len(line) + 1
+        elif not current.truncated:
+            current.header.append(line)
+
+    if current is not None:
+        yield current
+
+
+def parse_diff(diff: str) -> List[FileDiff]:
+    """Parse a full unified diff string"""
+    return list(iter_file_diffs(diff.splitlines()))
@@ -0,0 +1,136 @@
+"""
+Rate-limited GitHub REST calls
+Built by Jackson Studio
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import metrics
+from utils.rate_limiter import RETRY_STATUSES, get_limiter
+
+# Set by GitHub Actions (also for GitHub Enterprise Server)
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+
+MAX_RETRIES = 4
+POOL_SIZE = 16
+STREAM_CHUNK_SIZE = 64 * 1024
+# Longer streamed lines (minified code, data blobs) are cut to this; no
+# token budget is large enough to review more of one line anyway
+MAX_LINE_BYTES = 128 * 1024
+
+# One warm connection pool for every review in the process
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE))
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE))
+
+
+@dataclass(frozen=True)
+class PullRequest:
+    """Identifies one pull request to review"""
+    owner: str
+    repo: str
+    number: int
+
+    @property
+    def api_url(self) -> str:
+        return f"{GITHUB_API_URL}/repos/{self.owner}/{self.repo}"
+
+    def __str__(self) -> str:
+        return f"{self.owner}/{self.repo}#{self.number}"
+
+
+def is_rate_limited(response: requests.Response) -> bool:
+    """429, or a 403 that is really a primary/secondary rate limit"""
+    if response.status_code in RETRY_STATUSES:
+        return True
+    if response.status_code == 403:
+        return ("retry-after" in response.headers
+                or response.headers.get("x-ratelimit-remaining") == "0"
+                or "rate limit" in response.text.lower())
+    return False
+
+
+def github_request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a GitHub API request through the shared limiter
+
+    Reads go through the "github" bucket, writes additionally through the
+    slower "github-write" bucket. Rate-limited responses are retried with
+    jittered backoff; everything else is returned to the caller as-is.
+    """
+    limiters = [get_limiter("github")]
+    if method.upper() != "GET":
+        limiters.append(get_limiter("github-write"))
+
+    for attempt in range(MAX_RETRIES + 1):
+        for limiter in limiters:
+            limiter.acquire()
+
+        with metrics.current().span("http.github", method=method.upper(),
+                                    path=url.replace(GITHUB_API_URL, "", 1)) as span:
+            response = session.request(method, url, **kwargs)
+            span["status"] = response.status_code
+            # Don't consume streamed bodies just to measure them
+            span["bytes"] = (int(response.headers.get("Content-Length", 0)) if kwargs.get("stream")
+                             else len(response.content))
+        for limiter in limiters:
+            limiter.update_from_headers(response.headers)
+
+        if not is_rate_limited(response) or attempt == MAX_RETRIES:
+            return response
+
+        metrics.current().incr("github_retries")
+        response.close()  # hand a streamed response's connection back to the pool
+        delay = limiters[-1].backoff(attempt, response.headers)
+        print(f"⏳ GitHub rate limited ({response.status_code}), backed off {delay:.1f}s")
+
+    return response
+
+
+def github_paginate(url: str, limit: Optional[int] = None, **kwargs) -> List[Dict]:
+    """GET every page of a list endpoint (follows Link: rel="next")
+
+    Stops early once limit items have been collected.
+    """
+    params = dict(kwargs.pop("params", None) or {})
+    params.setdefault("per_page", 100)
+
+    items = []
+    while url and (limit is None or len(items) < limit):
+        response = github_request("GET", url, params=params, **kwargs)
+        response.raise_for_status()
+        items.extend(response.json())
+        url = response.links.get("next", {}).get("url")
+        params = None  # the next link already carries the query string
+    return items if limit is None else items[:limit]
+
+
+def github_stream_lines(url: str, **kwargs) -> Iterator[str]:
+    """GET a text resource (e.g. a diff) and yield it line by line as it downloads
+
+    Nothing beyond the current chunk and at most MAX_LINE_BYTES of an
+    unfinished line is buffered (longer lines are cut), and closing the
+    generator early closes the connection, so callers can stop reading at
+    any point.
+    """
+    response = github_request("GET", url, stream=True, **kwargs)
+    with response:
+        response.raise_for_status()
+        pending: List[bytes] = []  # start of the current line, in pieces
+        size = 0
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            metrics.current().incr("diff_bytes", len(chunk))
+            *ends, rest = chunk.split(b"\n")
+            for end in ends:
+                pending.append(end[:MAX_LINE_BYTES - size])
+                yield b"".join(pending).decode("utf-8", errors="replace")
+                pending, size = [], 0
+            if size < MAX_LINE_BYTES:
+                pending.append(rest[:MAX_LINE_BYTES - size])
+                size += len(pending[-1])
+        if size:
+            yield b"".join(pending).decode("utf-8", errors="replace")
@@ -0,0 +1,172 @@
+"""
+Per-run timing spans and metrics
+Built by Jackson Studio
+
+Each review run gets a RunMetrics collector held in a context variable,
+so HTTP helpers deep in the call stack can record spans without passing
+it around. At the end of the run one JSON record is written to the
+destination in METRICS_OUTPUT ("stdout", "stderr" or a .jsonl path)
+and, if ANALYTICS_DB is set, stored in the SQLite analytics database.
+"""
+
+import contextvars
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from utils import analytics
+from utils.cost_tracker import calculate_cost, usage_to_dict
+
+METRICS_OUTPUT = os.environ.get("METRICS_OUTPUT", "")
+
+_current: contextvars.ContextVar = contextvars.ContextVar("review_metrics", default=None)
+
+
+class RunMetrics:
+    """Spans, counters and token usage for one review run"""
+
+    def __init__(self, **labels):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.labels = labels
+        self.started = time.perf_counter()
+        self.timestamp = datetime.now(timezone.utc).isoformat()
+        self.spans = []
+        self.counters: Dict[str, float] = {}
+        self.tokens = {"input_tokens": 0, "output_tokens": 0,
+                       "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        self.cost = 0.0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time a block; attrs can be updated inside via the yielded dict"""
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self.lock:
+                self.spans.append({
+                    "name": name,
+                    "start_ms": round((start - self.started) * 1000, 1),
+                    "duration_ms": round(elapsed, 1),
+                    **attrs,
+                })
+
+    def incr(self, name: str, amount: float = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_usage(self, usage, model: str, batch: bool = False):
+        tokens = usage_to_dict(usage)
+        with self.lock:
+            for key, value in tokens.items():
+                self.tokens[key] += value
+            self.cost += calculate_cost(usage, model, batch=batch)
+        if tokens["cache_read_input_tokens"]:
+            self.incr("cache_hits")
+
+    def to_record(self) -> Dict:
+        stages: Dict[str, float] = {}
+        http: Dict[str, Dict] = {}
+        for span in self.spans:
+            if span["name"].startswith("http."):
+                entry = http.setdefault(span["name"][5:], {"requests": 0, "duration_ms": 0.0, "bytes": 0})
+                entry["requests"] += 1
+                entry["duration_ms"] = round(entry["duration_ms"] + span["duration_ms"], 1)
+                entry["bytes"] += span.get("bytes", 0)
+            else:
+                stages[span["name"]] = round(stages.get(span["name"], 0) + span["duration_ms"], 1)
+
+        return {
+            "run_id": self.run_id,
+            "timestamp": self.timestamp,
+            **self.labels,
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages": stages,
+            "http": http,
+            "tokens": dict(self.tokens),
+            "cost": round(self.cost, 6),
+            "counters": dict(self.counters),
+            "spans": list(self.spans),
+        }
+
+    def emit(self, destination: Optional[str] = None):
+        """Write the run record as one JSON line"""
+        destination = METRICS_OUTPUT if destination is None else destination
+        if not destination:
+            return
+
+        line = json.dumps(self.to_record())
+        if destination == "stdout":
+            print(line, flush=True)
+        elif destination == "stderr":
+            print(line, file=sys.stderr, flush=True)
+        else:
+            with open(destination, "a") as f:
+                f.write(line + "\n")
+
+    def store(self, db: Optional[str] = None):
+        """Save the run record in the analytics database (ANALYTICS_DB)"""
+        db = analytics.ANALYTICS_DB if db is None else db
+        if not db:
+            return
+        try:
+            analytics.record_run(self.to_record(), db)
+        except (sqlite3.Error, OSError) as e:
+            # Analytics must never fail a review
+            print(f"⚠️ Could not store run metrics in {db}: {e}", file=sys.stderr)
+
+
+class _NullMetrics(RunMetrics):
+    """Collector used when no run is active; records nothing"""
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        yield attrs
+
+    def incr(self, name: str, amount: float = 1):
+        pass
+
+    def record_usage(self, usage, model: str, batch: bool = False):
+        pass
+
+
+NULL_METRICS = _NullMetrics()
+
+
+def current() -> RunMetrics:
+    """The collector for the run in progress (a no-op one if none)"""
+    return _current.get() or NULL_METRICS
+
+
+@contextmanager
+def run_metrics(emit: bool = True, collector: Optional[RunMetrics] = None, **labels):
+    """Activate a fresh collector for the enclosed run and emit it on exit
+
+    The record's "outcome" label defaults to "ok", or to the exception
+    name if the run raised; callers can set it themselves (e.g. "skipped").
+    Pass collector to continue a run started earlier (a batch review
+    prepared with emit=False and finished when the batch ends).
+    """
+    metrics = collector or RunMetrics()
+    metrics.labels.update(labels)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+        metrics.labels.setdefault("outcome", "ok")
+    except BaseException as e:
+        metrics.labels.setdefault("outcome", type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        if emit:
+            metrics.emit()
+            metrics.store()
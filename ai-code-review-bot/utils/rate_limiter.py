@@ -0,0 +1,155 @@
+"""
+Shared adaptive rate limiting
+Built by Jackson Studio
+
+One token bucket per service, shared by every thread in the process. The
+bucket is tuned on the fly from the rate-limit headers GitHub and
+Anthropic send back, so concurrent reviews slow down before they hit a
+429/403 instead of after.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Mapping, Optional
+
+# (requests per second, burst size) per service
+DEFAULT_LIMITS = {
+    "github": (10.0, 10),
+    # GitHub asks for >= 1s between content-creating requests (secondary limits)
+    "github-write": (1.0, 1),
+    "anthropic": (1.0, 4),
+}
+
+# Statuses that mean "slow down and retry"
+RETRY_STATUSES = {429, 529}
+
+# Anthropic clients run with SDK retries off, so the shared backoff also
+# covers what the SDK would retry: timeouts, conflicts and server errors
+ANTHROPIC_RETRY_STATUSES = RETRY_STATUSES | {408, 409, 500, 502, 503}
+
+# Start spreading requests out once this few remain in the window
+LOW_REMAINING = 20
+
+MAX_BACKOFF = 60.0
+
+
+def parse_reset(value: str, now: float) -> Optional[float]:
+    """Parse a reset header: epoch seconds (GitHub) or RFC 3339 (Anthropic)"""
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    # Small numbers are "seconds from now", large ones are epoch timestamps
+    return number if number > 1_000_000_000 else now + number
+
+
+class RateLimiter:
+    """Thread-safe token bucket that adapts to server rate-limit headers"""
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.paced_rate = None
+        self.paced_until = 0.0
+        self.lock = threading.Lock()
+
+    def _current_rate(self, now: float) -> float:
+        if self.paced_rate is not None and now < self.paced_until:
+            return min(self.rate, self.paced_rate)
+        self.paced_rate = None
+        return self.rate
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                rate = self._current_rate(now)
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * rate)
+                self.updated = now
+
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = max(self.blocked_until - now, (1 - self.tokens) / rate)
+
+            time.sleep(wait)
+
+    def block_for(self, seconds: float):
+        """Stop all callers for seconds (e.g. after retry-after)"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Adapt to retry-after / x-ratelimit-* / anthropic-ratelimit-* headers"""
+        if not headers:
+            return
+        headers = {k.lower(): v for k, v in headers.items()}
+        wall_now = time.time()
+
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                self.block_for(float(retry_after))
+            except ValueError:
+                pass
+
+        remaining = headers.get("x-ratelimit-remaining",
+                                headers.get("anthropic-ratelimit-requests-remaining"))
+        reset = parse_reset(headers.get("x-ratelimit-reset",
+                                        headers.get("anthropic-ratelimit-requests-reset", "")),
+                            wall_now)
+        if remaining is None or reset is None:
+            return
+
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            return
+
+        window = max(reset - wall_now, 0.0)
+        if remaining <= 0:
+            self.block_for(window)
+        elif remaining < LOW_REMAINING and window > 0:
+            with self.lock:
+                self.paced_rate = remaining / window
+                self.paced_until = time.monotonic() + window
+
+    def backoff(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """Sleep before retry attempt (0-based); returns the delay used
+
+        Honors retry-after when the server sent one, otherwise full-jitter
+        exponential backoff so parallel callers don't retry in lockstep.
+        """
+        self.update_from_headers(headers or {})
+        with self.lock:
+            blocked = max(self.blocked_until - time.monotonic(), 0.0)
+        delay = max(blocked, random.uniform(0, min(MAX_BACKOFF, 2.0 ** (attempt + 1))))
+        time.sleep(delay)
+        return delay
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> RateLimiter:
+    """Process-wide limiter for a service"""
+    with _registry_lock:
+        if name not in _limiters:
+            rate, burst = DEFAULT_LIMITS.get(name, (1.0, 1))
+            _limiters[name] = RateLimiter(name, rate, burst)
+        return _limiters[name]
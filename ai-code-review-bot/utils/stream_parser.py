@@ -0,0 +1,90 @@
+"""
+Incremental parser for streamed review JSON
+Built by Jackson Studio
+
+Pulls each complete object out of the top-level "issues" array while the
+model is still generating, so issues can be posted before the response
+finishes.
+"""
+
+import json
+from typing import Dict, List
+
+
+class IssueStreamParser:
+    """Feed text chunks, get back newly completed issue dicts"""
+
+    def __init__(self, key: str = "issues"):
+        self.key = key
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_start = 0
+        self.last_string = None
+        self.expect_array = False
+        self.array_depth = None
+        self.item_start = None
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Consume a chunk and return any issues it completed"""
+        self.buffer += chunk
+        completed = []
+
+        while self.pos < len(self.buffer) and not self.done:
+            char = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    self.last_string = self.buffer[self.string_start:self.pos]
+                    if self.array_depth is None and self.depth == 1 and self.last_string == self.key:
+                        self.expect_array = True
+                self.pos += 1
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self.string_start = self.pos + 1
+            elif char in "{[":
+                if char == "[" and self.expect_array:
+                    self.array_depth = self.depth + 1
+                elif char == "{" and self.depth == self.array_depth:
+                    self.item_start = self.pos
+                self.expect_array = False
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if char == "}" and self.item_start is not None and self.depth == self.array_depth:
+                    item = self._load(self.buffer[self.item_start:self.pos + 1])
+                    if item is not None:
+                        completed.append(item)
+                    self.item_start = None
+                elif char == "]" and self.array_depth is not None and self.depth == self.array_depth - 1:
+                    self.done = True
+            elif char not in " \t\r\n:":
+                self.expect_array = False
+
+            self.pos += 1
+
+        self._compact()
+        return completed
+
+    def _load(self, text: str):
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return item if isinstance(item, dict) else None
+
+    def _compact(self):
+        """Drop consumed text that can no longer be part of an issue"""
+        if self.item_start is None and not self.in_string:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
@@ -0,0 +1,67 @@
+"""
+Daily commit activity
+Built by Jackson Studio
+
+Commits per day held in a flat counter array (one slot per calendar day),
+built from the commit index's per-day aggregate table. Current and
+longest streak are computed once when the array is built, so panels read
+them in constant time; the array is only rebuilt when the index ingested
+something new or the day rolled over.
+"""
+
+from array import array
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+HEATMAP_WEEKS = 53
+
+
+class DayCounts:
+    """Commits per day from `start` to `today`, with streaks precomputed"""
+
+    def __init__(self, daily: Dict[str, int], today: date):
+        days = [date.fromisoformat(day) for day, n in daily.items() if n > 0]
+        self.today = today
+        self.start = min(min(days, default=today), today - timedelta(weeks=HEATMAP_WEEKS))
+        self.counts = array("I", [0]) * ((today - self.start).days + 1)
+        for day, n in daily.items():
+            index = (date.fromisoformat(day) - self.start).days
+            if 0 <= index < len(self.counts):
+                self.counts[index] += n
+        self.current_streak = self._current_streak()
+        self.longest_streak = self._longest_streak()
+
+    def count(self, day: date) -> int:
+        index = (day - self.start).days
+        return self.counts[index] if 0 <= index < len(self.counts) else 0
+
+    def total(self, days: int) -> int:
+        """Commits in the last `days` days, today included"""
+        return sum(self.counts[-days:])
+
+    def _current_streak(self) -> int:
+        # A streak is still alive until the end of today
+        end = len(self.counts) - 1 if self.counts[-1] else len(self.counts) - 2
+        streak = 0
+        while end - streak >= 0 and self.counts[end - streak]:
+            streak += 1
+        return streak
+
+    def _longest_streak(self) -> int:
+        longest = run = 0
+        for n in self.counts:
+            run = run + 1 if n else 0
+            longest = max(longest, run)
+        return longest
+
+    def heatmap(self, weeks: int = HEATMAP_WEEKS) -> List[List[Optional[int]]]:
+        """7 rows (Sunday first) x `weeks` columns of counts; None after today"""
+        # The last column is the current week, Sunday to Saturday
+        last_sunday = self.today - timedelta(days=(self.today.weekday() + 1) % 7)
+        first = last_sunday - timedelta(weeks=weeks - 1)
+        rows: List[List[Optional[int]]] = [[] for _ in range(7)]
+        for week in range(weeks):
+            for weekday in range(7):
+                day = first + timedelta(weeks=week, days=weekday)
+                rows[weekday].append(self.count(day) if day <= self.today else None)
+        return rows
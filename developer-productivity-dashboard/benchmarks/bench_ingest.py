@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Commit ingestion benchmark
+Built by Jackson Studio
+
+Builds a synthetic repository with `git fast-import` (100k commits by
+default, several authors, spread over years) and times a full index build
+with each CommitIndex backend: GitPython Commit objects vs. one streamed
+`git log` process. Also times the bare walk without SQLite.
+
+Usage:
+    python benchmarks/bench_ingest.py
+    python benchmarks/bench_ingest.py --commits 20000 --json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from git import Repo
+
+from commit_index import BACKENDS, CommitIndex, git_log_commits, gitpython_commits
+
+AUTHORS = [f"dev{i}@example.com" for i in range(8)]
+START = 1_600_000_000  # Sep 2020
+
+
+def build_repo(path: str, commits: int, start: int = START):
+    """Linear history of `commits` commits, each touching one small file"""
+    subprocess.run(["git", "init", "-q", path], check=True)
+    stream = []
+    for i in range(commits):
+        author = AUTHORS[i % len(AUTHORS)]
+        when = start + i * 1800  # one commit every 30 minutes
+        message = f"commit {i}\n".encode()
+        content = f"{i}\n".encode()
+        stream.append(b"commit refs/heads/main\n")
+        stream.append(f"author {author.split('@')[0]} <{author}> {when} +0000\n".encode())
+        stream.append(f"committer {author.split('@')[0]} <{author}> {when} +0000\n".encode())
+        # Consecutive commits on one branch chain onto each other
+        stream.append(b"data %d\n%s" % (len(message), message))
+        stream.append(b"M 644 inline counter.txt\ndata %d\n%s\n" % (len(content), content))
+    subprocess.run(["git", "-C", path, "fast-import", "--quiet"], input=b"".join(stream), check=True)
+    subprocess.run(["git", "-C", path, "symbolic-ref", "HEAD", "refs/heads/main"], check=True)
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(commits: int) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo_path = os.path.join(tmp, "repo")
+        build_seconds = timed(lambda: build_repo(repo_path, commits))
+        repo = Repo(repo_path)
+        head = repo.head.commit.hexsha
+
+        results = {"commits": commits, "build_s": round(build_seconds, 2), "walk_s": {}, "index_s": {}}
+        results["walk_s"]["cli"] = timed(lambda: sum(1 for _ in git_log_commits(repo_path, [head])))
+        results["walk_s"]["gitpython"] = timed(lambda: sum(1 for _ in gitpython_commits(repo, [head])))
+
+        for backend in BACKENDS:
+            index = CommitIndex(os.path.join(tmp, f"{backend}.db"), backend)
+            results["index_s"][backend] = timed(lambda: index.update(repo_path))
+            # A refresh with nothing new must be near-free
+            results["index_s"][f"{backend}_noop"] = timed(lambda: index.update(repo_path))
+            assert len(index.commits_since(datetime.fromtimestamp(0))) == commits
+
+        for section in ("walk_s", "index_s"):
+            results[section] = {k: round(v, 3) for k, v in results[section].items()}
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare commit ingestion backends")
+    parser.add_argument("--commits", type=int, default=100_000)
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a summary")
+    args = parser.parse_args()
+
+    results = run(args.commits)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    walk, index = results["walk_s"], results["index_s"]
+    print(f"📦 Synthetic repo: {results['commits']:,} commits (built in {results['build_s']}s)")
+    print(f"  walk only   git log {walk['cli']:.2f}s   GitPython {walk['gitpython']:.2f}s   "
+          f"({walk['gitpython'] / walk['cli']:.1f}x)")
+    print(f"  full index  git log {index['cli']:.2f}s   GitPython {index['gitpython']:.2f}s   "
+          f"({index['gitpython'] / index['cli']:.1f}x)")
+    print(f"  no-op refresh  git log {index['cli_noop'] * 1000:.0f}ms   GitPython {index['gitpython_noop'] * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
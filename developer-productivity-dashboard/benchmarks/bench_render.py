@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Render loop CPU benchmark
+Built by Jackson Studio
+
+Measures process CPU time per one-second UI tick, drawing into an
+in-memory terminal, for the two Live loops:
+
+  before  every tick rebuilds all panels and Live auto-refreshes 4x/second
+  after   panels are rebuilt only when their data version changed, and the
+          screen is redrawn only when a panel changed
+
+Most ticks on an always-on terminal change nothing; --change-every sets
+how often the git collector reports new data.
+
+Usage:
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --ticks 600 --change-every 60 --json
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from rich.console import Console
+
+from bench_ingest import build_repo
+from dashboard import ProductivityDashboard
+
+# Live(refresh_per_second=4) redrew the whole layout four times per tick
+OLD_REFRESHES_PER_TICK = 4
+
+
+def make_dashboard(tmp: str, commits: int) -> ProductivityDashboard:
+    repo = os.path.join(tmp, "repo")
+    build_repo(repo, commits, start=int(time.time()) - commits * 1800)
+    config = os.path.join(tmp, "config.json")
+    with open(config, "w") as f:
+        json.dump({"github": {"token": "", "username": "dev", "email": "dev0@example.com"},
+                   "local_repos": [repo], "index_db": os.path.join(tmp, "index.db")}, f)
+    dashboard = ProductivityDashboard(config)
+    dashboard.console = Console(file=io.StringIO(), width=120, height=45, force_terminal=True)
+    for collector in dashboard.collectors.collectors.values():
+        collector.collect()
+    return dashboard
+
+
+def draw(dashboard: ProductivityDashboard):
+    dashboard.console.file.seek(0)
+    dashboard.console.file.truncate()
+    dashboard.console.print(dashboard.layout)
+
+
+def run(ticks: int, change_every: int, commits: int) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        dashboard = make_dashboard(tmp, commits)
+        git = dashboard.collectors["git"]
+
+        def tick(i: int, before: bool):
+            if i % change_every == 0:
+                git.version += 1  # the git collector brought new data
+            if before:
+                dashboard.update_panels(force=True)
+                for _ in range(OLD_REFRESHES_PER_TICK):
+                    draw(dashboard)
+            elif dashboard.update_panels():
+                draw(dashboard)
+
+        results = {"ticks": ticks, "change_every": change_every}
+        for label, before in (("before", True), ("after", False)):
+            dashboard.update_panels(force=True)
+            started = time.process_time()
+            for i in range(1, ticks + 1):
+                tick(i, before)
+            results[f"{label}_ms_per_tick"] = round((time.process_time() - started) * 1000 / ticks, 3)
+        dashboard.scan_pool.shutdown()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU time per dashboard tick, before and after change-aware rendering")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--change-every", type=int, default=60, help="Ticks between git data changes")
+    parser.add_argument("--commits", type=int, default=2000, help="Synthetic history size")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a summary")
+    args = parser.parse_args()
+
+    results = run(args.ticks, args.change_every, args.commits)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"🖥  {results['ticks']} ticks, git data changing every {results['change_every']} ticks")
+    print(f"  before  {results['before_ms_per_tick']:.2f} ms CPU per tick")
+    print(f"  after   {results['after_ms_per_tick']:.2f} ms CPU per tick "
+          f"({results['before_ms_per_tick'] / max(results['after_ms_per_tick'], 0.001):.0f}x less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Background data collectors
+Built by Jackson Studio
+
+Each collector refreshes one piece of dashboard data (git activity,
+GitHub stats, goals) on its own thread and interval. Panels always render
+the latest cached value immediately; a failed refresh keeps serving the
+previous value, marked stale, until the next attempt succeeds
+(stale-while-revalidate).
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Collector:
+    """Periodically refreshes one value in the background"""
+
+    def __init__(self, name: str, fetch: Callable[[], Any], interval: float):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.value: Any = None
+        self.error: Optional[str] = None
+        self.updated_at: Optional[datetime] = None
+        self.version = 0  # bumped when the value or error changes
+        self.refreshing = False
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.on_update: Optional[Callable[["Collector"], None]] = None
+
+    @property
+    def stale(self) -> bool:
+        """True when the last refresh failed and the previous value is served"""
+        return self.error is not None
+
+    def refresh_now(self):
+        """Refresh on the next loop iteration instead of waiting out the interval"""
+        self._wake.set()
+
+    def collect(self):
+        """Fetch once; on failure keep the previous value
+
+        The version only moves when the value or error actually changed,
+        so panels drawn from this collector are not rebuilt needlessly.
+        """
+        self.refreshing = True
+        previous = (self.value, self.error)
+        try:
+            value = self.fetch()
+            self.error = None
+            self.updated_at = datetime.now()
+            self.value = value
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.refreshing = False
+        if self.version == 0 or (self.value, self.error) != previous:
+            self.version += 1
+            if self.on_update:
+                self.on_update(self)
+
+    def run(self, stop: threading.Event):
+        while not stop.is_set():
+            started = time.monotonic()
+            self.collect()
+            remaining = self.interval - (time.monotonic() - started)
+            self._wake.wait(max(remaining, 0))
+            self._wake.clear()
+
+    def start(self, stop: threading.Event):
+        # Daemon threads: a git walk stuck on a slow mount must not block exit
+        self._thread = threading.Thread(target=self.run, args=(stop,), name=f"collector-{self.name}", daemon=True)
+        self._thread.start()
+
+
+class CollectorSet:
+    """The dashboard's collectors, started and stopped together"""
+
+    def __init__(self, collectors: List[Collector]):
+        self.collectors: Dict[str, Collector] = {c.name: c for c in collectors}
+        self.stop_event = threading.Event()
+        self.updated = threading.Event()  # set whenever any collector has new data
+        for collector in collectors:
+            collector.on_update = lambda _: self.updated.set()
+
+    def __getitem__(self, name: str) -> Collector:
+        return self.collectors[name]
+
+    def start(self):
+        for collector in self.collectors.values():
+            collector.start(self.stop_event)
+
+    def stop(self):
+        self.stop_event.set()
+        self.updated.set()  # release anyone waiting for new data
+        for collector in self.collectors.values():
+            collector.refresh_now()  # wake it so the thread sees stop
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until every collector has finished its first refresh"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while any(c.version == 0 for c in self.collectors.values()) and not self.stop_event.is_set():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            self.updated.wait(remaining)
+            self.updated.clear()
+        return True
+
+    def refresh_all(self):
+        for collector in self.collectors.values():
+            collector.refresh_now()
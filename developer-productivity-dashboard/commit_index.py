@@ -0,0 +1,261 @@
+"""
+Commit history index
+Built by Jackson Studio
+
+Keeps every commit of the configured repos in a local SQLite database so
+a refresh only ingests what is new since the last indexed HEAD of each
+repo and branch. Rewritten history (rebase, reset, force-push) is
+detected when the stored HEAD is no longer an ancestor of the current
+one, and that repo is re-indexed. Per-day/per-author counts are kept in
+a small aggregate table, so weekly totals never touch the commit rows.
+"""
+
+import os
+import shutil
+import sqlite3
+import subprocess
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_INDEX_DB = os.path.expanduser("~/.cache/productivity-dashboard/commits.db")
+
+# Rows per executemany() while ingesting
+BATCH_SIZE = 5000
+
+# Ingestion backends: "cli" streams `git log`, "gitpython" walks Commit objects
+BACKENDS = ("cli", "gitpython")
+
+# hash, author email, commit timestamp, local commit day; unit separators can't appear in any of them
+LOG_FORMAT = "%H%x1f%ae%x1f%ct%x1f%cd"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS heads (
+    repo TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    head TEXT NOT NULL,
+    indexed_at TEXT NOT NULL,
+    PRIMARY KEY (repo, branch)
+);
+
+CREATE TABLE IF NOT EXISTS commits (
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    author TEXT NOT NULL,
+    committed_at INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    PRIMARY KEY (repo, sha)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS commits_committed_at ON commits (committed_at);
+
+CREATE TABLE IF NOT EXISTS daily (
+    repo TEXT NOT NULL,
+    day TEXT NOT NULL,
+    author TEXT NOT NULL,
+    commits INTEGER NOT NULL,
+    PRIMARY KEY (repo, day, author)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS daily_day_author ON daily (day, author);
+"""
+
+
+def local_day(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+def current_branch(repo) -> str:
+    """Checked-out branch name, or "HEAD" when detached"""
+    try:
+        return repo.active_branch.name
+    except TypeError:
+        return "HEAD"
+
+
+def gitpython_commits(repo, rev: List[str]) -> Iterator[Tuple[str, str, int, str]]:
+    """(sha, author email, commit timestamp, local day) for rev-list arguments"""
+    for commit in repo.iter_commits(rev):
+        yield commit.hexsha, commit.author.email or "", commit.committed_date, local_day(commit.committed_date)
+
+
+class GitLogError(Exception):
+    """`git log` exited with an error"""
+
+
+def git_log_commits(repo_path: str, rev: List[str]) -> Iterator[Tuple[str, str, int, str]]:
+    """Same as gitpython_commits, parsed from one streaming `git log` process"""
+    # git formats the local day itself, saving a datetime per commit
+    process = subprocess.Popen(
+        ["git", "-C", repo_path, "-c", "log.showSignature=false", "log", f"--format={LOG_FORMAT}",
+         "--date=format-local:%Y-%m-%d", *rev, "--"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for line in process.stdout:
+            sha, email, timestamp, day = line.rstrip(b"\n").split(b"\x1f")
+            yield sha.decode(), email.decode("utf-8", "replace"), int(timestamp), day.decode()
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode("utf-8", "replace")
+        process.stderr.close()
+        if process.wait() != 0 and process.returncode != -13:  # -13: we stopped reading early
+            raise GitLogError(stderr.strip() or f"git log exited with {process.returncode}")
+
+
+class CommitIndex:
+    """Persisted, incrementally updated commit history of local repos"""
+
+    def __init__(self, path: Optional[str] = None, backend: Optional[str] = None):
+        self.path = os.path.expanduser(path) if path else DEFAULT_INDEX_DB
+        if backend is None:
+            backend = "cli" if shutil.which("git") else "gitpython"
+        if backend not in BACKENDS:
+            raise ValueError(f"git_backend must be one of {', '.join(BACKENDS)}")
+        self.backend = backend
+
+    def walk(self, repo, repo_path: str, rev: List[str]) -> Iterator[Tuple[str, str, int, str]]:
+        if self.backend == "cli":
+            return git_log_commits(repo_path, rev)
+        return gitpython_commits(repo, rev)
+
+    def connect(self) -> sqlite3.Connection:
+        """Open (and if needed create) the index; one connection per caller"""
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def update(self, repo_path: str) -> int:
+        """Ingest commits new since the last indexed HEAD; returns how many"""
+        from git import Repo
+
+        repo = Repo(repo_path)
+        if not repo.head.is_valid():
+            return 0  # no commits yet
+        head = repo.head.commit.hexsha
+        branch = current_branch(repo)
+
+        conn = self.connect()
+        try:
+            known = dict(conn.execute("SELECT branch, head FROM heads WHERE repo = ?", (repo_path,)).fetchall())
+            if known.get(branch) == head:
+                return 0
+
+            previous = known.get(branch)
+            if previous and not self._is_ancestor(repo, previous, head):
+                # History was rewritten: the old rows may no longer be reachable
+                self._forget(conn, repo_path)
+                known = {}
+
+            # Everything reachable from a known head is already indexed
+            exclude = [f"^{sha}" for sha in set(known.values()) if self._exists(repo, sha)]
+            with conn:
+                added = self._ingest(conn, repo_path, self.walk(repo, repo_path, [head] + exclude))
+                conn.execute("INSERT OR REPLACE INTO heads (repo, branch, head, indexed_at) VALUES (?, ?, ?, ?)",
+                             (repo_path, branch, head, datetime.now().isoformat()))
+            return added
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _is_ancestor(repo, ancestor: str, head: str) -> bool:
+        try:
+            return repo.is_ancestor(ancestor, head)
+        except Exception:
+            return False  # ancestor was garbage-collected
+
+    @staticmethod
+    def _exists(repo, sha: str) -> bool:
+        try:
+            repo.commit(sha)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _forget(conn: sqlite3.Connection, repo_path: str):
+        with conn:
+            for table in ("heads", "commits", "daily"):
+                conn.execute(f"DELETE FROM {table} WHERE repo = ?", (repo_path,))
+
+    @staticmethod
+    def _ingest(conn: sqlite3.Connection, repo_path: str, commits: Iterable[Tuple[str, str, int, str]]) -> int:
+        added = 0
+        batch: List[Tuple] = []
+        # Only a repo with rows already can receive duplicates
+        check = conn.execute("SELECT 1 FROM commits WHERE repo = ? LIMIT 1", (repo_path,)).fetchone() is not None
+
+        def flush():
+            nonlocal added
+            # Rows already indexed (reachable from a gc'ed head) are skipped and not counted twice
+            existing = set()
+            for start in range(0, len(batch) if check else 0, 500):
+                shas = [row[1] for row in batch[start:start + 500]]
+                existing.update(sha for (sha,) in conn.execute(
+                    f"SELECT sha FROM commits WHERE repo = ? AND sha IN ({', '.join('?' * len(shas))})",
+                    [repo_path] + shas))
+            new_rows = [row for row in batch if row[1] not in existing]
+            conn.executemany("INSERT OR IGNORE INTO commits (repo, sha, author, committed_at, day) "
+                             "VALUES (?, ?, ?, ?, ?)", new_rows)
+            counts: Dict[Tuple[str, str], int] = {}
+            for _, _, author, _, day in new_rows:
+                counts[(day, author)] = counts.get((day, author), 0) + 1
+            conn.executemany(
+                "INSERT INTO daily (repo, day, author, commits) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (repo, day, author) DO UPDATE SET commits = commits + excluded.commits",
+                [(repo_path, day, author, n) for (day, author), n in counts.items()])
+            added += len(new_rows)
+            batch.clear()
+
+        for sha, author, timestamp, day in commits:
+            batch.append((repo_path, sha, author, timestamp, day))
+            if len(batch) >= BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+        return added
+
+    def commits_since(self, since: datetime, repos: Optional[List[str]] = None) -> List[Dict]:
+        """Indexed commits at or after `since` (uses the committed_at index)"""
+        conn = self.connect()
+        try:
+            rows = conn.execute("SELECT repo, sha, author, committed_at FROM commits WHERE committed_at >= ? "
+                                "ORDER BY committed_at", (int(since.timestamp()),)).fetchall()
+        finally:
+            conn.close()
+        return [{"repo": repo, "sha": sha, "author": author, "time": datetime.fromtimestamp(ts)}
+                for repo, sha, author, ts in rows if repos is None or repo in repos]
+
+    def daily_counts(self, since_day: str, author: Optional[str] = None,
+                     repos: Optional[List[str]] = None) -> Dict[str, int]:
+        """Commits per day (YYYY-MM-DD) from since_day on, optionally for one author"""
+        query = "SELECT repo, day, SUM(commits) FROM daily WHERE day >= ?"
+        params: List = [since_day]
+        if author is not None:
+            query += " AND author = ?"
+            params.append(author)
+        conn = self.connect()
+        try:
+            rows = conn.execute(query + " GROUP BY repo, day", params).fetchall()
+        finally:
+            conn.close()
+
+        counts: Dict[str, int] = {}
+        for repo, day, n in rows:
+            if repos is None or repo in repos:
+                counts[day] = counts.get(day, 0) + n
+        return counts
+
+    def author_counts(self, since_day: str, repos: Optional[List[str]] = None) -> Dict[str, int]:
+        """Commits per author from since_day on"""
+        conn = self.connect()
+        try:
+            rows = conn.execute("SELECT repo, author, SUM(commits) FROM daily WHERE day >= ? "
+                                "GROUP BY repo, author", (since_day,)).fetchall()
+        finally:
+            conn.close()
+
+        counts: Dict[str, int] = {}
+        for repo, author, n in rows:
+            if repos is None or repo in repos:
+                counts[author] = counts.get(author, 0) + n
+        return counts
@@ -10,9 +10,11 @@ daily goals, and productivity metrics.
 import json
 import os
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from rich.console import Console
 from rich.layout import Layout
@@ -30,11 +32,52 @@ except ImportError:
     HAS_GIT = False
 
 try:
-    from github import Github
+    from github_stats import DEFAULT_API_URL, DEFAULT_CACHE, GitHubStats
     HAS_GITHUB = True
-except ImportError:
+except ImportError:  # requests not installed
     HAS_GITHUB = False
 
+from activity import DayCounts
+from collectors import Collector, CollectorSet
+from commit_index import CommitIndex
+from exporter import FORMATS, run_headless
+
+try:
+    import select
+    import termios
+    import tty
+    HAS_TTY = True
+except ImportError:  # Windows
+    HAS_TTY = False
+
+
+@dataclass
+class RepoStatus:
+    """Outcome of the last scan of one local repo"""
+    path: str
+    state: str  # "ok", "stale" (scan still running), "error" or "missing"
+    message: str = ""
+    scanned_at: Optional[datetime] = field(default=None, compare=False)
+
+
+@dataclass
+class CommitSnapshot:
+    """Today's commits across all local repos, collected once per refresh"""
+    since: datetime
+    commits: List[Dict] = field(default_factory=list)  # {"repo", "sha", "author", "time"}
+    repos_scanned: int = 0
+    statuses: List[RepoStatus] = field(default_factory=list)
+    activity: Optional[DayCounts] = None  # your commits per day, all history
+
+    def by_author(self, email: Optional[str]) -> List[Dict]:
+        """Commits by email; None means every author"""
+        if email is None:
+            return list(self.commits)
+        return [c for c in self.commits if c["author"] == email]
+
+    def times(self) -> List[datetime]:
+        return sorted(c["time"] for c in self.commits)
+
 
 class ProductivityDashboard:
     """Main dashboard controller"""
@@ -43,12 +86,49 @@ class ProductivityDashboard:
         self.console = Console()
         self.config = self.load_config(config_path)
         self.layout = self.create_layout()
-        self.goals = self.load_goals()
+        self.index = CommitIndex(self.config.get("index_db"), self.config.get("git_backend"))
+        self.repo_status: Dict[str, RepoStatus] = {}
+        self.scans: Dict[str, Future] = {}
+        self.activity: Optional[DayCounts] = None
+        self.panel_versions: Dict[str, tuple] = {}
+        self.scan_pool = ThreadPoolExecutor(max_workers=self.config.get("scan_workers", 4),
+                                            thread_name_prefix="repo-scan")
         
-        if HAS_GITHUB and self.config.get("github", {}).get("token"):
-            self.gh = Github(self.config["github"]["token"])
+        github = self.config.get("github", {})
+        if HAS_GITHUB and github.get("token"):
+            self.gh = GitHubStats(github["token"], github["username"],
+                                  api_url=github.get("api_url", DEFAULT_API_URL),
+                                  ttl=github.get("cache_ttl", 300),
+                                  cache_path=github.get("cache_path", DEFAULT_CACHE))
         else:
             self.gh = None
+        
+        self.collectors = self.create_collectors()
+    
+    def create_collectors(self) -> CollectorSet:
+        """One background collector per data source, each on its own interval"""
+        default = self.config.get("refresh_interval", 60)
+        intervals = self.config.get("intervals", {})
+        collectors = [
+            Collector("git", self.collect_snapshot, intervals.get("git", default)),
+            Collector("goals", self.load_goals, intervals.get("goals", 30)),
+        ]
+        if self.gh:
+            collectors.append(Collector("github", self.fetch_github_stats, intervals.get("github", 60)))
+        return CollectorSet(collectors)
+    
+    @property
+    def snapshot(self) -> CommitSnapshot:
+        return self.collectors["git"].value or CommitSnapshot(since=self.today_start())
+    
+    @property
+    def author_email(self) -> Optional[str]:
+        """Whose commits count as yours (github.email); None when unset counts everyone's"""
+        return self.config.get("github", {}).get("email") or None
+    
+    @property
+    def goals(self) -> List[Dict]:
+        return self.collectors["goals"].value or []
     
     def load_config(self, path: str) -> Dict:
         """Load configuration from JSON file"""
@@ -67,14 +147,20 @@ class ProductivityDashboard:
             "github": {
                 "token": "",
                 "username": "your-username",
-                "repos": []
+                "repos": [],
+                "cache_ttl": 300
             },
             "local_repos": [],
             "goals": {
                 "commits_per_day": 5,
                 "coding_hours_per_day": 4
             },
-            "refresh_interval": 60
+            "refresh_interval": 60,
+            "intervals": {"git": 60, "github": 60, "goals": 30},
+            "repo_timeout": 5,
+            "scan_workers": 4,
+            "git_backend": "cli",
+            "index_db": "~/.cache/productivity-dashboard/commits.db"
         }
         with open(path, 'w') as f:
             json.dump(example, f, indent=2)
@@ -98,6 +184,7 @@ class ProductivityDashboard:
         layout.split_column(
             Layout(name="header", size=3),
             Layout(name="body"),
+            Layout(name="heatmap", size=9),
             Layout(name="footer", size=3)
         )
         
@@ -133,58 +220,106 @@ class ProductivityDashboard:
         
         commits_today = self.count_commits_today()
         coding_time = self.calculate_coding_time()
-        active_repos = len(self.config.get("local_repos", []))
+        statuses = self.snapshot.statuses
+        healthy = sum(1 for status in statuses if status.state == "ok")
         
         table = Table.grid(padding=(0, 2))
         table.add_column(style="cyan")
         table.add_column(style="green")
         
         table.add_row("Commits:", str(commits_today))
+        activity = self.snapshot.activity
+        table.add_row("This Week:", str(activity.total(7) if activity else 0))
         table.add_row("Coding Time:", coding_time)
-        table.add_row("Active Repos:", str(active_repos))
+        table.add_row("Active Repos:", f"{healthy}/{len(statuses)}")
+        
+        for status in statuses:
+            name = os.path.basename(status.path)
+            if status.state == "stale":
+                table.add_row(f"⏳ {name}", Text("stale — still scanning", style="yellow"))
+            elif status.state != "ok":
+                table.add_row(f"❌ {name}", Text(status.message, style="red"))
         
         return Panel(table, title="📊 Today's Stats", box=box.ROUNDED)
     
-    def count_commits_today(self) -> int:
-        """Count commits made today across all repos"""
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        total = 0
+    def today_start(self) -> datetime:
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    def repo_paths(self) -> List[str]:
+        return [os.path.abspath(os.path.expanduser(p)) for p in self.config.get("local_repos", [])]
+    
+    def scan_repo(self, repo_path: str) -> int:
+        """Bring one repo's commit index up to date (runs in the scan pool)"""
+        return self.index.update(repo_path)
+    
+    def scan_repos(self) -> Tuple[List[RepoStatus], int]:
+        """Scan all repos in parallel; slow ones are marked stale, not waited for
+        
+        Returns the statuses and how many commits the finished scans ingested.
+        """
+        ingested = 0
+        timeout = self.config.get("repo_timeout", 5)
         
-        for repo_path in self.config.get("local_repos", []):
+        for repo_path in self.repo_paths():
             if not os.path.exists(repo_path):
+                self.repo_status[repo_path] = RepoStatus(repo_path, "missing", "path not found")
                 continue
-            
-            try:
-                repo = Repo(repo_path)
-                for commit in repo.iter_commits(since=today_start.isoformat()):
-                    if commit.author.email == self.config.get("github", {}).get("email", ""):
-                        total += 1
-            except Exception:
-                pass
+            # A scan that outlived the last timeout keeps running; don't start a second one
+            if repo_path not in self.scans:
+                self.scans[repo_path] = self.scan_pool.submit(self.scan_repo, repo_path)
         
-        return total
-    
-    def calculate_coding_time(self) -> str:
-        """Calculate coding time based on commit timestamps"""
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        commit_times = []
+        running = [self.scans[p] for p in self.repo_paths() if p in self.scans]
+        wait(running, timeout=timeout)
         
-        for repo_path in self.config.get("local_repos", []):
-            if not os.path.exists(repo_path):
+        statuses = []
+        for repo_path in self.repo_paths():
+            future = self.scans.get(repo_path)
+            if future is None:
+                statuses.append(self.repo_status[repo_path])
                 continue
-            
-            try:
-                repo = Repo(repo_path)
-                for commit in repo.iter_commits(since=today_start.isoformat()):
-                    commit_times.append(commit.committed_datetime)
-            except Exception:
-                pass
-        
-        if not commit_times:
-            return "0h 0m"
-        
-        # Sort and calculate gaps
-        commit_times.sort()
+            previous = self.repo_status.get(repo_path)
+            if not future.done():
+                status = RepoStatus(repo_path, "stale", f"scan exceeded {timeout}s",
+                                    previous.scanned_at if previous else None)
+            elif future.exception() is not None:
+                error = future.exception()
+                status = RepoStatus(repo_path, "error", f"{type(error).__name__}: {error}",
+                                    previous.scanned_at if previous else None)
+            else:
+                status = RepoStatus(repo_path, "ok", scanned_at=datetime.now())
+                ingested += future.result()
+            if future.done():
+                del self.scans[repo_path]
+            self.repo_status[repo_path] = status
+            statuses.append(status)
+        return statuses, ingested
+    
+    def collect_snapshot(self) -> CommitSnapshot:
+        """Bring the commit index up to date, then read today's commits from it"""
+        snapshot = CommitSnapshot(since=self.today_start())
+        if not HAS_GIT:
+            return snapshot
+        
+        snapshot.statuses, ingested = self.scan_repos()
+        # Stale repos still contribute what was indexed before
+        readable = [s.path for s in snapshot.statuses if s.state in ("ok", "stale")]
+        snapshot.commits = self.index.commits_since(snapshot.since, readable)
+        
+        # The per-day array only changes when commits were ingested or the day rolled over
+        today = snapshot.since.date()
+        if ingested or self.activity is None or self.activity.today != today:
+            self.activity = DayCounts(self.index.daily_counts("", self.author_email, self.repo_paths()), today)
+        snapshot.activity = self.activity
+        snapshot.repos_scanned = sum(1 for s in snapshot.statuses if s.state == "ok")
+        return snapshot
+    
+    def count_commits_today(self) -> int:
+        """Count commits made today across all repos"""
+        return len(self.snapshot.by_author(self.author_email))
+    
+    def coding_minutes(self) -> int:
+        """Minutes of coding today, from gaps under 30 minutes between commits"""
+        commit_times = self.snapshot.times()
         total_minutes = 0
         
         for i in range(1, len(commit_times)):
@@ -192,8 +327,13 @@ class ProductivityDashboard:
             if gap < 30:  # Assume active if commits < 30min apart
                 total_minutes += gap
         
-        hours = int(total_minutes // 60)
-        minutes = int(total_minutes % 60)
+        return int(total_minutes)
+    
+    def calculate_coding_time(self) -> str:
+        """Calculate coding time based on commit timestamps"""
+        total_minutes = self.coding_minutes()
+        hours = total_minutes // 60
+        minutes = total_minutes % 60
         return f"{hours}h {minutes}m"
     
     def render_goals(self) -> Panel:
@@ -213,48 +353,82 @@ class ProductivityDashboard:
         
         return Panel(content, title="🎯 Daily Goals", box=box.ROUNDED)
     
+    def fetch_github_stats(self) -> Dict:
+        """Fetch GitHub stats (runs in the github collector; cached with a TTL)"""
+        return self.gh.get()
+    
     def render_github(self) -> Panel:
         """Render GitHub stats"""
         if not self.gh:
             content = Text("GitHub integration disabled.\nAdd token to config.json", style="dim")
             return Panel(content, title="📈 GitHub Stats", box=box.ROUNDED)
         
-        try:
-            user = self.gh.get_user(self.config["github"]["username"])
-            
-            table = Table.grid(padding=(0, 2))
-            table.add_column(style="cyan")
-            table.add_column(style="green")
-            
-            table.add_row("Public Repos:", str(user.public_repos))
-            table.add_row("Total Stars:", str(sum(r.stargazers_count for r in user.get_repos())))
-            table.add_row("Followers:", str(user.followers))
-            
-            return Panel(table, title="📈 GitHub Stats", box=box.ROUNDED)
+        collector = self.collectors["github"]
+        stats = collector.value
+        if stats is None:
+            if collector.error:
+                return Panel(f"[red]GitHub API error: {collector.error}[/red]", title="📈 GitHub Stats")
+            return Panel(Text("Loading…", style="dim"), title="📈 GitHub Stats", box=box.ROUNDED)
         
-        except Exception as e:
-            return Panel(f"[red]GitHub API error: {str(e)}[/red]", title="📈 GitHub Stats")
+        table = Table.grid(padding=(0, 2))
+        table.add_column(style="cyan")
+        table.add_column(style="green")
+        
+        table.add_row("Public Repos:", str(stats["public_repos"]))
+        table.add_row("Total Stars:", str(stats["stars"]))
+        table.add_row("Forks:", str(stats["forks"]))
+        table.add_row("Followers:", str(stats["followers"]))
+        table.add_row("Updated:", datetime.fromtimestamp(stats["fetched_at"]).strftime("%H:%M"))
+        if collector.stale:
+            table.add_row("⏳ Stale:", Text(collector.error, style="yellow"))
+        
+        return Panel(table, title="📈 GitHub Stats", box=box.ROUNDED)
     
     def render_streak(self) -> Panel:
         """Render commit streak"""
         streak = self.calculate_streak()
+        activity = self.snapshot.activity
+        longest = activity.longest_streak if activity else 0
         
         text = Text.assemble(
             ("🔥 ", "red bold"),
-            (f"{streak} days", "yellow bold")
+            (f"{streak} days", "yellow bold"),
+            ("\n", ""),
+            (f"Longest: {longest} days", "dim")
         )
         
         content = Align.center(text)
         return Panel(content, title="Commit Streak", box=box.ROUNDED)
     
     def calculate_streak(self) -> int:
-        """Calculate current commit streak"""
-        if not HAS_GIT:
-            return 0
+        """Current commit streak (days in a row with at least one commit)"""
+        activity = self.snapshot.activity
+        return activity.current_streak if activity else 0
+    
+    def render_heatmap(self) -> Panel:
+        """Render the past year of commits, one cell per day"""
+        activity = self.snapshot.activity
+        if activity is None:
+            return Panel(Text("No activity yet", style="dim"), title="🗓  Contributions", box=box.ROUNDED)
+        
+        rows = activity.heatmap()
+        peak = max((n for row in rows for n in row if n), default=1)
+        shades = ["grey23", "green4", "green3", "green1", "bright_green"]
         
-        # Simplified streak calculation
-        # In production, this would check each day going backwards
-        return 14  # Placeholder
+        text = Text()
+        for weekday, row in enumerate(rows):
+            text.append(["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"][weekday] + " ", style="dim")
+            for n in row:
+                if n is None:
+                    text.append(" ")
+                else:
+                    level = 0 if n == 0 else min(4, 1 + 4 * (n - 1) // peak)
+                    text.append("■", style=shades[level])
+            text.append("\n")
+        text.rstrip()
+        
+        title = f"🗓  {activity.total(365)} commits in the last year"
+        return Panel(Align.center(text), title=title, box=box.ROUNDED)
     
     def render_footer(self) -> Panel:
         """Render footer with shortcuts"""
@@ -265,30 +439,115 @@ class ProductivityDashboard:
         )
         return Panel(Align.center(shortcuts), box=box.DOUBLE)
     
+    def panel_inputs(self) -> Dict[str, tuple]:
+        """What each panel is drawn from; a panel is rebuilt only when this changes"""
+        versions = {name: c.version for name, c in self.collectors.collectors.items()}
+        return {
+            "header": (datetime.now().date(),),
+            "stats": (versions["git"],),
+            "goals": (versions["goals"],),
+            "github": (versions.get("github"),),
+            "streak": (versions["git"],),
+            "heatmap": (versions["git"],),
+            "footer": (),
+        }
+    
+    def update_panels(self, force: bool = False) -> List[str]:
+        """Rebuild the panels whose inputs changed; returns their names"""
+        renderers = {
+            "header": self.render_header,
+            "stats": self.render_stats,
+            "goals": self.render_goals,
+            "github": self.render_github,
+            "streak": self.render_streak,
+            "heatmap": self.render_heatmap,
+            "footer": self.render_footer,
+        }
+        changed = []
+        for name, inputs in self.panel_inputs().items():
+            if force or self.panel_versions.get(name) != inputs:
+                self.layout[name].update(renderers[name]())
+                self.panel_versions[name] = inputs
+                changed.append(name)
+        return changed
+    
     def render(self):
-        """Render the entire dashboard"""
-        self.layout["header"].update(self.render_header())
-        self.layout["stats"].update(self.render_stats())
-        self.layout["goals"].update(self.render_goals())
-        self.layout["github"].update(self.render_github())
-        self.layout["streak"].update(self.render_streak())
-        self.layout["footer"].update(self.render_footer())
-        
+        """Render the dashboard from the collectors' cached data, rebuilding only changed panels"""
+        self.update_panels()
         return self.layout
 
 
+def read_keys(on_key, stop):
+    """Deliver single key presses to on_key until stop is set (POSIX terminals)"""
+    if not (HAS_TTY and sys.stdin.isatty()):
+        return
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        while not stop.is_set():
+            ready, _, _ = select.select([sys.stdin], [], [], 0.2)
+            if ready:
+                on_key(sys.stdin.read(1).lower())
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+
+def parse_args():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Terminal productivity dashboard")
+    parser.add_argument("--config", default="config.json", help="Config file (default: config.json)")
+    parser.add_argument("--headless", action="store_true", help="Export metrics instead of drawing the dashboard")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="Headless output format")
+    parser.add_argument("--output", default="-", help="Headless output file, rewritten on each update (- = stdout)")
+    parser.add_argument("--interval", type=float, default=60, help="Headless: write at most every N seconds")
+    parser.add_argument("--listen", default="", help="Headless: serve /metrics on [HOST:]PORT instead")
+    return parser.parse_args()
+
+
 def main():
     """Main entry point"""
-    dashboard = ProductivityDashboard()
+    import threading
+    
+    args = parse_args()
+    dashboard = ProductivityDashboard(args.config)
+    collectors = dashboard.collectors
+    
+    if args.headless or args.listen:
+        run_headless(dashboard, args.format, args.output, args.interval, args.listen)
+        return
+    
+    def on_key(key):
+        if key == "r":
+            collectors.refresh_all()
+        elif key == "g":
+            collectors["goals"].refresh_now()
+        elif key == "q":
+            collectors.stop()
+    
+    collectors.start()
+    keys = threading.Thread(target=read_keys, args=(on_key, collectors.stop_event), daemon=True)
+    keys.start()
     
     try:
-        with Live(dashboard.render(), console=dashboard.console, refresh_per_second=1):
-            dashboard.console.print("[green]Dashboard started. Press Ctrl+C to exit.[/green]")
-            import time
-            while True:
-                time.sleep(dashboard.config.get("refresh_interval", 60))
-                dashboard.render()
+        # Redrawn only when a panel changed (or the terminal was resized), not on a timer
+        with Live(dashboard.render(), console=dashboard.console, auto_refresh=False) as live:
+            size = dashboard.console.size
+            while not collectors.stop_event.is_set():
+                collectors.updated.wait(1)
+                collectors.updated.clear()
+                changed = dashboard.update_panels()
+                if changed or dashboard.console.size != size:
+                    size = dashboard.console.size
+                    live.refresh()
     except KeyboardInterrupt:
+        pass
+    finally:
+        collectors.stop()
+        keys.join(timeout=1)
+        # Don't wait for scans stuck on slow mounts
+        dashboard.scan_pool.shutdown(wait=False)
         dashboard.console.print("\n[yellow]Dashboard stopped.[/yellow]")
 
 
@@ -0,0 +1,209 @@
+"""
+Headless metrics export
+Built by Jackson Studio
+
+Runs the dashboard's collectors without drawing anything and publishes
+the same metrics as JSON snapshots or Prometheus text exposition: written
+to a file (or stdout) whenever a collector has new data, at most once per
+interval, or served on a local HTTP endpoint for Prometheus to scrape.
+Between collector refreshes nothing runs, so an idle exporter uses no CPU.
+"""
+
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+FORMATS = ("json", "prometheus")
+
+
+def metrics_snapshot(dashboard) -> Dict:
+    """Everything the panels show, as plain data"""
+    snapshot = dashboard.snapshot
+    activity = snapshot.activity
+    github = dashboard.config.get("github", {})
+    collectors = dashboard.collectors.collectors
+
+    data = {
+        "developer": github.get("username") or github.get("email") or "",
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "git": {
+            "commits_today": dashboard.count_commits_today(),
+            "commits_week": activity.total(7) if activity else 0,
+            "commits_year": activity.total(365) if activity else 0,
+            "coding_minutes_today": dashboard.coding_minutes(),
+            "current_streak_days": activity.current_streak if activity else 0,
+            "longest_streak_days": activity.longest_streak if activity else 0,
+            "repos": [{"path": s.path, "state": s.state, "message": s.message} for s in snapshot.statuses],
+        },
+        "goals": {
+            "total": len(dashboard.goals),
+            "completed": sum(1 for goal in dashboard.goals if goal.get("completed")),
+        },
+        "collectors": {
+            name: {
+                "updated_at": c.updated_at.isoformat(timespec="seconds") if c.updated_at else None,
+                "stale": c.stale,
+                "error": c.error,
+            } for name, c in collectors.items()
+        },
+    }
+    if "github" in collectors and collectors["github"].value:
+        stats = collectors["github"].value
+        data["github"] = {key: stats[key] for key in ("public_repos", "stars", "forks", "followers")}
+    return data
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**pairs) -> str:
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in pairs.items()) + "}"
+
+
+def to_prometheus(data: Dict) -> str:
+    """Prometheus text exposition (version 0.0.4) of a metrics snapshot"""
+    developer = data["developer"]
+    metrics: List[Tuple[str, str, str, List[Tuple[str, float]]]] = []
+
+    def gauge(name: str, help_text: str, samples: List[Tuple[str, float]]):
+        metrics.append((f"dashboard_{name}", help_text, "gauge", samples))
+
+    base = labels(developer=developer)
+    git = data["git"]
+    gauge("commits_today", "Your commits today across local repos", [(base, git["commits_today"])])
+    gauge("commits_week", "Your commits in the last 7 days", [(base, git["commits_week"])])
+    gauge("commits_year", "Your commits in the last 365 days", [(base, git["commits_year"])])
+    gauge("coding_minutes_today", "Estimated coding time today from commit gaps",
+          [(base, git["coding_minutes_today"])])
+    gauge("streak_current_days", "Days in a row with at least one commit", [(base, git["current_streak_days"])])
+    gauge("streak_longest_days", "Longest run of days with commits", [(base, git["longest_streak_days"])])
+    gauge("repo_state", "1 for the current scan state of each local repo",
+          [(labels(developer=developer, repo=os.path.basename(r["path"]), state=r["state"]), 1)
+           for r in git["repos"]])
+
+    goals = data["goals"]
+    gauge("goals_total", "Goals set for today", [(base, goals["total"])])
+    gauge("goals_completed", "Goals completed today", [(base, goals["completed"])])
+
+    if "github" in data:
+        for key, help_text in (("public_repos", "Public repositories"), ("stars", "Stars on public repositories"),
+                               ("forks", "Forks of public repositories"), ("followers", "GitHub followers")):
+            gauge(f"github_{key}", help_text, [(base, data["github"][key])])
+
+    collector_samples, stale_samples = [], []
+    for name, collector in data["collectors"].items():
+        label = labels(developer=developer, collector=name)
+        if collector["updated_at"]:
+            collector_samples.append((label, datetime.fromisoformat(collector["updated_at"]).timestamp()))
+        stale_samples.append((label, 1 if collector["stale"] else 0))
+    gauge("collector_last_success_timestamp_seconds", "When each collector last refreshed successfully",
+          collector_samples)
+    gauge("collector_stale", "1 while a collector serves data from before a failed refresh", stale_samples)
+
+    lines = []
+    for name, help_text, kind, samples in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{name}{label} {value:.3f}" if isinstance(value, float) else f"{name}{label} {value}"
+                     for label, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+def render(dashboard, fmt: str) -> str:
+    data = metrics_snapshot(dashboard)
+    return to_prometheus(data) if fmt == "prometheus" else json.dumps(data, indent=2) + "\n"
+
+
+def write_atomic(path: str, text: str):
+    """Replace path in one step so scrapers never read half a file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".dashboard-")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def export_loop(dashboard, fmt: str, output: str, interval: float):
+    """Write a snapshot whenever collectors have new data, at most once per interval"""
+    collectors = dashboard.collectors
+    # The first snapshot waits for every collector (up to one interval)
+    collectors.wait_ready(interval)
+    collectors.updated.set()
+    while not collectors.stop_event.is_set():
+        # Sleep until a collector finishes a refresh; no polling in between
+        collectors.updated.wait()
+        if collectors.stop_event.is_set():
+            break
+        collectors.updated.clear()
+        text = render(dashboard, fmt)
+        if output == "-":
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        else:
+            write_atomic(output, text)
+        collectors.stop_event.wait(interval)
+
+
+def make_handler(dashboard):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body, content_type = render(dashboard, "prometheus"), "text/plain; version=0.0.4; charset=utf-8"
+            elif path in ("/", "/snapshot.json"):
+                body, content_type = render(dashboard, "json"), "application/json"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def serve(dashboard, host: str, port: int) -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus) and /snapshot.json from the cached data; snapshots are built per request"""
+    server = ThreadingHTTPServer((host, port), make_handler(dashboard))
+    threading.Thread(target=server.serve_forever, name="exporter-http", daemon=True).start()
+    return server
+
+
+def run_headless(dashboard, fmt: str = "json", output: str = "-", interval: float = 60,
+                 listen: str = ""):
+    """Run collectors and export until interrupted"""
+    collectors = dashboard.collectors
+    # Services are stopped with SIGTERM; treat it like Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: collectors.stop())
+    collectors.start()
+    server = None
+    try:
+        if listen:
+            host, _, port = listen.rpartition(":")
+            server = serve(dashboard, host or "127.0.0.1", int(port))
+            print(f"📡 Serving metrics on http://{host or '127.0.0.1'}:{server.server_address[1]}/metrics",
+                  file=sys.stderr)
+            collectors.stop_event.wait()
+        else:
+            export_loop(dashboard, fmt, output, interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collectors.stop()
+        if server:
+            server.shutdown()
+        dashboard.scan_pool.shutdown(wait=False)
@@ -0,0 +1,146 @@
+"""
+GitHub stats client
+Built by Jackson Studio
+
+Fetches profile stats (public repos, stars, forks, followers) with one
+GraphQL query per 100 repositories instead of one REST call per repo.
+Results are cached on disk with a TTL, and the client stops calling the
+API when the rate limit runs low, serving the cached stats until the
+limit resets.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import requests
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_CACHE = os.path.expanduser("~/.cache/productivity-dashboard/github.json")
+
+# Keep this many points of the hourly GraphQL budget for other tools
+MIN_REMAINING = 50
+
+STATS_QUERY = """
+query($login: String!, $after: String) {
+  user(login: $login) {
+    followers { totalCount }
+    repositories(first: 100, after: $after, privacy: PUBLIC, ownerAffiliations: OWNER) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes { stargazerCount forkCount }
+    }
+  }
+  rateLimit { remaining resetAt }
+}
+"""
+
+
+class RateLimited(Exception):
+    """The API budget is exhausted and there are no cached stats to serve"""
+
+
+class GitHubStats:
+    """TTL-cached, rate-limit aware GitHub profile stats"""
+
+    def __init__(self, token: str, username: str, api_url: str = DEFAULT_API_URL,
+                 ttl: float = 300, cache_path: Optional[str] = DEFAULT_CACHE):
+        self.token = token
+        self.username = username
+        self.api_url = api_url.rstrip("/")
+        self.ttl = ttl
+        self.cache_path = os.path.expanduser(cache_path) if cache_path else None
+        self.cached: Optional[Dict] = self.load_cache()
+        self.blocked_until = 0.0  # epoch seconds; no API calls before this
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"bearer {token}",
+            "Accept": "application/json",
+        })
+
+    def load_cache(self) -> Optional[Dict]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cached if cached.get("username") == self.username else None
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, "w") as f:
+            json.dump(self.cached, f)
+
+    def fresh(self) -> bool:
+        return bool(self.cached) and time.time() - self.cached["fetched_at"] < self.ttl
+
+    def get(self) -> Dict:
+        """Cached stats while fresh or rate limited, otherwise fetch new ones"""
+        if self.fresh():
+            return self.cached
+        if time.time() < self.blocked_until:
+            if self.cached:
+                return self.cached
+            raise RateLimited(f"rate limited until {datetime.fromtimestamp(self.blocked_until):%H:%M}")
+
+        self.cached = self.fetch()
+        self.save_cache()
+        return self.cached
+
+    def graphql(self, variables: Dict) -> Dict:
+        response = self.session.post(f"{self.api_url}/graphql", json={"query": STATS_QUERY, "variables": variables},
+                                     timeout=15)
+        limited = response.status_code == 429 or (response.status_code == 403 and (
+            response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers))
+        if limited:
+            # Primary or secondary rate limit: back off until GitHub says so
+            reset = response.headers.get("X-RateLimit-Reset")
+            retry_after = response.headers.get("Retry-After")
+            self.blocked_until = float(reset) if reset else time.time() + float(retry_after or 60)
+            if self.cached:
+                return {}
+            raise RateLimited(f"GitHub returned {response.status_code}")
+        response.raise_for_status()
+
+        body = response.json()
+        if body.get("errors"):
+            raise RuntimeError(body["errors"][0].get("message", "GraphQL error"))
+        data = body["data"]
+
+        rate = data.get("rateLimit") or {}
+        if rate.get("remaining", MIN_REMAINING) < MIN_REMAINING:
+            reset_at = datetime.fromisoformat(rate["resetAt"].replace("Z", "+00:00"))
+            self.blocked_until = reset_at.timestamp()
+        return data
+
+    def fetch(self) -> Dict:
+        """Stats from one query per 100 public repositories"""
+        stats = {"username": self.username, "stars": 0, "forks": 0}
+        after = None
+        while True:
+            data = self.graphql({"login": self.username, "after": after})
+            if not data:
+                return self.cached  # rate limited mid-way; keep the last complete stats
+            if data.get("user") is None:
+                raise RuntimeError(f"GitHub user not found: {self.username}")
+
+            repos = data["user"]["repositories"]
+            stats["public_repos"] = repos["totalCount"]
+            stats["followers"] = data["user"]["followers"]["totalCount"]
+            for repo in repos["nodes"]:
+                stats["stars"] += repo["stargazerCount"]
+                stats["forks"] += repo["forkCount"]
+            stats["rate_remaining"] = (data.get("rateLimit") or {}).get("remaining")
+
+            if not repos["pageInfo"]["hasNextPage"]:
+                break
+            after = repos["pageInfo"]["endCursor"]
+
+        stats["fetched_at"] = time.time()
+        return stats
@@ -0,0 +1,10 @@
+"""
+Shared test setup
+Built by Jackson Studio
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
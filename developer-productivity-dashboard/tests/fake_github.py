@@ -0,0 +1,98 @@
+"""
+Local stand-in for GitHub
+Built by Jackson Studio
+
+Serves the GraphQL stats query the dashboard sends, for a synthetic user
+with any number of repositories, paginated 100 at a time like GitHub.
+Counts requests and can report a low rate limit or answer with a
+rate-limit error.
+"""
+
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+PAGE_SIZE = 100
+
+
+class FakeGitHubAPI:
+    """State behind the fake endpoint"""
+
+    def __init__(self, login: str = "octocat", repos: int = 3, stars: int = 2, forks: int = 1,
+                 followers: int = 7):
+        self.login = login
+        self.repos = [{"stargazerCount": stars, "forkCount": forks} for _ in range(repos)]
+        self.followers = followers
+        self.remaining = 5000
+        self.reset_at = "2030-01-01T00:00:00Z"
+        self.status: Optional[int] = None  # answer every request with this status
+        self.requests: List[Dict] = []
+
+    def answer(self, body: Dict) -> Dict:
+        variables = body.get("variables") or {}
+        if variables.get("login") != self.login:
+            return {"data": {"user": None, "rateLimit": self.rate_limit()},
+                    "errors": [{"message": f"Could not resolve to a User with the login of '{variables.get('login')}'."}]}
+
+        start = int(variables.get("after") or 0)
+        page = self.repos[start:start + PAGE_SIZE]
+        end = start + len(page)
+        self.remaining -= 1
+        return {"data": {
+            "user": {
+                "followers": {"totalCount": self.followers},
+                "repositories": {
+                    "totalCount": len(self.repos),
+                    "pageInfo": {"hasNextPage": end < len(self.repos), "endCursor": str(end)},
+                    "nodes": page,
+                },
+            },
+            "rateLimit": self.rate_limit(),
+        }}
+
+    def rate_limit(self) -> Dict:
+        return {"remaining": self.remaining, "resetAt": self.reset_at}
+
+
+def make_handler(api: FakeGitHubAPI):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            api.requests.append({"path": self.path, "auth": self.headers.get("Authorization"), "body": body})
+            if self.path != "/graphql":
+                self.send_json(404, {"message": "Not Found"})
+            elif api.status:
+                self.send_json(api.status, {"message": "API rate limit exceeded"},
+                               {"X-RateLimit-Remaining": "0", "Retry-After": "120"})
+            else:
+                self.send_json(200, api.answer(body))
+
+    return Handler
+
+
+@contextmanager
+def serve_github(api: FakeGitHubAPI):
+    """Run the fake API on a free localhost port, yield its base URL"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(api))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,67 @@
+"""
+Tests for the per-day commit counter
+Built by Jackson Studio
+"""
+
+import json
+import os
+import subprocess
+from datetime import date, timedelta
+
+import pytest
+
+from activity import HEATMAP_WEEKS, DayCounts
+from dashboard import ProductivityDashboard
+
+TODAY = date(2026, 3, 18)  # a Wednesday
+
+
+def daily(*days_ago: int, commits: int = 1):
+    return {(TODAY - timedelta(days=n)).isoformat(): commits for n in days_ago}
+
+
+def test_current_and_longest_streak():
+    counts = DayCounts(daily(0, 1, 2, 5, 6, 7, 8, 9), TODAY)
+
+    assert counts.current_streak == 3
+    assert counts.longest_streak == 5
+    assert counts.total(7) == 5
+
+
+def test_streak_stays_alive_until_end_of_today():
+    assert DayCounts(daily(1, 2), TODAY).current_streak == 2
+    assert DayCounts(daily(2, 3), TODAY).current_streak == 0
+
+
+def test_heatmap_is_sunday_first_and_ends_today():
+    counts = DayCounts({**daily(400), **daily(0, commits=3)}, TODAY)
+    rows = counts.heatmap()
+
+    assert len(rows) == 7 and all(len(row) == HEATMAP_WEEKS for row in rows)
+    assert rows[3][-1] == 3  # Wednesday of the current week
+    assert rows[4][-1] is None  # Thursday hasn't happened yet
+    assert counts.longest_streak == 1
+
+
+@pytest.mark.parametrize("email, mine", [("", 3), ("dev@example.com", 2)])
+def test_today_and_activity_use_the_same_author_filter(tmp_path, monkeypatch, email, mine):
+    repo = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo)], check=True)
+    for author in ("dev@example.com", "dev@example.com", "pair@example.com"):
+        subprocess.run(["git", "-C", str(repo), "commit", "-q", "--allow-empty", "-m", "work"], check=True,
+                       env={**os.environ, "GIT_AUTHOR_NAME": "Dev", "GIT_AUTHOR_EMAIL": author,
+                            "GIT_COMMITTER_NAME": "Dev", "GIT_COMMITTER_EMAIL": author})
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({
+        "github": {"token": "", "username": "dev", "email": email},
+        "local_repos": [str(repo)],
+        "index_db": str(tmp_path / "index.db"),
+    }))
+    monkeypatch.chdir(tmp_path)
+    board = ProductivityDashboard(str(config))
+    board.collectors["git"].collect()
+    board.scan_pool.shutdown()
+
+    # Unset email: everyone's commits, in both places
+    assert board.count_commits_today() == mine
+    assert board.snapshot.activity.total(1) == mine
@@ -0,0 +1,83 @@
+"""
+Tests for the background collectors
+Built by Jackson Studio
+"""
+
+import threading
+
+from collectors import Collector, CollectorSet
+
+
+def test_version_moves_only_when_the_value_changes():
+    values = iter([1, 1, 2])
+    collector = Collector("count", lambda: next(values), interval=60)
+
+    collector.collect()
+    assert (collector.value, collector.version) == (1, 1)
+    collector.collect()
+    assert collector.version == 1
+    collector.collect()
+    assert (collector.value, collector.version) == (2, 2)
+
+
+def test_failed_refresh_keeps_the_last_good_value():
+    results = iter([{"stars": 3}, ConnectionError("offline"), {"stars": 4}])
+
+    def fetch():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    collector = Collector("github", fetch, interval=60)
+    collector.collect()
+    updated_at = collector.updated_at
+
+    collector.collect()
+    assert collector.value == {"stars": 3}
+    assert collector.stale and collector.error == "ConnectionError: offline"
+    assert collector.updated_at == updated_at
+    assert collector.version == 2  # the error is news too
+
+    collector.collect()
+    assert collector.value == {"stars": 4} and not collector.stale
+    assert collector.version == 3
+
+
+def test_previous_value_is_served_while_refreshing():
+    started, release = threading.Event(), threading.Event()
+    values = iter(["old", "new"])
+
+    def fetch():
+        value = next(values)
+        if value == "new":
+            started.set()
+            release.wait(5)
+        return value
+
+    collector = Collector("git", fetch, interval=60)
+    collector.collect()
+    refresh = threading.Thread(target=collector.collect)
+    refresh.start()
+    started.wait(5)
+
+    assert collector.refreshing
+    assert (collector.value, collector.version) == ("old", 1)
+
+    release.set()
+    refresh.join(5)
+    assert not collector.refreshing
+    assert (collector.value, collector.version) == ("new", 2)
+
+
+def test_set_signals_updates_and_waits_for_first_refresh():
+    fast = Collector("goals", lambda: [], interval=60)
+    slow = Collector("git", lambda: "snapshot", interval=60)
+    collectors = CollectorSet([fast, slow])
+
+    fast.collect()
+    assert collectors.updated.is_set()
+    assert not collectors.wait_ready(timeout=0)
+
+    slow.collect()
+    assert collectors.wait_ready(timeout=0)
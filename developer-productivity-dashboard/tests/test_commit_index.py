@@ -0,0 +1,137 @@
+"""
+Tests for the incremental commit index
+Built by Jackson Studio
+"""
+
+import os
+import subprocess
+from datetime import datetime
+
+import pytest
+
+from commit_index import CommitIndex, git_log_commits, gitpython_commits
+
+ENV = {"GIT_AUTHOR_NAME": "Dev", "GIT_AUTHOR_EMAIL": "dev@example.com",
+       "GIT_COMMITTER_NAME": "Dev", "GIT_COMMITTER_EMAIL": "dev@example.com"}
+
+
+def git(repo, *args):
+    return subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True, text=True,
+                          env={**os.environ, **ENV}).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+    for i in range(3):
+        git(path, "commit", "-q", "--allow-empty", "-m", f"c{i}")
+    return path
+
+
+@pytest.fixture
+def empty_repo(tmp_path):
+    path = tmp_path / "dated"
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+    return path
+
+
+def commit_at(repo, day, author="dev@example.com", message="work"):
+    """Empty commit authored and committed at noon local time on day"""
+    subprocess.run(["git", "-C", str(repo), "commit", "-q", "--allow-empty", "-m", message], check=True,
+                   capture_output=True, env={**os.environ, **ENV, "GIT_AUTHOR_EMAIL": author,
+                                             "GIT_AUTHOR_DATE": f"{day}T12:00:00",
+                                             "GIT_COMMITTER_DATE": f"{day}T12:00:00"})
+
+
+def indexed(index):
+    return len(index.commits_since(datetime.fromtimestamp(0)))
+
+
+@pytest.mark.parametrize("backend", ["cli", "gitpython"])
+def test_ingests_only_new_commits(repo, tmp_path, backend):
+    index = CommitIndex(str(tmp_path / "index.db"), backend)
+
+    assert index.update(str(repo)) == 3
+    assert index.update(str(repo)) == 0
+    git(repo, "commit", "-q", "--allow-empty", "-m", "c3")
+    assert index.update(str(repo)) == 1
+    assert index.author_counts("") == {"dev@example.com": 4}
+
+
+def test_appended_commits_add_to_existing_day_counts(empty_repo, tmp_path):
+    repo = empty_repo
+    index = CommitIndex(str(tmp_path / "index.db"))
+    assert index.update(str(repo)) == 0  # no commits yet
+    commit_at(repo, "2026-03-02")
+    index.update(str(repo))
+
+    commit_at(repo, "2026-03-02")
+    commit_at(repo, "2026-03-03")
+
+    assert index.update(str(repo)) == 2
+    assert indexed(index) == 3
+    assert index.daily_counts("2026-03-01") == {"2026-03-02": 2, "2026-03-03": 1}
+
+
+def test_daily_counts_filter_by_day_author_and_repo(empty_repo, tmp_path):
+    repo = empty_repo
+    index = CommitIndex(str(tmp_path / "index.db"))
+    commit_at(repo, "2026-03-01")
+    commit_at(repo, "2026-03-02", author="other@example.com")
+    commit_at(repo, "2026-03-02")
+    index.update(str(repo))
+
+    assert index.daily_counts("2026-03-02") == {"2026-03-02": 2}
+    assert index.daily_counts("2026-03-01", author="dev@example.com") == {"2026-03-01": 1, "2026-03-02": 1}
+    assert index.daily_counts("2026-03-01", author="") == {}
+    assert index.daily_counts("2026-03-01", repos=["/elsewhere"]) == {}
+    assert index.author_counts("2026-03-01") == {"dev@example.com": 2, "other@example.com": 1}
+
+
+def test_force_push_rebuilds_the_repo(empty_repo, tmp_path):
+    repo = empty_repo
+    index = CommitIndex(str(tmp_path / "index.db"))
+    commit_at(repo, "2026-03-01")
+    commit_at(repo, "2026-03-02")
+    index.update(str(repo))
+
+    # Amend and drop everything: the old head is no longer an ancestor
+    git(repo, "reset", "-q", "--hard", "HEAD~1")
+    commit_at(repo, "2026-03-04", message="amended")
+    git(repo, "reflog", "expire", "--expire=now", "--all")
+    git(repo, "gc", "-q", "--prune=now")
+
+    assert index.update(str(repo)) == 2
+    assert indexed(index) == 2
+    assert index.daily_counts("2026-03-01") == {"2026-03-01": 1, "2026-03-04": 1}
+
+
+def test_rewritten_history_is_reindexed(repo, tmp_path):
+    index = CommitIndex(str(tmp_path / "index.db"))
+    index.update(str(repo))
+
+    git(repo, "reset", "-q", "--hard", "HEAD~2")
+    git(repo, "commit", "-q", "--allow-empty", "-m", "rewritten")
+    index.update(str(repo))
+
+    assert indexed(index) == 2
+    assert sum(index.daily_counts("").values()) == 2
+
+
+def test_new_branch_adds_only_its_own_commits(repo, tmp_path):
+    index = CommitIndex(str(tmp_path / "index.db"))
+    index.update(str(repo))
+
+    git(repo, "checkout", "-q", "-b", "feature")
+    git(repo, "commit", "-q", "--allow-empty", "-m", "feature work")
+
+    assert index.update(str(repo)) == 1
+    assert indexed(index) == 4
+
+
+def test_backends_agree(repo):
+    from git import Repo
+
+    head = git(repo, "rev-parse", "HEAD")
+    assert list(git_log_commits(str(repo), [head])) == list(gitpython_commits(Repo(str(repo)), [head]))
@@ -0,0 +1,55 @@
+"""
+Tests for headless metrics export
+Built by Jackson Studio
+"""
+
+import json
+import urllib.request
+
+import pytest
+
+import exporter
+from dashboard import ProductivityDashboard
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({
+        "github": {"token": "", "username": 'dev "one"', "email": "dev@example.com"},
+        "local_repos": [str(tmp_path / "missing")],
+        "index_db": str(tmp_path / "index.db"),
+    }))
+    monkeypatch.chdir(tmp_path)
+    board = ProductivityDashboard(str(config))
+    for collector in board.collectors.collectors.values():
+        collector.collect()
+    yield board
+    board.scan_pool.shutdown()
+
+
+def test_prometheus_text_escapes_labels(dashboard):
+    text = exporter.render(dashboard, "prometheus")
+
+    assert '# TYPE dashboard_commits_today gauge' in text
+    assert 'dashboard_commits_today{developer="dev \\"one\\""} 0' in text
+    assert 'dashboard_repo_state{developer="dev \\"one\\"",repo="missing",state="missing"} 1' in text
+    assert 'dashboard_collector_stale{developer="dev \\"one\\"",collector="git"} 0' in text
+
+
+def test_http_endpoint_serves_metrics_and_json(dashboard):
+    server = exporter.serve(dashboard, "127.0.0.1", 0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert b"dashboard_streak_current_days" in response.read()
+        with urllib.request.urlopen(f"{base}/snapshot.json") as response:
+            data = json.load(response)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert data["git"]["repos"] == [{"path": data["git"]["repos"][0]["path"], "state": "missing",
+                                     "message": "path not found"}]
+    assert data["collectors"]["goals"]["stale"] is False
@@ -0,0 +1,68 @@
+"""
+Tests for the cached GraphQL GitHub stats client
+Built by Jackson Studio
+"""
+
+import pytest
+
+from fake_github import FakeGitHubAPI, serve_github
+from github_stats import GitHubStats, RateLimited
+
+
+def client(url, tmp_path, **kwargs):
+    return GitHubStats("ghp_test", "octocat", api_url=url, cache_path=str(tmp_path / "github.json"), **kwargs)
+
+
+def test_one_query_per_hundred_repos(tmp_path):
+    api = FakeGitHubAPI(repos=250, stars=2, forks=1)
+    with serve_github(api) as url:
+        stats = client(url, tmp_path).get()
+
+    assert len(api.requests) == 3
+    assert api.requests[0]["auth"] == "bearer ghp_test"
+    assert stats["public_repos"] == 250
+    assert stats["stars"] == 500
+    assert stats["forks"] == 250
+    assert stats["followers"] == 7
+
+
+def test_ttl_cache_survives_restart(tmp_path):
+    api = FakeGitHubAPI()
+    with serve_github(api) as url:
+        first = client(url, tmp_path).get()
+        again = client(url, tmp_path).get()
+        expired = client(url, tmp_path, ttl=0).get()
+
+    assert len(api.requests) == 2
+    assert again == first
+    assert expired["fetched_at"] >= first["fetched_at"]
+
+
+def test_low_rate_limit_serves_cache_until_reset(tmp_path):
+    api = FakeGitHubAPI()
+    api.remaining = 10
+    with serve_github(api) as url:
+        stats = client(url, tmp_path, ttl=0)
+        first = stats.get()
+        assert stats.get() == first
+
+    assert len(api.requests) == 1
+
+
+def test_rate_limit_error_without_cache(tmp_path):
+    api = FakeGitHubAPI()
+    api.status = 403
+    with serve_github(api) as url:
+        stats = client(url, tmp_path)
+        with pytest.raises(RateLimited):
+            stats.get()
+        with pytest.raises(RateLimited):
+            stats.get()  # backing off: no second request
+
+    assert len(api.requests) == 1
+
+
+def test_unknown_user(tmp_path):
+    with serve_github(FakeGitHubAPI(login="someone-else")) as url:
+        with pytest.raises(RuntimeError):
+            client(url, tmp_path).get()
@@ -0,0 +1,41 @@
+"""
+Tests for change-aware panel rendering
+Built by Jackson Studio
+"""
+
+import json
+
+import pytest
+
+from dashboard import ProductivityDashboard
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({
+        "github": {"token": "", "username": "dev", "email": "dev@example.com"},
+        "local_repos": [],
+        "index_db": str(tmp_path / "index.db"),
+    }))
+    monkeypatch.chdir(tmp_path)
+    board = ProductivityDashboard(str(config))
+    for collector in board.collectors.collectors.values():
+        collector.collect()
+    yield board
+    board.scan_pool.shutdown()
+
+
+def test_unchanged_data_rebuilds_nothing(dashboard):
+    assert len(dashboard.update_panels()) == 7
+    assert dashboard.update_panels() == []
+
+    dashboard.collectors["goals"].collect()  # same goals again
+    assert dashboard.update_panels() == []
+
+
+def test_new_git_data_rebuilds_only_its_panels(dashboard):
+    dashboard.update_panels()
+
+    dashboard.collectors["git"].version += 1
+    assert sorted(dashboard.update_panels()) == ["heatmap", "stats", "streak"]
@@ -0,0 +1,66 @@
+"""
+Tests for the parallel repo scan
+Built by Jackson Studio
+"""
+
+import json
+import threading
+
+import pytest
+
+from dashboard import ProductivityDashboard
+
+
+@pytest.fixture
+def paths(tmp_path):
+    names = ["fast", "slow", "broken", "gone"]
+    for name in names[:-1]:
+        (tmp_path / name).mkdir()
+    return {name: str(tmp_path / name) for name in names}
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch, paths):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({
+        "github": {"token": "", "username": "dev", "email": "dev@example.com"},
+        "local_repos": list(paths.values()),
+        "index_db": str(tmp_path / "index.db"),
+        "repo_timeout": 0.2,
+    }))
+    monkeypatch.chdir(tmp_path)
+    board = ProductivityDashboard(str(config))
+    yield board
+    board.scan_pool.shutdown()
+
+
+def test_slow_failing_and_missing_repos_get_their_own_status(dashboard, paths):
+    release = threading.Event()
+    calls = []
+
+    def scan_repo(path):
+        calls.append(path)
+        if path == paths["slow"]:
+            release.wait(5)
+        if path == paths["broken"]:
+            raise RuntimeError("bad object HEAD")
+        return 2
+
+    dashboard.scan_repo = scan_repo
+
+    statuses, ingested = dashboard.scan_repos()
+
+    states = {s.path: (s.state, s.message) for s in statuses}
+    assert states[paths["fast"]] == ("ok", "")
+    assert states[paths["slow"]] == ("stale", "scan exceeded 0.2s")
+    assert states[paths["broken"]] == ("error", "RuntimeError: bad object HEAD")
+    assert states[paths["gone"]] == ("missing", "path not found")
+    assert ingested == 2  # only the finished scan counts
+
+    # The slow scan is still running: it is awaited again, not started twice
+    release.set()
+    statuses, ingested = dashboard.scan_repos()
+
+    assert calls.count(paths["slow"]) == 1
+    assert {s.path: s.state for s in statuses}[paths["slow"]] == "ok"
+    assert ingested == 4  # fast again, plus the slow scan that has now finished